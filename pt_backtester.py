@@ -7,6 +7,8 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+from pt_candle_store import CandleStore, parse_kucoin_klines
+
 # Updated KuCoin Imports
 try:
     from kucoin_universal_sdk.model.client_option import ClientOptionBuilder
@@ -26,7 +28,9 @@ class BacktestConfig:
     slippage_pct: float = 0.05
 
 class KuCoinDataFetcher:
-    def __init__(self):
+    def __init__(self, candle_store=None):
+        # optional pt_candle_store.CandleStore; repeated backtests then reuse the cached candles
+        self.candle_store = candle_store
         if KUCOIN_AVAILABLE:
             options = ClientOptionBuilder().build()
             self.client = DefaultClient(options)
@@ -35,12 +39,51 @@ class KuCoinDataFetcher:
             self.market_api = None
 
     def fetch_candles(self, coin: str, start_date: datetime, end_date: datetime, timeframe: str = "1hour"):
+        if self.candle_store is not None:
+            fetch = None
+            if self.market_api:
+                fetch = lambda s, e: parse_kucoin_klines(self._fetch_rows(coin, s, e, timeframe))
+            candles = self.candle_store.get(
+                "kucoin", f"{coin}-USDT", timeframe,
+                int(start_date.timestamp()), int(end_date.timestamp()),
+                fetch=fetch, chunk=1500,
+            )
+            # same row layout and newest-first order as the KuCoin API
+            return [[c.timestamp, c.open, c.close, c.high, c.low, c.volume] for c in reversed(candles)]
+        return self._fetch_rows(coin, int(start_date.timestamp()), int(end_date.timestamp()), timeframe)
+
+    def _fetch_rows(self, coin: str, start_at: int, end_at: int, timeframe: str):
         if not self.market_api: return []
         req = GetKlinesReq(symbol=f"{coin}-USDT", type=timeframe, 
-                           start_at=int(start_date.timestamp()), 
-                           end_at=int(end_date.timestamp()))
+                           start_at=start_at, 
+                           end_at=end_at)
         resp = self.market_api.get_klines(req)
         # Map to OHLCV structure
         return [list(c) for c in resp.data] if resp and resp.data else []
 
-# [Remaining backtester logic updated to handle the data list from the SDK]
\ No newline at end of file
+# [Remaining backtester logic updated to handle the data list from the SDK]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader backtester")
+    parser.add_argument("coin", help="Coin, e.g. BTC")
+    parser.add_argument("--days", type=int, default=30, help="Days of history to load")
+    parser.add_argument("--timeframe", default="1hour")
+    parser.add_argument("--cache-dir", help="Candle cache directory")
+    parser.add_argument("--no-candle-cache", action="store_true", help="Fetch every candle from KuCoin")
+    args = parser.parse_args()
+
+    # candles are read through candle_cache/, so repeated backtests only fetch what is new
+    store = None if args.no_candle_cache else (CandleStore(args.cache_dir) if args.cache_dir else CandleStore())
+    fetcher = KuCoinDataFetcher(candle_store=store)
+    if fetcher.market_api is None:
+        print("[Backtester] kucoin-universal-sdk not installed; using cached candles only")
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=args.days)
+    rows = fetcher.fetch_candles(args.coin.upper(), start_date, end_date, args.timeframe)
+    print(f"[Backtester] {args.coin.upper()} {args.timeframe}: {len(rows)} candles "
+          f"{start_date:%Y-%m-%d} .. {end_date:%Y-%m-%d}" + ("" if store is None else f" (cache {store.root})"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Candle Close Scheduler
+=======================================
+Wakes jobs when candles close instead of polling on a fixed sleep.
+
+Every timeframe (1hour .. 1week) has exactly one entry in a heap keyed by its
+next close (pt_candle_store.next_close; weekly candles close on Monday 00:00
+UTC). The run loop sleeps on an Event until the earliest entry is due (plus
+an optional settle `delay`), pops every timeframe closing at that boundary
+and calls each callback once, with all coins that have one of those
+timeframes. Several coins or timeframes sharing a boundary therefore cost one
+wake-up and one call per callback.
+
+A boundary fires at most once per timeframe. After a long stall (laptop
+sleep, a slow job) the missed boundaries of a timeframe are coalesced into a
+single event for the newest one rather than replayed one by one. Interval
+jobs (e.g. a price re-check every 10 s) and one-shot call_later() retries
+share the same heap.
+
+Usage:
+    from pt_candle_clock import CandleCloseScheduler
+
+    clock = CandleCloseScheduler(delay=1.0)
+    clock.add_job("BTC", ["1hour", "4hour", "1day"], on_close)   # on_close(event: CloseEvent)
+    clock.add_job("ETH", ["1hour", "4hour", "1day"], on_close)   # coalesced with BTC
+    clock.add_interval("prices", 10.0, check_prices)
+    clock.call_later("retry", 5.0, retry)                        # once, 5 s from now
+    clock.run()                                                  # until stop()
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from pt_candle_store import next_close, timeframe_seconds
+
+
+@dataclass
+class CloseEvent:
+    boundary: int
+    timeframes: Dict[str, List[str]]  # coin -> timeframes whose candle closed at `boundary`
+    fired_at: float = field(default_factory=time.time)
+
+    @property
+    def coins(self) -> List[str]:
+        return list(self.timeframes)
+
+    @property
+    def lag(self) -> float:
+        """Seconds between the boundary and the callback."""
+        return self.fired_at - self.boundary
+
+
+@dataclass
+class _Job:
+    coin: str
+    timeframes: Tuple[str, ...]
+    callback: Callable[[CloseEvent], None]
+
+
+@dataclass
+class _Interval:
+    name: str
+    seconds: float
+    callback: Callable[[], None]
+
+
+class CandleCloseScheduler:
+    """Fires callbacks at candle boundaries, once per boundary, coalescing coins."""
+
+    def __init__(self, delay: float = 0.0, clock: Callable[[], float] = time.time):
+        self.delay = delay
+        self.clock = clock
+        self.jobs: Dict[str, _Job] = {}
+        self.intervals: Dict[str, _Interval] = {}
+        self._later: Dict[str, Tuple[int, Callable[[], None]]] = {}  # name -> (seq, callback) of call_later()
+        self._heap: List[Tuple[float, int, str, str]] = []  # (due, seq, kind, key)
+        self._seq = itertools.count()
+        self._scheduled: Dict[str, int] = {}  # timeframe -> boundary queued for it
+        self._fired: Dict[str, int] = {}  # timeframe -> last boundary fired
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+
+    # ---- registration ----
+
+    def add_job(self, coin: str, timeframes: Sequence[str], callback: Callable[[CloseEvent], None]):
+        """Call `callback` when any of the coin's `timeframes` closes (replaces an earlier job for the coin)."""
+        for tf in timeframes:
+            timeframe_seconds(tf)  # unknown timeframes fail here, not in the loop
+        with self._lock:
+            self.jobs[coin] = _Job(coin, tuple(timeframes), callback)
+            now = self.clock()
+            for tf in timeframes:
+                if tf not in self._scheduled:
+                    self._push_close(tf, now)
+        self._wake.set()
+
+    def remove_job(self, coin: str):
+        with self._lock:
+            self.jobs.pop(coin, None)
+
+    def add_interval(self, name: str, seconds: float, callback: Callable[[], None]):
+        """Call `callback` every `seconds` between closes."""
+        with self._lock:
+            self.intervals[name] = _Interval(name, float(seconds), callback)
+            heapq.heappush(self._heap, (self.clock() + seconds, next(self._seq), "interval", name))
+        self._wake.set()
+
+    def call_later(self, name: str, seconds: float, callback: Callable[[], None]):
+        """Call `callback` once in `seconds` (replaces a pending call with the same name)."""
+        with self._lock:
+            seq = next(self._seq)
+            self._later[name] = (seq, callback)
+            heapq.heappush(self._heap, (self.clock() + seconds, seq, "later", name))
+        self._wake.set()
+
+    def _push_close(self, tf: str, now: float):
+        boundary = next_close(now, tf)
+        self._scheduled[tf] = boundary
+        heapq.heappush(self._heap, (boundary + self.delay, next(self._seq), "close", tf))
+
+    # ---- dispatch ----
+
+    def next_wakeup(self) -> Optional[float]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self, now: Optional[float] = None) -> List[CloseEvent]:
+        """Fire everything due at `now`; returns the close events dispatched."""
+        now = self.clock() if now is None else now
+        closed: Dict[int, List[str]] = {}
+        intervals: List[_Interval] = []
+        later: List[Tuple[str, Callable[[], None]]] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, kind, key = heapq.heappop(self._heap)
+                if kind == "later":
+                    pending = self._later.get(key)
+                    if pending is not None and pending[0] == seq:  # not replaced by a newer call_later()
+                        del self._later[key]
+                        later.append((key, pending[1]))
+                    continue
+                if kind == "interval":
+                    interval = self.intervals.get(key)
+                    if interval is not None:
+                        intervals.append(interval)
+                        heapq.heappush(self._heap, (now + interval.seconds, next(self._seq), "interval", key))
+                    continue
+                # the newest boundary at or before `now`; missed ones collapse into it
+                boundary = max(self._scheduled.pop(key), next_close(now, key) - timeframe_seconds(key))
+                if boundary > self._fired.get(key, 0):
+                    self._fired[key] = boundary
+                    closed.setdefault(boundary, []).append(key)
+                if any(key in job.timeframes for job in self.jobs.values()):
+                    self._push_close(key, now)
+            jobs = list(self.jobs.values())
+
+        events = []
+        for boundary in sorted(closed):
+            tfs = set(closed[boundary])
+            # one call per callback with every coin whose timeframes closed here
+            # (keyed by the callback itself: equal bound methods hash alike)
+            by_callback: Dict[Callable[[CloseEvent], None], Dict[str, List[str]]] = {}
+            for job in jobs:
+                hit = [tf for tf in job.timeframes if tf in tfs]
+                if hit:
+                    by_callback.setdefault(job.callback, {})[job.coin] = hit
+            for callback, timeframes in by_callback.items():
+                event = CloseEvent(boundary=boundary, timeframes=timeframes, fired_at=self.clock())
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"[CandleClock] Close job for {', '.join(timeframes)} failed: {e}")
+                events.append(event)
+        for interval in intervals:
+            try:
+                interval.callback()
+            except Exception as e:
+                print(f"[CandleClock] Interval job {interval.name} failed: {e}")
+        for name, callback in later:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[CandleClock] Job {name} failed: {e}")
+        return events
+
+    # ---- loop ----
+
+    def run(self, should_stop: Optional[Callable[[], bool]] = None):
+        """Sleep until the next boundary or interval, fire it, repeat until stop()."""
+        self._stopped = False
+        while not self._stopped and (should_stop is None or not should_stop()):
+            wakeup = self.next_wakeup()
+            timeout = None if wakeup is None else max(0.0, wakeup - self.clock())
+            if timeout is None or timeout > 0:
+                # add_job / stop() set the event so a new earliest entry is picked up
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+            self.run_pending()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Bulk Candle Downloader
+=======================================
+Downloads long candle histories (years of 1hour candles) into the candle
+cache (pt_candle_store.py) by splitting the range into exchange-sized pages
+(Binance 1000, Coinbase 300 candles) and fetching them concurrently. The
+exchange's rate limiter (pt_rate_limit.py) keeps the workers inside the
+request budget, so more workers only help until the budget is reached.
+
+Only what the cache is missing is requested: the range is diffed against the
+cached series and its known gaps first, so an interrupted download resumes
+where it stopped, including holes left by pages that finished out of order.
+Pages are checked before they are stored (inside the page, aligned to the
+timeframe, sane OHLC values), duplicates collapse on timestamp, and fetched
+pages are flushed to the cache every few seconds. Ranges the exchange
+answers with no candles (before the listing, trading halts) are recorded as
+known gaps; the result lists any holes that remain.
+
+The trainer and backtester then read the history from the cache
+(`--source cache:binance`, or the default exchange source, which reads
+through it).
+
+Usage:
+    from pt_candle_download import download_history
+
+    result = download_history("BTC", "1hour", start=1514764800)   # 2018-01-01 until now
+    print(result.fetched, result.holes)
+
+    # CLI (dates are UTC)
+    python pt_candle_download.py BTC ETH --timeframe 1hour --start 2018-01-01
+    python pt_candle_download.py BTC --timeframe 1day --start 2017-08-01 --exchange coinbase --workers 2
+"""
+
+import math
+import time
+import calendar
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from pt_exchanges import ExchangeError, ExchangeManager, OHLCV
+from pt_candle_store import CandleSeries, CandleStore, candle_open, timeframe_seconds
+
+
+PAGE_SIZES = {"binance": 1000, "coinbase": 300}
+DOWNLOAD_WORKERS = 4
+PAGE_RETRIES = 3
+RETRY_DELAY = 2.0
+FLUSH_SECONDS = 10.0  # at most this much downloading is lost on an interrupt
+FLUSH_CANDLES = 50000
+
+Range = Tuple[int, int]
+
+
+@dataclass
+class DownloadResult:
+    exchange: str
+    symbol: str
+    timeframe: str
+    start: int
+    end: int
+    pages: int = 0
+    fetched: int = 0
+    already_cached: int = 0
+    invalid: int = 0
+    empty_ranges: List[Range] = field(default_factory=list)
+    failed: List[Range] = field(default_factory=list)
+    holes: List[Range] = field(default_factory=list)  # still missing after the download
+    seconds: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return not self.holes
+
+    @property
+    def rate(self) -> float:
+        return self.fetched / self.seconds if self.seconds > 0 else 0.0
+
+
+def plan_pages(ranges: Sequence[Range], step: int, page: int) -> List[Range]:
+    """Split [start, end) ranges into pages of at most `page` candles."""
+    pages = []
+    for start, end in ranges:
+        cursor = start
+        while cursor < end:
+            pages.append((cursor, min(end, cursor + page * step)))
+            cursor += page * step
+    return pages
+
+
+def validate_page(candles: Sequence[OHLCV], start: int, end: int, timeframe: str) -> Tuple[List[OHLCV], int]:
+    """Candles of one page that belong in it, and how many were rejected."""
+    valid = []
+    for c in candles:
+        values = (c.open, c.high, c.low, c.close, c.volume)
+        if (
+            start <= c.timestamp < end
+            and candle_open(c.timestamp, timeframe) == c.timestamp
+            and all(math.isfinite(v) for v in values)
+            and c.low <= min(c.open, c.close) and c.high >= max(c.open, c.close)
+        ):
+            valid.append(c)
+    return valid, len(candles) - len(valid)
+
+
+def download_history(
+    coin: str,
+    timeframe: str,
+    start: int,
+    end: Optional[int] = None,
+    exchange: str = "binance",
+    quote: str = "USDT",
+    store: Optional[CandleStore] = None,
+    manager: Optional[ExchangeManager] = None,
+    workers: int = DOWNLOAD_WORKERS,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> DownloadResult:
+    """Fill the candle cache with closed `timeframe` candles of `coin` in [start, end).
+
+    `end` defaults to the open of the current (unclosed) candle. `progress`
+    is called with (pages done, pages total).
+    """
+    started = time.time()
+    step = timeframe_seconds(timeframe)
+    latest = candle_open(started, timeframe)
+    start = candle_open(start, timeframe)
+    end = latest if end is None else min(candle_open(end, timeframe), latest)
+
+    store = store or CandleStore()
+    manager = manager or ExchangeManager([exchange])
+    if exchange not in manager.exchanges:
+        raise ExchangeError(f"Exchange {exchange} not available")
+    ex = manager.exchanges[exchange]
+    if timeframe not in ex.TIMEFRAME_MAP:
+        raise ExchangeError(f"{exchange} has no {timeframe} candles")
+    symbol = ex.normalize_symbol(coin, "USD" if exchange == "coinbase" else quote)
+    page = PAGE_SIZES.get(exchange, 1000)
+
+    result = DownloadResult(exchange, symbol, timeframe, start, end)
+    series = store.load(exchange, symbol, timeframe)
+    result.already_cached = len(series.between(start, end))
+    known_gaps = store.info(exchange, symbol, timeframe).get("known_gaps", [])
+    missing = store.missing_ranges(series, start, end, step, known_gaps)
+    pages = plan_pages(missing, step, page)
+    result.pages = len(pages)
+    if not pages:
+        result.seconds = time.time() - started
+        return result
+
+    def fetch(page_range: Range) -> Tuple[List[OHLCV], int]:
+        s, e = page_range
+        for attempt in range(PAGE_RETRIES + 1):
+            try:
+                # both exchanges include the candle at the end time
+                candles = ex.get_candles(symbol, timeframe, page, s, e - 1)
+                return validate_page(candles, s, e, timeframe)
+            except ExchangeError as err:
+                if attempt >= PAGE_RETRIES:
+                    raise
+                print(f"[Download] {symbol} {timeframe} page {s}: {err}; retrying")
+                time.sleep(RETRY_DELAY * (attempt + 1))
+        return [], 0
+
+    pending: List[OHLCV] = []
+    empty: List[Range] = []
+    last_flush = time.time()
+
+    def flush():
+        nonlocal pending, empty, last_flush
+        if pending or empty:
+            store.merge(exchange, symbol, timeframe, pending, known_gaps=empty)
+            result.empty_ranges.extend(empty)
+        pending, empty, last_flush = [], [], time.time()
+
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="candle-download")
+    try:
+        futures = {pool.submit(fetch, p): p for p in pages}
+        for future in as_completed(futures):
+            s, e = futures[future]
+            done += 1
+            if progress is not None:
+                progress(done, len(pages))
+            try:
+                got, invalid = future.result()
+            except ExchangeError as err:
+                print(f"[Download] {symbol} {timeframe} page {s}-{e} failed: {err}")
+                result.failed.append((s, e))
+                continue
+            result.invalid += invalid
+            result.fetched += len(got)
+            pending.extend(got)
+            # closed stretches the exchange has no candles for; the newest may just be unpublished
+            holes = store.missing_ranges(CandleSeries.from_candles(got), s, e, step)
+            empty.extend((hs, he) for hs, he in holes if he <= latest - step)
+            if len(pending) >= FLUSH_CANDLES or time.time() - last_flush >= FLUSH_SECONDS:
+                flush()
+    except KeyboardInterrupt:
+        print(f"[Download] Interrupted; saving {len(pending)} downloaded candles (run again to resume)")
+        pool.shutdown(wait=False, cancel_futures=True)
+        flush()
+        raise
+    finally:
+        pool.shutdown(wait=True)
+    flush()
+
+    series = store.load(exchange, symbol, timeframe)
+    result.holes = store.missing_ranges(series, start, end, step,
+                                        store.info(exchange, symbol, timeframe).get("known_gaps", []))
+    result.seconds = time.time() - started
+    return result
+
+
+def parse_date(value: str) -> int:
+    """UTC timestamp from YYYY-MM-DD[THH:MM] or epoch seconds."""
+    if value.isdigit():
+        return int(value)
+    for fmt in ("%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return calendar.timegm(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Invalid date {value}; expected YYYY-MM-DD")
+
+
+def _fmt(ts: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.gmtime(ts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader bulk candle downloader")
+    parser.add_argument("coins", nargs="+", help="Coins, e.g. BTC ETH")
+    parser.add_argument("--timeframe", "-t", action="append", help="Timeframe (repeatable, default 1hour)")
+    parser.add_argument("--start", type=parse_date, required=True, help="UTC start date, e.g. 2018-01-01")
+    parser.add_argument("--end", type=parse_date, help="UTC end date (default: now)")
+    parser.add_argument("--exchange", "-e", default="binance", choices=sorted(PAGE_SIZES))
+    parser.add_argument("--workers", "-w", type=int, default=DOWNLOAD_WORKERS)
+    parser.add_argument("--cache-dir", help="Candle cache directory")
+
+    args = parser.parse_args()
+
+    timeframes = args.timeframe or ["1hour"]
+    store = CandleStore(args.cache_dir) if args.cache_dir else CandleStore()
+    manager = ExchangeManager([args.exchange])
+    ex = manager.exchanges.get(args.exchange)
+    unsupported = [tf for tf in timeframes if ex is not None and tf not in ex.TIMEFRAME_MAP]
+    if unsupported:
+        manager.close()
+        parser.error(f"{args.exchange} has no {', '.join(unsupported)} candles "
+                     f"(supported: {', '.join(ex.TIMEFRAME_MAP)})")
+
+    def report(done: int, total: int):
+        if done == total or done % 10 == 0:
+            print(f"\r  {done}/{total} pages", end="" if done < total else "\n", flush=True)
+
+    try:
+        for coin in args.coins:
+            for tf in timeframes:
+                print(f"{coin.upper()} {tf} {_fmt(args.start)} .. {_fmt(args.end) if args.end else 'now'}")
+                try:
+                    r = download_history(coin.upper(), tf, args.start, args.end, exchange=args.exchange,
+                                         store=store, manager=manager, workers=args.workers, progress=report)
+                except ExchangeError as e:
+                    print(f"  Error: {e}")
+                    continue
+                print(
+                    f"  {r.fetched} candles fetched in {r.pages} pages ({r.rate:,.0f}/s), "
+                    f"{r.already_cached} already cached, {r.invalid} rejected, "
+                    f"{len(r.empty_ranges)} empty ranges"
+                )
+                if r.failed:
+                    print(f"  {len(r.failed)} pages failed; run again to retry them")
+                for hs, he in r.holes[:10]:
+                    print(f"  missing {_fmt(hs)} .. {_fmt(he)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
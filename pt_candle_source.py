@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Candle Sources
+===============================
+One interface for "give me the closed candles of COIN/TIMEFRAME between two
+times", so the trainer (and anything else replaying history) does not care
+whether the candles come from an exchange, from files on disk or from memory.
+
+Sources:
+    ExchangeCandleSource  - Binance or Coinbase through pt_exchanges, optionally
+                            read through the candle cache (pt_candle_store.py)
+    CacheCandleSource     - candles already in the candle cache, no network
+    FileCandleSource      - {COIN}_{timeframe}.csv / .parquet files in a folder
+    ReplayCandleSource    - in-memory candles with a movable clock, for tests
+
+Every source returns closed candles only, oldest first, as pt_exchanges.OHLCV.
+CSV files hold timestamp,open,high,low,close,volume rows (header optional,
+timestamps in seconds or milliseconds). Parquet needs pandas with a parquet
+engine installed.
+
+Usage:
+    from pt_candle_source import source_from_spec
+
+    source = source_from_spec("file:data")          # or "exchange:binance", "cache:binance"
+    candles = source.get_candles("BTC", "1hour")    # full history
+    recent = source.get_candles("BTC", "1hour", start=source.now() - 86400)
+
+    # CLI: download closed candles once, then train from disk
+    python pt_candle_source.py export BTC --timeframes 1hour 1day --out data
+    python pt_trainer.py BTC --source file:data
+"""
+
+import os
+import csv
+import time
+import argparse
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from pt_exchanges import ExchangeError, ExchangeManager, OHLCV
+from pt_candle_store import CandleSeries, CandleStore, candle_open, timeframe_seconds
+from pt_candle_download import FLUSH_CANDLES
+
+try:
+    import pandas as pd
+    _PD_AVAILABLE = True
+except Exception:
+    pd = None
+    _PD_AVAILABLE = False
+
+
+CSV_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+DEFAULT_SOURCE = "exchange:binance"
+
+
+class CandleSourceError(Exception):
+    pass
+
+
+class CandleSource(ABC):
+    name = "source"
+
+    @abstractmethod
+    def get_candles(
+        self, coin: str, timeframe: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> List[OHLCV]:
+        """Closed candles with start <= timestamp < end, oldest first.
+
+        `start=None` means the earliest candle the source has, `end=None`
+        means up to the newest closed candle.
+        """
+
+    def now(self) -> int:
+        """Current time as the source sees it."""
+        return int(time.time())
+
+    def candles_since(self, coin: str, timeframe: str, since: int) -> List[OHLCV]:
+        """Closed candles newer than the `since` timestamp."""
+        return self.get_candles(coin, timeframe, start=int(since) + 1)
+
+    def close(self):
+        pass
+
+
+def _closed_end(now: int, timeframe: str, end: Optional[int]) -> int:
+    # candles at or after the current boundary are still open
+    boundary = candle_open(now, timeframe)
+    return boundary if end is None else min(int(end), boundary)
+
+
+class ExchangeCandleSource(CandleSource):
+    """Candles from Binance or Coinbase, paged back in exchange-sized windows."""
+
+    PAGE_SIZES = {"binance": 1000, "coinbase": 300}
+
+    def __init__(
+        self,
+        exchange: str = "binance",
+        manager: Optional[ExchangeManager] = None,
+        candle_store: Optional[CandleStore] = None,
+        quote: str = "USDT",
+        retries: int = 3,
+        retry_delay: float = 3.5,
+    ):
+        self.exchange_name = exchange
+        self.manager = manager or ExchangeManager([exchange])
+        if exchange not in self.manager.exchanges:
+            raise CandleSourceError(f"Exchange {exchange} not available")
+        self.exchange = self.manager.exchanges[exchange]
+        self.candle_store = candle_store
+        self.quote = "USD" if exchange == "coinbase" else quote
+        self.page = self.PAGE_SIZES.get(exchange, 1000)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.name = f"exchange:{exchange}"
+
+    def symbol(self, coin: str) -> str:
+        return self.exchange.normalize_symbol(coin, self.quote)
+
+    def _fetch(self, symbol: str, timeframe: str, start: int, end: int) -> List[OHLCV]:
+        for attempt in range(self.retries + 1):
+            try:
+                # the exchange end is inclusive; end - 1 keeps a window at `page` candles
+                candles = self.exchange.get_candles(symbol, timeframe, self.page, start, end - 1)
+                return [c for c in candles if start <= c.timestamp < end]
+            except ExchangeError as e:
+                if attempt >= self.retries:
+                    raise CandleSourceError(f"{self.name} {symbol} {timeframe}: {e}")
+                print(f"[CandleSource] {e}; retrying in {self.retry_delay * (attempt + 1):.1f}s")
+                time.sleep(self.retry_delay * (attempt + 1))
+        return []
+
+    def _window(self, symbol: str, timeframe: str, start: int, end: int) -> List[OHLCV]:
+        if self.candle_store is None:
+            step = timeframe_seconds(timeframe)
+            candles = []
+            cursor = start
+            while cursor < end:
+                chunk_end = min(end, cursor + self.page * step)
+                candles.extend(self._fetch(symbol, timeframe, cursor, chunk_end))
+                cursor = chunk_end
+            return candles
+        return self.candle_store.get(
+            self.exchange_name, symbol, timeframe, start, end,
+            fetch=lambda s, e: self._fetch(symbol, timeframe, s, e),
+            chunk=self.page, raise_errors=True,
+        )
+
+    def get_candles(self, coin, timeframe, start=None, end=None):
+        # checked before the cache is touched, so a fallback interval is never stored under `timeframe`
+        if timeframe not in self.exchange.TIMEFRAME_MAP:
+            raise CandleSourceError(f"{self.name} has no {timeframe} candles")
+        step = timeframe_seconds(timeframe)
+        symbol = self.symbol(coin)
+        end = _closed_end(self.now(), timeframe, end)
+        if start is not None:
+            return self._window(symbol, timeframe, int(start), end) if start < end else []
+
+        if self.candle_store is not None:
+            return self._walk_back_cached(symbol, timeframe, end)
+        # walk back one page at a time until the exchange has nothing older
+        pages = []
+        window_end = end
+        while True:
+            page = self._window(symbol, timeframe, window_end - self.page * step, window_end)
+            if not page:
+                break
+            pages.append(page)
+            window_end = page[0].timestamp
+        by_time = {c.timestamp: c for page in pages for c in page}
+        return [by_time[t] for t in sorted(by_time)]
+
+    def _walk_back_cached(self, symbol: str, timeframe: str, end: int) -> List[OHLCV]:
+        """The full-history walk back through the cache, merging fetched pages in FLUSH_CANDLES batches."""
+        store = self.candle_store
+        step = timeframe_seconds(timeframe)
+        series = store.load(self.exchange_name, symbol, timeframe)
+        known_gaps = store.info(self.exchange_name, symbol, timeframe).get("known_gaps", [])
+        pending: List[OHLCV] = []
+        empty: List[Tuple[int, int]] = []
+
+        def flush():
+            nonlocal series, pending, empty
+            if pending or empty:
+                series = store.merge(self.exchange_name, symbol, timeframe, pending, known_gaps=empty)
+            pending, empty = [], []
+
+        oldest = end
+        window_end = end
+        try:
+            while True:
+                window_start = window_end - self.page * step
+                fetched, holes = store.fetch_missing(
+                    series, window_start, window_end, step,
+                    fetch=lambda s, e: self._fetch(symbol, timeframe, s, e),
+                    known_gaps=known_gaps, chunk=self.page, raise_errors=True,
+                )
+                pending.extend(fetched)
+                empty.extend(holes)
+                page_start = min((c.timestamp for c in fetched), default=window_end)
+                cached = series.between(window_start, window_end)
+                if len(cached):
+                    page_start = min(page_start, int(cached.timestamps[0]))
+                if page_start == window_end:
+                    break  # the exchange has nothing older
+                oldest = window_end = page_start
+                if len(pending) >= FLUSH_CANDLES:
+                    flush()
+        finally:
+            flush()
+        return series.between(oldest, end).to_ohlcv()
+
+
+class CacheCandleSource(CandleSource):
+    """Candles already in the candle cache; never touches the network."""
+
+    def __init__(self, exchange: str = "binance", candle_store: Optional[CandleStore] = None,
+                 quote: str = "USDT"):
+        self.exchange_name = exchange
+        self.candle_store = candle_store or CandleStore()
+        self.quote = "USD" if exchange == "coinbase" else quote
+        self.name = f"cache:{exchange}"
+
+    def symbol(self, coin: str) -> str:
+        # same keys ExchangeCandleSource writes (Binance BTCUSDT, Coinbase BTC-USD)
+        separator = "-" if self.exchange_name in ("coinbase", "kucoin") else ""
+        return f"{coin.upper()}{separator}{self.quote}"
+
+    def get_candles(self, coin, timeframe, start=None, end=None):
+        series = self.candle_store.load(self.exchange_name, self.symbol(coin), timeframe)
+        return series.between(start, end).to_ohlcv()
+
+
+class FileCandleSource(CandleSource):
+    """Candles from {COIN}_{timeframe}.csv or .parquet files in a folder.
+
+    Each file is read once and kept as column arrays, so repeated requests
+    (three training phases, incremental runs) slice memory instead of
+    re-parsing the file.
+    """
+
+    def __init__(self, folder: str):
+        if not os.path.isdir(folder):
+            raise CandleSourceError(f"Candle folder {folder} does not exist")
+        self.folder = folder
+        self.name = f"file:{folder}"
+        self._series: Dict[Tuple[str, str], CandleSeries] = {}
+
+    def path_for(self, coin: str, timeframe: str) -> Optional[str]:
+        for ext in (".csv", ".parquet"):
+            path = os.path.join(self.folder, f"{coin.upper()}_{timeframe}{ext}")
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def series(self, coin: str, timeframe: str) -> CandleSeries:
+        key = (coin.upper(), timeframe)
+        if key not in self._series:
+            path = self.path_for(coin, timeframe)
+            if path is None:
+                raise CandleSourceError(f"No {coin.upper()}_{timeframe}.csv or .parquet in {self.folder}")
+            candles = read_parquet(path) if path.endswith(".parquet") else read_csv(path)
+            self._series[key] = CandleSeries.from_candles(candles)
+        return self._series[key]
+
+    def get_candles(self, coin, timeframe, start=None, end=None):
+        return self.series(coin, timeframe).between(start, end).to_ohlcv()
+
+
+class ReplayCandleSource(CandleSource):
+    """In-memory candles with a clock that can be moved forward.
+
+    Only candles that have closed by `clock` are visible, so a test can train,
+    advance() the clock and exercise incremental updates deterministically.
+    """
+
+    def __init__(
+        self,
+        candles: Dict[Union[str, Tuple[str, str]], Sequence[OHLCV]],
+        clock: Optional[int] = None,
+    ):
+        # keys are a timeframe (any coin) or a (coin, timeframe) pair
+        self._series = {
+            key if isinstance(key, str) else (key[0].upper(), key[1]): CandleSeries.from_candles(value)
+            for key, value in candles.items()
+        }
+        if clock is None:
+            clock = max(
+                (int(s.timestamps[-1]) + timeframe_seconds(k if isinstance(k, str) else k[1])
+                 for k, s in self._series.items() if len(s)),
+                default=0,
+            )
+        self.clock = int(clock)
+        self.name = "replay"
+
+    def now(self) -> int:
+        return self.clock
+
+    def advance(self, seconds: int):
+        self.clock += int(seconds)
+
+    def get_candles(self, coin, timeframe, start=None, end=None):
+        series = self._series.get((coin.upper(), timeframe), self._series.get(timeframe))
+        if series is None:
+            raise CandleSourceError(f"No replay candles for {coin} {timeframe}")
+        end = _closed_end(self.clock, timeframe, end)
+        return series.between(start, end).to_ohlcv()
+
+
+# ---- files ----
+
+def read_csv(path: str) -> List[OHLCV]:
+    candles = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().lower() in ("timestamp", "time", "date"):
+                continue
+            try:
+                ts = int(float(row[0]))
+                candles.append(OHLCV(
+                    timestamp=ts // 1000 if ts > 10**11 else ts,
+                    open=float(row[1]),
+                    high=float(row[2]),
+                    low=float(row[3]),
+                    close=float(row[4]),
+                    volume=float(row[5]) if len(row) > 5 and row[5] != "" else 0.0,
+                ))
+            except (IndexError, ValueError):
+                continue
+    return candles
+
+
+def write_csv(path: str, candles: Sequence[OHLCV]):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for c in candles:
+            writer.writerow([c.timestamp, repr(c.open), repr(c.high), repr(c.low), repr(c.close), repr(c.volume)])
+    os.replace(tmp_path, path)
+
+
+def read_parquet(path: str) -> List[OHLCV]:
+    if not _PD_AVAILABLE:
+        raise CandleSourceError(f"Reading {path} needs pandas with pyarrow or fastparquet installed")
+    try:
+        frame = pd.read_parquet(path, columns=list(CSV_COLUMNS))
+    except ImportError as e:
+        raise CandleSourceError(f"Reading {path} needs a parquet engine: {e}")
+    timestamps = frame["timestamp"]
+    if str(timestamps.dtype).startswith("datetime"):
+        timestamps = timestamps.astype("int64") // 10**9
+    return [
+        OHLCV(timestamp=int(t) // 1000 if int(t) > 10**11 else int(t),
+              open=float(o), high=float(h), low=float(l), close=float(c), volume=float(v))
+        for t, o, h, l, c, v in zip(timestamps, frame["open"], frame["high"], frame["low"],
+                                    frame["close"], frame["volume"])
+    ]
+
+
+def source_from_spec(spec: Optional[str] = None, candle_store: Optional[CandleStore] = None) -> CandleSource:
+    """Build a source from a command-line spec.
+
+    exchange[:binance|coinbase]   live exchange (through `candle_store` when given)
+    cache[:binance|coinbase]      candle cache only
+    file:FOLDER                   CSV / Parquet files
+    """
+    spec = (spec or DEFAULT_SOURCE).strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind == "exchange":
+        return ExchangeCandleSource(arg or "binance", candle_store=candle_store)
+    if kind == "cache":
+        return CacheCandleSource(arg or "binance", candle_store=candle_store)
+    if kind == "file":
+        if not arg:
+            raise CandleSourceError("file source needs a folder, e.g. file:data")
+        return FileCandleSource(arg)
+    raise CandleSourceError(f"Unknown candle source {spec}; expected exchange:NAME, cache:NAME or file:FOLDER")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader candle sources")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    export_parser = subparsers.add_parser("export", help="Save closed candles as CSV for FileCandleSource")
+    export_parser.add_argument("coins", nargs="+", help="Coins, e.g. BTC ETH")
+    export_parser.add_argument("--timeframes", "-t", nargs="+",
+                               default=["1hour", "2hour", "4hour", "8hour", "12hour", "1day", "1week"])
+    export_parser.add_argument("--source", "-s", default=DEFAULT_SOURCE, help="Source spec to read from")
+    export_parser.add_argument("--out", "-o", default="candle_data", help="Output folder")
+    export_parser.add_argument("--no-candle-cache", action="store_true", help="Do not read through candle_cache/")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        source = source_from_spec(args.source, None if args.no_candle_cache else CandleStore())
+        os.makedirs(args.out, exist_ok=True)
+        for coin in args.coins:
+            for timeframe in args.timeframes:
+                candles = source.get_candles(coin, timeframe)
+                path = os.path.join(args.out, f"{coin.upper()}_{timeframe}.csv")
+                write_csv(path, candles)
+                print(f"[CandleSource] {coin.upper()} {timeframe}: {len(candles)} candles -> {path}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
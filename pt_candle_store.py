@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Columnar Candle Cache
+======================================
+Local candle history shared by the trainer, the thinker/exchange layer and the
+backtester, so each of them stops re-downloading and re-parsing the same klines.
+
+One series per (exchange, symbol, timeframe), stored as one .npy file per column:
+
+    candle_cache/{exchange}/{symbol}/{timeframe}/
+        series.json            generation, count, first/last timestamp, known gaps
+        g{n}/timestamp.npy     int64 seconds, ascending, unique
+        g{n}/open.npy ...      float64 open, high, low, close, volume
+
+Reads memory-map the current generation. Writes build generation n+1 next to
+it and then swap series.json with os.replace, so readers never see a
+half-written series. Only closed candles are cached.
+
+get() works out which parts of the requested range are missing (before the
+first cached candle, after the last, and holes in between) and fetches only
+those ranges.
+
+Usage:
+    from pt_candle_store import CandleStore
+
+    store = CandleStore()
+    candles = store.get("binance", "BTCUSDT", "1hour", start, end,
+                        fetch=lambda s, e: exchange.get_candles("BTCUSDT", "1hour", 1000, s, e))
+
+    # CLI
+    python pt_candle_store.py info
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import argparse
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pt_exchanges import OHLCV
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+CANDLE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "candle_cache")
+META_FILE = "series.json"
+LOCK_FILE = ".lock"
+_LOAD_RETRIES = 5
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+TIMEFRAME_SECONDS = {
+    "1min": 60,
+    "5min": 300,
+    "15min": 900,
+    "30min": 1800,
+    "1hour": 3600,
+    "2hour": 7200,
+    "4hour": 14400,
+    "6hour": 21600,
+    "8hour": 28800,
+    "12hour": 43200,
+    "1day": 86400,
+    "1week": 604800,
+}
+
+# weekly candles open on Monday 00:00 UTC (as on Binance); the epoch was a Thursday
+WEEK_OFFSET = 4 * 86400
+
+FetchFn = Callable[[int, int], Sequence[OHLCV]]
+
+
+class CandleStoreError(Exception):
+    pass
+
+
+@contextmanager
+def _series_lock(folder: str):
+    """Exclusive lock on one series across processes (held for the whole merge)."""
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, LOCK_FILE), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10 s
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise CandleStoreError(f"Unknown timeframe {timeframe}")
+    return TIMEFRAME_SECONDS[timeframe]
+
+
+def candle_open(timestamp: float, timeframe: str) -> int:
+    """Open time of the candle that contains `timestamp`."""
+    step = timeframe_seconds(timeframe)
+    offset = WEEK_OFFSET if timeframe == "1week" else 0
+    return (int(timestamp) - offset) // step * step + offset
+
+
+def next_close(timestamp: float, timeframe: str) -> int:
+    """Close time (the next boundary) of the candle that contains `timestamp`."""
+    return candle_open(timestamp, timeframe) + timeframe_seconds(timeframe)
+
+
+def parse_kucoin_klines(rows: Iterable) -> List[OHLCV]:
+    """KuCoin kline rows [time, open, close, high, low, volume, ...] as OHLCV, in row order."""
+    candles = []
+    for row in rows:
+        try:
+            candles.append(OHLCV(
+                timestamp=int(float(row[0])),
+                open=float(row[1]),
+                close=float(row[2]),
+                high=float(row[3]),
+                low=float(row[4]),
+                volume=float(row[5]) if len(row) > 5 else 0.0,
+            ))
+        except (IndexError, TypeError, ValueError):
+            continue
+    return candles
+
+
+@dataclass
+class CandleSeries:
+    """Column arrays of one cached series (memory-mapped when read from disk)."""
+    timestamps: np.ndarray
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        return cls(np.empty(0, dtype=np.int64), *(np.empty(0, dtype=np.float64) for _ in range(5)))
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[OHLCV]) -> "CandleSeries":
+        by_time = {int(c.timestamp): c for c in candles}
+        ordered = [by_time[t] for t in sorted(by_time)]
+        return cls(
+            np.fromiter((c.timestamp for c in ordered), dtype=np.int64, count=len(ordered)),
+            np.fromiter((c.open for c in ordered), dtype=np.float64, count=len(ordered)),
+            np.fromiter((c.high for c in ordered), dtype=np.float64, count=len(ordered)),
+            np.fromiter((c.low for c in ordered), dtype=np.float64, count=len(ordered)),
+            np.fromiter((c.close for c in ordered), dtype=np.float64, count=len(ordered)),
+            np.fromiter((c.volume for c in ordered), dtype=np.float64, count=len(ordered)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def columns(self) -> Tuple[np.ndarray, ...]:
+        return (self.timestamps, self.opens, self.highs, self.lows, self.closes, self.volumes)
+
+    def between(self, start: Optional[int] = None, end: Optional[int] = None) -> "CandleSeries":
+        """Zero-copy slice of the candles with start <= timestamp < end."""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start, side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side="left"))
+        return CandleSeries(*(col[lo:hi] for col in self.columns()))
+
+    def to_ohlcv(self) -> List[OHLCV]:
+        return [
+            OHLCV(timestamp=int(t), open=o, high=h, low=l, close=c, volume=v)
+            for t, o, h, l, c, v in zip(
+                self.timestamps.tolist(), self.opens.tolist(), self.highs.tolist(),
+                self.lows.tolist(), self.closes.tolist(), self.volumes.tolist(),
+            )
+        ]
+
+    def gaps(self, step: int) -> List[Tuple[int, int]]:
+        """Holes inside the series as [start, end) ranges of missing candle times."""
+        if len(self) < 2:
+            return []
+        diffs = np.diff(self.timestamps)
+        holes = np.nonzero(diffs > step)[0]
+        return [(int(self.timestamps[i]) + step, int(self.timestamps[i + 1])) for i in holes]
+
+    def merged(self, other: "CandleSeries") -> "CandleSeries":
+        """Union of two series; candles in `other` win on equal timestamps."""
+        if len(self) == 0:
+            return other
+        if len(other) == 0:
+            return self
+        timestamps = np.concatenate([other.timestamps, self.timestamps])
+        _, first = np.unique(timestamps, return_index=True)
+        return CandleSeries(*(np.concatenate([o, s])[first] for o, s in zip(other.columns(), self.columns())))
+
+
+class CandleStore:
+    """Directory of cached candle series keyed by exchange, symbol and timeframe."""
+
+    def __init__(self, root: str = CANDLE_CACHE_DIR):
+        self.root = root
+
+    # ---- paths / metadata ----
+
+    def series_dir(self, exchange: str, symbol: str, timeframe: str) -> str:
+        safe_symbol = re.sub(r"[^A-Za-z0-9_-]", "_", symbol.upper())
+        return os.path.join(self.root, exchange.lower(), safe_symbol, timeframe)
+
+    def _read_meta(self, folder: str) -> dict:
+        try:
+            with open(os.path.join(folder, META_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # ---- reads ----
+
+    def load(self, exchange: str, symbol: str, timeframe: str) -> CandleSeries:
+        """Memory-mapped view of the cached series (empty when nothing is cached)."""
+        folder = self.series_dir(exchange, symbol, timeframe)
+        for _ in range(_LOAD_RETRIES):
+            meta = self._read_meta(folder)
+            if "generation" not in meta:
+                return CandleSeries.empty()
+            gen_dir = os.path.join(folder, f"g{meta['generation']}")
+            try:
+                columns = [np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode="r") for name in COLUMNS]
+                break
+            except (OSError, ValueError) as e:
+                # a writer published and cleaned up between reading series.json and opening the columns
+                if self._read_meta(folder).get("generation") != meta["generation"]:
+                    continue
+                print(f"[CandleStore] Could not read {gen_dir}: {e}")
+                return CandleSeries.empty()
+        else:
+            return CandleSeries.empty()
+        if len({len(col) for col in columns}) != 1:
+            print(f"[CandleStore] Column lengths differ in {gen_dir}, ignoring it")
+            return CandleSeries.empty()
+        return CandleSeries(*columns)
+
+    def info(self, exchange: str, symbol: str, timeframe: str) -> dict:
+        return self._read_meta(self.series_dir(exchange, symbol, timeframe))
+
+    # ---- writes ----
+
+    def merge(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        candles: Sequence[OHLCV],
+        known_gaps: Sequence[Tuple[int, int]] = (),
+        now: Optional[float] = None,
+    ) -> CandleSeries:
+        """Add closed candles to the series and publish a new generation.
+
+        Safe across processes: the whole read-merge-publish runs under a
+        per-series file lock, and each generation is built in a private temp
+        directory that is renamed into place, so no file a reader has mapped
+        is ever rewritten.
+        """
+        step = timeframe_seconds(timeframe)
+        cutoff = (time.time() if now is None else now) - step
+        closed = [c for c in candles if c.timestamp <= cutoff]
+        if not closed and not known_gaps:
+            return self.load(exchange, symbol, timeframe)
+        folder = self.series_dir(exchange, symbol, timeframe)
+
+        with _series_lock(folder):
+            # re-read under the lock: another process may have published since
+            meta = self._read_meta(folder)
+            gaps = [tuple(g) for g in meta.get("known_gaps", [])] + [tuple(g) for g in known_gaps]
+            series = self.load(exchange, symbol, timeframe).merged(CandleSeries.from_candles(closed))
+            generation = int(meta.get("generation", -1)) + 1
+
+            tmp_dir = os.path.join(folder, f".tmp-g{generation}-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+            os.makedirs(tmp_dir)
+            try:
+                for name, col in zip(COLUMNS, series.columns()):
+                    np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(col))
+                gen_dir = os.path.join(folder, f"g{generation}")
+                # a leftover from a writer that died before swapping series.json; nobody reads it
+                shutil.rmtree(gen_dir, ignore_errors=True)
+                os.rename(tmp_dir, gen_dir)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+            new_meta = {
+                "exchange": exchange.lower(),
+                "symbol": symbol.upper(),
+                "timeframe": timeframe,
+                "generation": generation,
+                "count": len(series),
+                "first": int(series.timestamps[0]) if len(series) else None,
+                "last": int(series.timestamps[-1]) if len(series) else None,
+                "known_gaps": sorted(set(gaps)),
+                "updated_at": int(time.time()),
+            }
+            tmp_path = os.path.join(folder, META_FILE + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(new_meta, f, indent=2)
+            os.replace(tmp_path, os.path.join(folder, META_FILE))
+            self._remove_old_generations(folder, generation)
+        return self.load(exchange, symbol, timeframe)
+
+    def _remove_old_generations(self, folder: str, keep: int):
+        """Called under the series lock, so temp dirs left here belong to writers that died."""
+        for name in os.listdir(folder):
+            m = re.match(r"^g(\d+)$", name)
+            if name.startswith(".tmp-g") or (m and int(m.group(1)) < keep):
+                # a reader may still have the old columns mapped (Windows refuses the delete)
+                shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+
+    # ---- gap filling ----
+
+    def missing_ranges(self, series: CandleSeries, start: int, end: int, step: int,
+                       known_gaps: Sequence[Tuple[int, int]] = ()) -> List[Tuple[int, int]]:
+        """[start, end) ranges inside the request that the cache cannot answer."""
+        if len(series) == 0:
+            ranges = [(start, end)]
+        else:
+            first = int(series.timestamps[0])
+            last = int(series.timestamps[-1])
+            ranges = []
+            if start < first:
+                ranges.append((start, min(first, end)))
+            ranges.extend((max(s, start), min(e, end)) for s, e in series.gaps(step) if s < end and e > start)
+            if last + step < end:
+                ranges.append((max(last + step, start), end))
+        for gap_start, gap_end in sorted(tuple(g) for g in known_gaps):
+            remaining = []
+            for s, e in ranges:
+                if gap_end <= s or gap_start >= e:
+                    remaining.append((s, e))
+                    continue
+                if s < gap_start:
+                    remaining.append((s, gap_start))
+                if gap_end < e:
+                    remaining.append((gap_end, e))
+            ranges = remaining
+        return [(s, e) for s, e in ranges if e - s >= step]
+
+    def get(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: int,
+        end: int,
+        fetch: Optional[FetchFn] = None,
+        chunk: int = 1000,
+        raise_errors: bool = False,
+    ) -> List[OHLCV]:
+        """Closed candles with start <= timestamp < end, fetching only what is missing.
+
+        `fetch(range_start, range_end)` returns the exchange candles for one
+        range of at most `chunk` candles. A failing fetch is logged and the
+        cached candles are returned, unless `raise_errors` is set.
+        """
+        step = timeframe_seconds(timeframe)
+        series = self.load(exchange, symbol, timeframe)
+        if fetch is not None:
+            known_gaps = self.info(exchange, symbol, timeframe).get("known_gaps", [])
+            fetched, empty = self.fetch_missing(series, start, end, step, fetch, known_gaps, chunk, raise_errors)
+            if fetched or empty:
+                series = self.merge(exchange, symbol, timeframe, fetched, known_gaps=empty)
+        return series.between(start, end).to_ohlcv()
+
+    def fetch_missing(
+        self,
+        series: CandleSeries,
+        start: int,
+        end: int,
+        step: int,
+        fetch: FetchFn,
+        known_gaps: Sequence[Tuple[int, int]] = (),
+        chunk: int = 1000,
+        raise_errors: bool = False,
+    ) -> Tuple[List[OHLCV], List[Tuple[int, int]]]:
+        """Fetch what `series` lacks in [start, end) without merging it.
+
+        Returns the fetched candles and the ranges the exchange confirmed
+        empty, for one merge() covering several calls.
+        """
+        fetched = []
+        empty = []
+        closed_until = time.time() - step
+        for range_start, range_end in self.missing_ranges(series, start, end, step, known_gaps):
+            got, complete = self._fetch_range(fetch, range_start, range_end, step, chunk, raise_errors)
+            fetched.extend(got)
+            if not complete:
+                continue
+            # remember ranges the exchange confirmed empty (before listing, halts),
+            # but not the newest candles, which may simply not be published yet
+            holes = self.missing_ranges(CandleSeries.from_candles(got), range_start, range_end, step)
+            empty.extend((s, e) for s, e in holes if e <= closed_until)
+        return fetched, empty
+
+    def _fetch_range(self, fetch: FetchFn, start: int, end: int, step: int,
+                     chunk: int, raise_errors: bool = False) -> Tuple[List[OHLCV], bool]:
+        """Candles of one missing range, and whether every chunk was fetched."""
+        candles = []
+        cursor = start
+        while cursor < end:
+            chunk_end = min(end, cursor + chunk * step)
+            try:
+                got = fetch(cursor, chunk_end)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                print(f"[CandleStore] Fetch {cursor}-{chunk_end} failed: {e}")
+                return candles, False
+            candles.extend(c for c in got if cursor <= c.timestamp < chunk_end)
+            cursor = chunk_end
+        return candles, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader candle cache")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    info_parser = subparsers.add_parser("info", help="List cached series")
+    info_parser.add_argument("root", nargs="?", default=CANDLE_CACHE_DIR, help="Cache directory")
+
+    args = parser.parse_args()
+
+    if args.command == "info":
+        if not os.path.isdir(args.root):
+            print(f"No candle cache at {args.root}")
+            return
+        for dirpath, _, filenames in sorted(os.walk(args.root)):
+            if META_FILE not in filenames:
+                continue
+            with open(os.path.join(dirpath, META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            first = time.strftime("%Y-%m-%d %H:%M", time.gmtime(meta["first"])) if meta.get("first") else "-"
+            last = time.strftime("%Y-%m-%d %H:%M", time.gmtime(meta["last"])) if meta.get("last") else "-"
+            print(
+                f"{meta.get('exchange', '?'):<9} {meta.get('symbol', '?'):<12} {meta.get('timeframe', '?'):<7} "
+                f"{meta.get('count', 0):>8} candles  {first} .. {last}  gaps={len(meta.get('known_gaps', []))}"
+            )
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,9 @@ Usage:
     price = manager.get_price("BTC", exchange="binance")
     candles = manager.get_candles("ETH", timeframe="1hour", limit=100)
 
-    # Aggregated across exchanges
+    # Aggregated across exchanges (queried concurrently, returns once a majority answered)
     agg_price = manager.get_aggregated_price("BTC")
+    tickers = manager.get_all_tickers("BTC", quorum=2, timeouts={"coinbase": 1.5})
 
     # CLI
     python pt_exchanges.py price BTC
@@ -25,17 +26,27 @@ Usage:
 
 import time
 import hmac
+import random
 import hashlib
+import threading
 import requests
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Any
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Dict, Optional, Tuple, Any
 from enum import Enum
 import argparse
 import json
 import statistics
 
+from pt_http import get_session
+from pt_rate_limit import BINANCE_LIMITS, COINBASE_LIMITS, PENALTY_STATUSES, get_limiter
+
+# a GET answered 429/418 is retried this many times, after the limiter's pause
+PENALTY_RETRIES = 2
+PENALTY_JITTER = 0.5  # up to this many seconds added after the pause, so paused threads don't retry at once
+
 
 class ExchangeType(Enum):
     BINANCE = "binance"
@@ -74,34 +85,53 @@ class OrderBook:
     bids: List[Tuple[float, float]]  # [(price, quantity), ...]
     asks: List[Tuple[float, float]]
     timestamp: datetime
+    sequence: Optional[int] = None  # id of the last update included (Binance lastUpdateId, Coinbase sequence)
 
 
 class ExchangeBase(ABC):
+    # pt_rate_limit budget for this exchange (name, limit per window, burst, weight header)
+    RATE_LIMITS: Dict[str, Any] = dict(name="default", limit=10, window=1.0)
+
     def __init__(self):
-        self.rate_limit_delay = 0.1
-        self.last_request_time = 0
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "PowerTrader-AI/1.0"})
-
-    def _rate_limit(self):
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
-
-    def _request(self, method: str, url: str, **kwargs) -> dict:
-        self._rate_limit()
-        try:
-            resp = self.session.request(method, url, timeout=10, **kwargs)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException as e:
-            raise ExchangeError(f"{self.__class__.__name__} request failed: {e}")
+        self.request_timeout = 10
+        # shared keep-alive pools; the transport retries 5xx, 429/418 are retried in _request (pt_http.py)
+        self.session = get_session()
+        # one token bucket per exchange for the whole process, costed in request weight
+        self.rate_limiter = get_limiter(**self.RATE_LIMITS)
+
+    def close(self):
+        """Release threads the client started; the shared HTTP session stays open."""
+
+    def _request(self, method: str, url: str, weight: float = 1, **kwargs) -> dict:
+        attempts = PENALTY_RETRIES + 1 if method.upper() == "GET" else 1
+        for attempt in range(attempts):
+            # waits out any 429/418 pause the limiter is holding
+            self.rate_limiter.acquire(weight)
+            try:
+                resp = self.session.request(method, url, timeout=self.request_timeout, **kwargs)
+                self.rate_limiter.observe(resp.headers, resp.status_code)
+                if resp.status_code in PENALTY_STATUSES and attempt + 1 < attempts:
+                    time.sleep(random.uniform(0, PENALTY_JITTER))
+                    continue
+                resp.raise_for_status()
+                return resp.json()
+            except requests.RequestException as e:
+                raise ExchangeError(f"{self.__class__.__name__} request failed: {e}")
 
     @abstractmethod
     def get_ticker(self, symbol: str) -> Ticker:
         pass
 
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Ticker]:
+        """Tickers for many symbols; symbols that fail are left out. Exchanges with a bulk endpoint override this."""
+        results = {}
+        for symbol in symbols:
+            try:
+                results[symbol] = self.get_ticker(symbol)
+            except ExchangeError as e:
+                print(f"Warning: {self.__class__.__name__} {symbol} ticker failed: {e}")
+        return results
+
     @abstractmethod
     def get_candles(self, symbol: str, timeframe: str, limit: int) -> List[OHLCV]:
         pass
@@ -123,6 +153,15 @@ class ExchangeError(Exception):
     pass
 
 
+# seconds each exchange gets to answer a fan-out request before it is left out
+EXCHANGE_TIMEOUTS = {"binance": 2.0, "coinbase": 3.0}
+DEFAULT_EXCHANGE_TIMEOUT = 3.0
+# tickers younger than this are served from snapshot_all's cache
+SNAPSHOT_TTL = 2.0
+# levels fetched to seed a streamed local order book (Binance weight 50)
+BOOK_SNAPSHOT_DEPTH = 1000
+
+
 # KuCoin integration removed due to regional restrictions (US jurisdiction).
 # KuCoin-specific classes and enums were intentionally removed.
 
@@ -144,20 +183,57 @@ class BinanceExchange(ExchangeBase):
         "1week": "1w",
     }
 
+    RATE_LIMITS = BINANCE_LIMITS
+
     def normalize_symbol(self, coin: str, quote: str = "USDT") -> str:
         return f"{coin.upper()}{quote.upper()}"
 
+    @staticmethod
+    def ticker_weight(symbols: int) -> int:
+        """Request weight of /ticker/24hr for a `symbols` list."""
+        if symbols <= 20:
+            return 2
+        return 40 if symbols <= 100 else 80
+
+    @staticmethod
+    def depth_weight(limit: int) -> int:
+        """Request weight of /depth for an order book `limit`."""
+        for max_limit, weight in ((100, 5), (500, 25), (1000, 50)):
+            if limit <= max_limit:
+                return weight
+        return 250
+
     def normalize_timeframe(self, tf: str) -> str:
-        return self.TIMEFRAME_MAP.get(tf, "1h")
+        if tf not in self.TIMEFRAME_MAP:
+            raise ExchangeError(f"Binance has no {tf} candles (supported: {', '.join(self.TIMEFRAME_MAP)})")
+        return self.TIMEFRAME_MAP[tf]
 
     def get_ticker(self, symbol: str) -> Ticker:
         data = self._request(
-            "GET", f"{self.BASE_URL}/api/v3/ticker/24hr", params={"symbol": symbol}
+            "GET", f"{self.BASE_URL}/api/v3/ticker/24hr", params={"symbol": symbol}, weight=2
         )
+        return self._parse_ticker(data)
+
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Ticker]:
+        """All symbols in one /ticker/24hr request (a single unknown symbol fails it, so then one by one)."""
+        if len(symbols) <= 1:
+            return super().get_tickers(symbols)
+        try:
+            data = self._request(
+                "GET",
+                f"{self.BASE_URL}/api/v3/ticker/24hr",
+                params={"symbols": json.dumps(list(symbols), separators=(",", ":"))},
+                weight=self.ticker_weight(len(symbols)),
+            )
+        except ExchangeError as e:
+            print(f"Warning: binance bulk ticker failed ({e}); fetching symbols one by one")
+            return super().get_tickers(symbols)
+        return {item["symbol"]: self._parse_ticker(item) for item in data}
 
+    def _parse_ticker(self, data: dict) -> Ticker:
         return Ticker(
             exchange="binance",
-            symbol=symbol,
+            symbol=data["symbol"],
             price=float(data["lastPrice"]),
             bid=float(data["bidPrice"]),
             ask=float(data["askPrice"]),
@@ -184,7 +260,7 @@ class BinanceExchange(ExchangeBase):
         if end_time:
             params["endTime"] = end_time * 1000
 
-        data = self._request("GET", f"{self.BASE_URL}/api/v3/klines", params=params)
+        data = self._request("GET", f"{self.BASE_URL}/api/v3/klines", params=params, weight=2)
 
         candles = []
         for c in data:
@@ -206,6 +282,7 @@ class BinanceExchange(ExchangeBase):
             "GET",
             f"{self.BASE_URL}/api/v3/depth",
             params={"symbol": symbol, "limit": depth},
+            weight=self.depth_weight(depth),
         )
 
         return OrderBook(
@@ -214,31 +291,68 @@ class BinanceExchange(ExchangeBase):
             bids=[(float(b[0]), float(b[1])) for b in data["bids"]],
             asks=[(float(a[0]), float(a[1])) for a in data["asks"]],
             timestamp=datetime.now(),
+            sequence=data.get("lastUpdateId"),
         )
 
 
 class CoinbaseExchange(ExchangeBase):
     BASE_URL = "https://api.exchange.coinbase.com"
 
+    # the only granularities /products/{id}/candles accepts; anything else is rejected
     TIMEFRAME_MAP = {
         "1min": 60,
         "5min": 300,
         "15min": 900,
-        "30min": 1800,
         "1hour": 3600,
-        "4hour": 14400,
+        "6hour": 21600,
         "1day": 86400,
     }
 
+    # /stats only supplies the 24h volume, so it is refreshed at most this often
+    STATS_TTL = 60.0
+    RATE_LIMITS = COINBASE_LIMITS
+
+    def __init__(self):
+        super().__init__()
+        self._stats: Dict[str, Tuple[float, dict]] = {}
+        self._stats_pool: Optional[ThreadPoolExecutor] = None
+        self._stats_pool_lock = threading.Lock()
+
+    def _stats_executor(self) -> ThreadPoolExecutor:
+        with self._stats_pool_lock:
+            if self._stats_pool is None:
+                self._stats_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="coinbase-stats")
+            return self._stats_pool
+
+    def close(self):
+        with self._stats_pool_lock:
+            if self._stats_pool is not None:
+                self._stats_pool.shutdown(wait=False)
+                self._stats_pool = None
+
     def normalize_symbol(self, coin: str, quote: str = "USD") -> str:
         return f"{coin.upper()}-{quote.upper()}"
 
     def normalize_timeframe(self, tf: str) -> int:
-        return self.TIMEFRAME_MAP.get(tf, 3600)
+        if tf not in self.TIMEFRAME_MAP:
+            raise ExchangeError(f"Coinbase has no {tf} candles (supported: {', '.join(self.TIMEFRAME_MAP)})")
+        return self.TIMEFRAME_MAP[tf]
+
+    def _get_stats(self, symbol: str) -> dict:
+        data = self._request("GET", f"{self.BASE_URL}/products/{symbol}/stats")
+        self._stats[symbol] = (time.time(), data)
+        return data
 
     def get_ticker(self, symbol: str) -> Ticker:
-        ticker_data = self._request("GET", f"{self.BASE_URL}/products/{symbol}/ticker")
-        stats_data = self._request("GET", f"{self.BASE_URL}/products/{symbol}/stats")
+        cached = self._stats.get(symbol)
+        if cached is not None and time.time() - cached[0] < self.STATS_TTL:
+            ticker_data = self._request("GET", f"{self.BASE_URL}/products/{symbol}/ticker")
+            stats_data = cached[1]
+        else:
+            # ticker and stats in parallel instead of back to back
+            stats_future = self._stats_executor().submit(self._get_stats, symbol)
+            ticker_data = self._request("GET", f"{self.BASE_URL}/products/{symbol}/ticker")
+            stats_data = stats_future.result()
 
         return Ticker(
             exchange="coinbase",
@@ -250,6 +364,20 @@ class CoinbaseExchange(ExchangeBase):
             timestamp=datetime.now(),
         )
 
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Ticker]:
+        """The public API has no multi-product ticker, so symbols are fetched concurrently."""
+        if len(symbols) <= 1:
+            return super().get_tickers(symbols)
+        with ThreadPoolExecutor(max_workers=min(4, len(symbols)), thread_name_prefix="coinbase-ticker") as pool:
+            futures = {symbol: pool.submit(self.get_ticker, symbol) for symbol in symbols}
+        results = {}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = future.result()
+            except ExchangeError as e:
+                print(f"Warning: CoinbaseExchange {symbol} ticker failed: {e}")
+        return results
+
     def get_candles(
         self,
         symbol: str,
@@ -261,10 +389,11 @@ class CoinbaseExchange(ExchangeBase):
         granularity = self.normalize_timeframe(timeframe)
 
         params = {"granularity": granularity}
+        # explicit UTC offsets; naive local times shift the window on non-UTC machines
         if start_time:
-            params["start"] = datetime.fromtimestamp(start_time).isoformat()
+            params["start"] = datetime.fromtimestamp(start_time, tz=timezone.utc).isoformat()
         if end_time:
-            params["end"] = datetime.fromtimestamp(end_time).isoformat()
+            params["end"] = datetime.fromtimestamp(end_time, tz=timezone.utc).isoformat()
 
         data = self._request(
             "GET", f"{self.BASE_URL}/products/{symbol}/candles", params=params
@@ -286,8 +415,9 @@ class CoinbaseExchange(ExchangeBase):
         return sorted(candles, key=lambda x: x.timestamp)
 
     def get_orderbook(self, symbol: str, depth: int = 20) -> OrderBook:
+        # level 2 is the whole aggregated book; level 1 is just the best bid/ask
         data = self._request(
-            "GET", f"{self.BASE_URL}/products/{symbol}/book", params={"level": 2}
+            "GET", f"{self.BASE_URL}/products/{symbol}/book", params={"level": 1 if depth <= 1 else 2}
         )
 
         return OrderBook(
@@ -296,12 +426,15 @@ class CoinbaseExchange(ExchangeBase):
             bids=[(float(b[0]), float(b[1])) for b in data["bids"][:depth]],
             asks=[(float(a[0]), float(a[1])) for a in data["asks"][:depth]],
             timestamp=datetime.now(),
+            sequence=data.get("sequence"),
         )
 
 
 class ExchangeManager:
-    def __init__(self, enabled_exchanges: Optional[List[str]] = None):
+    def __init__(self, enabled_exchanges: Optional[List[str]] = None, candle_store=None):
         self.exchanges: Dict[str, ExchangeBase] = {}
+        # optional pt_candle_store.CandleStore; get_candles then reads closed candles through it
+        self.candle_store = candle_store
 
         available = {
             "binance": BinanceExchange,
@@ -318,6 +451,113 @@ class ExchangeManager:
                 except Exception as e:
                     print(f"Warning: Could not initialize {name}: {e}")
 
+        self.timeouts = {name: EXCHANGE_TIMEOUTS.get(name, DEFAULT_EXCHANGE_TIMEOUT) for name in self.exchanges}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._ticker_cache: Dict[Tuple[str, str], Tuple[float, Ticker]] = {}  # (exchange, symbol) -> (time, ticker)
+        # optional pt_market_stream.MarketStream; fresh streamed data is read before REST
+        self.stream = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=max(4, 2 * len(self.exchanges)), thread_name_prefix="exchange"
+                )
+            return self._pool
+
+    def fan_out(
+        self,
+        call: Callable[[str, ExchangeBase], Any],
+        quorum: Optional[int] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        what: str = "request",
+    ) -> Dict[str, Any]:
+        """Run call(name, exchange) on every exchange at once.
+
+        Returns {name: result} as soon as `quorum` exchanges have answered
+        (default: a majority, e.g. 2 of 3), or once the others have failed or
+        run past their timeout. Latency is that of the slowest quorum member
+        instead of the sum of all requests; late answers are dropped.
+        """
+        if not self.exchanges:
+            return {}
+        timeouts = {**self.timeouts, **(timeouts or {})}
+        start = time.monotonic()
+        pool = self._executor()
+        futures = {pool.submit(call, name, ex): name for name, ex in self.exchanges.items()}
+        deadlines = {f: start + timeouts.get(name, DEFAULT_EXCHANGE_TIMEOUT) for f, name in futures.items()}
+        need = min(quorum or len(futures) // 2 + 1, len(futures))
+
+        results: Dict[str, Any] = {}
+        pending = set(futures)
+        while pending and len(results) < need:
+            now = time.monotonic()
+            for f in [f for f in pending if deadlines[f] <= now and not f.done()]:
+                pending.discard(f)
+                print(f"Warning: {futures[f]} {what} timed out after {timeouts.get(futures[f], DEFAULT_EXCHANGE_TIMEOUT):.1f}s")
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=max(0.0, min(deadlines[f] for f in pending) - now),
+                           return_when=FIRST_COMPLETED)
+            for f in done:
+                pending.discard(f)
+                try:
+                    results[futures[f]] = f.result()
+                except Exception as e:
+                    print(f"Warning: {futures[f]} {what} failed: {e}")
+        # answers that arrived together with the last quorum member still count
+        for f in pending:
+            if f.done() and f.exception() is None:
+                results[futures[f]] = f.result()
+        return results
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+        for exchange in self.exchanges.values():
+            exchange.close()
+
+    def start_stream(
+        self, coins: List[str], timeframes: Optional[List[str]] = None, depth: bool = True,
+        quote: str = "USDT", urls: Optional[Dict[str, str]] = None, local_books: bool = False,
+    ):
+        """Stream tickers (plus klines / top-of-book depth on Binance) for `coins` over WebSockets.
+
+        Prices, tickers, snapshots and order books then come from the stream
+        while it is fresh and fall back to REST otherwise. With `local_books`
+        Binance books are kept whole from the diff-depth stream
+        (pt_orderbook.py) instead of the top 20 levels. Returns the
+        MarketStream, or None when websocket-client is not installed.
+        """
+        from pt_market_stream import MarketStream, stream_symbols
+
+        if self.stream is not None:
+            self.stream.stop()
+        order_books = None
+        if local_books and depth and "binance" in self.exchanges:
+            from pt_orderbook import OrderBookManager
+
+            binance = self.exchanges["binance"]
+            order_books = {"binance": OrderBookManager(
+                "binance", lambda symbol: binance.get_orderbook(symbol, BOOK_SNAPSHOT_DEPTH))}
+        stream = MarketStream(stream_symbols(self, coins, quote), timeframes or [], depth, urls=urls,
+                              order_books=order_books)
+        if not stream.start():
+            return None
+        self.stream = stream
+        print(f"[Stream] Streaming {len(coins)} coin(s) from {', '.join(c.exchange for c in stream.clients)}")
+        return stream
+
+    def _streamed_ticker(self, exchange: str, symbol: str) -> Optional[Ticker]:
+        stream = self.stream
+        return stream.ticker(exchange, symbol) if stream is not None else None
+
     def get_price(
         self, coin: str, exchange: str = "binance", quote: str = "USDT"
     ) -> float:
@@ -327,7 +567,7 @@ class ExchangeManager:
         ex = self.exchanges[exchange]
         q = "USD" if exchange == "coinbase" else quote
         symbol = ex.normalize_symbol(coin, q)
-        ticker = ex.get_ticker(symbol)
+        ticker = self._streamed_ticker(exchange, symbol) or ex.get_ticker(symbol)
         return ticker.price
 
     def get_ticker(
@@ -339,7 +579,7 @@ class ExchangeManager:
         ex = self.exchanges[exchange]
         q = "USD" if exchange == "coinbase" else quote
         symbol = ex.normalize_symbol(coin, q)
-        return ex.get_ticker(symbol)
+        return self._streamed_ticker(exchange, symbol) or ex.get_ticker(symbol)
 
     def get_candles(
         self,
@@ -355,7 +595,20 @@ class ExchangeManager:
         ex = self.exchanges[exchange]
         q = "USD" if exchange == "coinbase" else quote
         symbol = ex.normalize_symbol(coin, q)
-        return ex.get_candles(symbol, timeframe, limit)
+        if self.candle_store is None:
+            return ex.get_candles(symbol, timeframe, limit)
+
+        from pt_candle_store import candle_open, timeframe_seconds
+
+        step = timeframe_seconds(timeframe)
+        end = candle_open(time.time(), timeframe)
+        start = end - limit * step
+        chunk = 300 if exchange == "coinbase" else 1000
+        return self.candle_store.get(
+            exchange, symbol, timeframe, start, end,
+            fetch=lambda s, e: ex.get_candles(symbol, timeframe, chunk, s, e),
+            chunk=chunk,
+        )
 
     def get_orderbook(
         self, coin: str, exchange: str = "binance", depth: int = 20, quote: str = "USDT"
@@ -366,21 +619,106 @@ class ExchangeManager:
         ex = self.exchanges[exchange]
         q = "USD" if exchange == "coinbase" else quote
         symbol = ex.normalize_symbol(coin, q)
+        book = self.stream.orderbook(exchange, symbol, depth=depth) if self.stream is not None else None
+        if book is not None and len(book.bids) >= depth and len(book.asks) >= depth:
+            return OrderBook(book.exchange, book.symbol, book.bids[:depth], book.asks[:depth], book.timestamp,
+                             book.sequence)
         return ex.get_orderbook(symbol, depth)
 
-    def get_all_tickers(self, coin: str, quote: str = "USDT") -> Dict[str, Ticker]:
-        results = {}
-        for name, ex in self.exchanges.items():
-            try:
-                q = "USD" if name == "coinbase" else quote
-                symbol = ex.normalize_symbol(coin, q)
-                results[name] = ex.get_ticker(symbol)
-            except Exception as e:
-                print(f"Warning: {name} ticker failed: {e}")
-        return results
+    def estimate_fill(
+        self, coin: str, side: str, quantity: float, exchange: str = "binance",
+        depth: int = 100, quote: str = "USDT",
+    ):
+        """pt_orderbook.FillEstimate for a market order of `quantity` ("buy" / "sell").
 
-    def get_aggregated_price(self, coin: str, method: str = "median") -> Dict[str, Any]:
-        tickers = self.get_all_tickers(coin)
+        Uses the streamed local book when there is one, otherwise one REST
+        book of `depth` levels.
+        """
+        from pt_orderbook import LocalOrderBook
+
+        if exchange not in self.exchanges:
+            raise ExchangeError(f"Exchange {exchange} not available")
+        ex = self.exchanges[exchange]
+        symbol = ex.normalize_symbol(coin, "USD" if exchange == "coinbase" else quote)
+        local = self.stream.local_book(exchange, symbol) if self.stream is not None else None
+        if local is None:
+            local = LocalOrderBook.from_orderbook(ex.get_orderbook(symbol, depth))
+        return local.fill(side, quantity)
+
+    def get_all_tickers(
+        self, coin: str, quote: str = "USDT", quorum: Optional[int] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Ticker]:
+        """Tickers from every exchange, queried concurrently (see fan_out for quorum / timeouts)."""
+        def symbol_on(name: str, ex: ExchangeBase) -> str:
+            return ex.normalize_symbol(coin, "USD" if name == "coinbase" else quote)
+
+        if self.stream is not None:
+            streamed = {name: self._streamed_ticker(name, symbol_on(name, ex)) for name, ex in self.exchanges.items()}
+            if all(streamed.values()):
+                return streamed
+
+        def ticker(name: str, ex: ExchangeBase) -> Ticker:
+            symbol = symbol_on(name, ex)
+            return self._streamed_ticker(name, symbol) or ex.get_ticker(symbol)
+
+        return self.fan_out(ticker, quorum=quorum, timeouts=timeouts, what="ticker")
+
+    def get_tickers(self, coins: List[str], exchange: str = "binance", quote: str = "USDT") -> Dict[str, Ticker]:
+        """{coin: Ticker} for many coins on one exchange, in as few requests as it allows."""
+        if exchange not in self.exchanges:
+            raise ExchangeError(f"Exchange {exchange} not available")
+        ex = self.exchanges[exchange]
+        q = "USD" if exchange == "coinbase" else quote
+        symbols = {ex.normalize_symbol(coin, q): coin.upper() for coin in coins}
+        return {symbols[sym]: t for sym, t in ex.get_tickers(list(symbols)).items() if sym in symbols}
+
+    def snapshot_all(
+        self, coins: List[str], quote: str = "USDT", max_age: float = SNAPSHOT_TTL,
+        quorum: Optional[int] = None, timeouts: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Dict[str, Ticker]]:
+        """{coin: {exchange: Ticker}} for a whole watchlist: one bulk request per exchange, all exchanges at once.
+
+        Fresh streamed tickers (start_stream) are used first; tickers fetched
+        less than `max_age` seconds ago come from the cache, so back-to-back
+        scans only refetch what went stale. `quorum` / `timeouts`
+        work as in fan_out (default quorum: every exchange).
+        """
+        coins = [c.upper() for c in coins]
+        now = time.time()
+
+        def fetch(name: str, ex: ExchangeBase) -> Dict[str, Ticker]:
+            q = "USD" if name == "coinbase" else quote
+            symbols = {ex.normalize_symbol(coin, q): coin for coin in coins}
+            cached, stale = {}, []
+            for sym, coin in symbols.items():
+                streamed = self._streamed_ticker(name, sym)
+                if streamed is not None:
+                    cached[coin] = streamed
+                    continue
+                hit = self._ticker_cache.get((name, sym))
+                if hit is not None and now - hit[0] < max_age:
+                    cached[coin] = hit[1]
+                else:
+                    stale.append(sym)
+            if stale:
+                fetched = ex.get_tickers(stale)
+                stamp = time.time()
+                for sym, ticker in fetched.items():
+                    if sym in symbols:
+                        self._ticker_cache[(name, sym)] = (stamp, ticker)
+                        cached[symbols[sym]] = ticker
+            return cached
+
+        per_exchange = self.fan_out(fetch, quorum=quorum or len(self.exchanges), timeouts=timeouts, what="snapshot")
+        snapshot: Dict[str, Dict[str, Ticker]] = {coin: {} for coin in coins}
+        for name, tickers in per_exchange.items():
+            for coin, ticker in tickers.items():
+                snapshot[coin][name] = ticker
+        return snapshot
+
+    def get_aggregated_price(self, coin: str, method: str = "median", quorum: Optional[int] = None) -> Dict[str, Any]:
+        tickers = self.get_all_tickers(coin, quorum=quorum)
 
         if not tickers:
             raise ExchangeError(f"No price data available for {coin}")
@@ -417,8 +755,26 @@ class ExchangeManager:
     def detect_arbitrage(
         self, coin: str, min_spread_pct: float = 0.5
     ) -> Optional[Dict[str, Any]]:
-        tickers = self.get_all_tickers(coin)
-
+        # every exchange that answers in time, not just a majority
+        tickers = self.snapshot_all([coin], quorum=len(self.exchanges)).get(coin.upper(), {})
+        return self._arbitrage_from_tickers(coin, tickers, min_spread_pct)
+
+    def detect_arbitrage_all(
+        self, coins: List[str], min_spread_pct: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """Arbitrage opportunities across a whole watchlist from one snapshot, widest spread first."""
+        snapshot = self.snapshot_all(coins, quorum=len(self.exchanges))
+        found = []
+        for coin, tickers in snapshot.items():
+            opportunity = self._arbitrage_from_tickers(coin, tickers, min_spread_pct)
+            if opportunity:
+                found.append(opportunity)
+        return sorted(found, key=lambda o: o["spread_pct"], reverse=True)
+
+    @staticmethod
+    def _arbitrage_from_tickers(
+        coin: str, tickers: Dict[str, Ticker], min_spread_pct: float
+    ) -> Optional[Dict[str, Any]]:
         if len(tickers) < 2:
             return None
 
@@ -542,18 +898,17 @@ def main():
         print("\nScanning for arbitrage opportunities...")
         print("=" * 60)
         found = False
-        for coin in args.coins:
-            try:
-                arb = manager.detect_arbitrage(coin.upper(), args.min_spread)
-                if arb:
-                    found = True
-                    print(
-                        f"\n{coin.upper()}: Buy {arb['buy_exchange']} @ ${arb['buy_price']:,.2f} "
-                        f"-> Sell {arb['sell_exchange']} @ ${arb['sell_price']:,.2f} "
-                        f"({arb['spread_pct']:.3f}%)"
-                    )
-            except Exception as e:
-                print(f"{coin.upper()}: Error - {e}")
+        try:
+            # one bulk snapshot per exchange for the whole list
+            for arb in manager.detect_arbitrage_all(args.coins, args.min_spread):
+                found = True
+                print(
+                    f"\n{arb['coin']}: Buy {arb['buy_exchange']} @ ${arb['buy_price']:,.2f} "
+                    f"-> Sell {arb['sell_exchange']} @ ${arb['sell_price']:,.2f} "
+                    f"({arb['spread_pct']:.3f}%)"
+                )
+        except Exception as e:
+            print(f"Error - {e}")
 
         if not found:
             print(f"\nNo arbitrage opportunities found above {args.min_spread}% spread")
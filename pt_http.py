@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Shared HTTP Transport
+======================================
+One process-wide requests.Session for every exchange client, so repeated
+ticker / candle / order-book calls reuse warm keep-alive connections instead
+of paying TCP + TLS setup on each new ExchangeManager.
+
+Each known exchange host gets its own HTTPAdapter with a bounded connection
+pool (HOST_POOL_SIZES); other hosts share a default adapter. Pools block
+when full, so concurrent fan-out never opens more than the per-host limit.
+Responses are requested gzip-compressed, and GET requests that fail with a
+5xx status (or a dropped connection) are retried with jittered exponential
+backoff. A 429 is not retried here: it goes back to the caller, so the
+exchange's rate limiter (pt_rate_limit.py) sees it and pauses every request
+until Retry-After, rather than the transport retrying underneath it and
+risking a 418 ban. ExchangeBase._request (pt_exchanges.py) then retries the
+GET a bounded number of times once the pause is over.
+
+Usage:
+    from pt_http import get_session
+
+    session = get_session()                 # same object in every caller
+    resp = session.get("https://api.binance.com/api/v3/time", timeout=5)
+
+    # CLI: cold (new connection each time) vs pooled request latency
+    python pt_http.py bench https://api.binance.com/api/v3/ping --count 10
+"""
+
+import time
+import argparse
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+USER_AGENT = "PowerTrader-AI/1.0"
+
+# max connections kept open per exchange host (also the cap on concurrent requests to it)
+HOST_POOL_SIZES = {
+    "https://api.binance.com": 8,
+    "https://api.exchange.coinbase.com": 8,
+    "https://api.kucoin.com": 8,
+}
+DEFAULT_POOL_SIZE = 4
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.25  # seconds; doubles per attempt
+RETRY_BACKOFF_MAX = 4.0
+RETRY_JITTER = 0.25  # up to this many seconds added to each backoff
+RETRY_STATUSES = (500, 502, 503, 504)  # not 429: pt_rate_limit pauses on it
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class _Retry(Retry):
+    # urllib3 retries any 413/429/503 carrying Retry-After, whatever status_forcelist says
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+
+def _retry_policy() -> Retry:
+    kwargs = dict(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),  # never replay orders
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand the last response back so raise_for_status reports it
+    )
+    try:
+        return _Retry(backoff_jitter=RETRY_JITTER, backoff_max=RETRY_BACKOFF_MAX, **kwargs)
+    except TypeError:
+        # urllib3 < 2 has no jitter / backoff_max
+        return _Retry(**kwargs)
+
+
+def _adapter(pool_size: int) -> HTTPAdapter:
+    return HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        pool_block=True,
+        max_retries=_retry_policy(),
+    )
+
+
+def build_session(host_pool_sizes: Optional[Dict[str, int]] = None,
+                  default_pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """A new session with per-host pools and retries (get_session() returns the shared one)."""
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    default = _adapter(default_pool_size)
+    session.mount("https://", default)
+    session.mount("http://", default)
+    for prefix, size in (HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes).items():
+        # the longest matching prefix wins, so these take precedence over https://
+        session.mount(prefix, _adapter(size))
+    return session
+
+
+def get_session() -> requests.Session:
+    """The process-wide session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def close_session():
+    """Close pooled connections; the next get_session() builds a fresh session."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _bench(url: str, count: int, timeout: float):
+    cold, warm = [], []
+    for _ in range(count):
+        start = time.perf_counter()
+        with requests.Session() as s:
+            s.get(url, timeout=timeout).raise_for_status()
+        cold.append(time.perf_counter() - start)
+    session = get_session()
+    session.get(url, timeout=timeout).raise_for_status()  # open the connection
+    for _ in range(count):
+        start = time.perf_counter()
+        session.get(url, timeout=timeout).raise_for_status()
+        warm.append(time.perf_counter() - start)
+    cold.sort()
+    warm.sort()
+    print(f"{url}")
+    print(f"  new connection   median {cold[len(cold) // 2] * 1000:7.1f} ms   max {cold[-1] * 1000:7.1f} ms")
+    print(f"  pooled           median {warm[len(warm) // 2] * 1000:7.1f} ms   max {warm[-1] * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader shared HTTP transport")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    bench_parser = subparsers.add_parser("bench", help="Compare new-connection and pooled request latency")
+    bench_parser.add_argument("url", help="URL to GET")
+    bench_parser.add_argument("--count", "-n", type=int, default=10)
+    bench_parser.add_argument("--timeout", type=float, default=10.0)
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        try:
+            _bench(args.url, max(args.count, 1), args.timeout)
+        except requests.RequestException as e:
+            print(f"Error: {e}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Streaming Market Data
+======================================
+WebSocket feeds from Binance and Coinbase kept in an in-memory latest-state
+cache, so prices are milliseconds old instead of one REST round trip per
+read, and the REST request budget is left for history and recovery.
+
+    Binance   combined stream: <symbol>@ticker, <symbol>@kline_<interval>,
+              <symbol>@depth20@100ms (top 20 levels, pushed every 100 ms), or
+              <symbol>@depth@100ms diffs feeding full local books
+              (pt_orderbook.py) when order_books are given
+    Coinbase  ws-feed "ticker" channel (pushed on every trade; the feed has
+              no candle channel and its level2 book needs authentication,
+              so candles and books stay on REST)
+
+Each exchange runs one client thread that reconnects with backoff (Binance
+also drops connections every 24 h). Readers take the newest entry when it is
+younger than `max_age` and otherwise get None, so ExchangeManager falls back
+to REST when a stream is down, lagging or not subscribed to that symbol.
+
+Requires the optional websocket-client package; without it start() only
+prints a warning and everything keeps using REST.
+
+Usage:
+    from pt_exchanges import ExchangeManager
+
+    manager = ExchangeManager()
+    manager.start_stream(["BTC", "ETH"], timeframes=["1hour"])
+    manager.get_price("BTC", "binance")        # streamed when fresh, REST otherwise
+
+    # CLI
+    python pt_market_stream.py watch BTC ETH --seconds 30
+"""
+
+import json
+import time
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from pt_exchanges import OHLCV, BinanceExchange, OrderBook, Ticker
+from pt_orderbook import LocalOrderBook, OrderBookManager
+
+try:
+    import websocket  # websocket-client
+    _WS_AVAILABLE = True
+except ImportError:
+    websocket = None
+    _WS_AVAILABLE = False
+
+
+BINANCE_WS_URL = "wss://stream.binance.com:9443"
+COINBASE_WS_URL = "wss://ws-feed.exchange.coinbase.com"
+STREAM_EXCHANGES = ("binance", "coinbase")
+
+STREAM_MAX_AGE = 10.0  # seconds a cached value counts as current
+KLINE_HISTORY = 100  # closed klines kept per symbol/timeframe
+BINANCE_STREAMS_PER_CONNECTION = 200
+BINANCE_DEPTH_LEVELS = 20
+PING_INTERVAL = 20
+PING_TIMEOUT = 10
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 30.0
+
+_BINANCE_INTERVALS = {v: k for k, v in BinanceExchange.TIMEFRAME_MAP.items()}  # "1h" -> "1hour"
+
+
+class MarketState:
+    """Newest ticker, kline and order book per (exchange, symbol), with receive times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tickers: Dict[Tuple[str, str], Tuple[float, Ticker]] = {}
+        self._klines: Dict[Tuple[str, str, str], Tuple[float, OHLCV]] = {}
+        self._closed: Dict[Tuple[str, str, str], Deque[OHLCV]] = {}
+        self._books: Dict[Tuple[str, str], Tuple[float, OrderBook]] = {}
+
+    def put_ticker(self, ticker: Ticker):
+        with self._lock:
+            self._tickers[(ticker.exchange, ticker.symbol)] = (time.time(), ticker)
+
+    def put_kline(self, exchange: str, symbol: str, timeframe: str, candle: OHLCV, closed: bool):
+        key = (exchange, symbol, timeframe)
+        with self._lock:
+            self._klines[key] = (time.time(), candle)
+            if closed:
+                history = self._closed.setdefault(key, deque(maxlen=KLINE_HISTORY))
+                if not history or history[-1].timestamp < candle.timestamp:
+                    history.append(candle)
+
+    def put_book(self, book: OrderBook):
+        with self._lock:
+            self._books[(book.exchange, book.symbol)] = (time.time(), book)
+
+    @staticmethod
+    def _fresh(entry, max_age: float):
+        if entry is None or time.time() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    def ticker(self, exchange: str, symbol: str, max_age: float = STREAM_MAX_AGE) -> Optional[Ticker]:
+        with self._lock:
+            return self._fresh(self._tickers.get((exchange, symbol)), max_age)
+
+    def kline(self, exchange: str, symbol: str, timeframe: str, max_age: float = STREAM_MAX_AGE) -> Optional[OHLCV]:
+        """The newest kline, closed or still forming."""
+        with self._lock:
+            return self._fresh(self._klines.get((exchange, symbol, timeframe)), max_age)
+
+    def closed_candles(self, exchange: str, symbol: str, timeframe: str) -> List[OHLCV]:
+        """Klines that closed while streaming, oldest first."""
+        with self._lock:
+            return list(self._closed.get((exchange, symbol, timeframe), ()))
+
+    def orderbook(self, exchange: str, symbol: str, max_age: float = STREAM_MAX_AGE) -> Optional[OrderBook]:
+        with self._lock:
+            return self._fresh(self._books.get((exchange, symbol)), max_age)
+
+    def age(self, exchange: str, symbol: str) -> Optional[float]:
+        """Seconds since the symbol's last ticker, None when none arrived."""
+        with self._lock:
+            entry = self._tickers.get((exchange, symbol))
+        return None if entry is None else time.time() - entry[0]
+
+
+class StreamClient(ABC):
+    """One WebSocket connection with a reconnect loop; subclasses parse the messages."""
+
+    exchange = ""
+
+    def __init__(self, state: MarketState, url: str):
+        self.state = state
+        self.url = url
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+        self.last_message = 0.0
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"stream-{self.exchange}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        backoff = RECONNECT_MIN
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            opened_at = time.time()
+            self._ws.run_forever(ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT)
+            self.connected = False
+            if self._stop.is_set():
+                break
+            # a connection that lived a while resets the backoff
+            backoff = RECONNECT_MIN if time.time() - opened_at > RECONNECT_MAX else min(backoff * 2, RECONNECT_MAX)
+            self.reconnects += 1
+            print(f"[Stream] {self.exchange} disconnected; reconnecting in {backoff:.1f}s")
+            self._stop.wait(backoff)
+
+    def _on_open(self, ws):
+        self.connected = True
+        for message in self.subscribe_messages():
+            ws.send(json.dumps(message))
+
+    def _on_message(self, ws, message):
+        self.last_message = time.time()
+        self.messages += 1
+        try:
+            self.handle(json.loads(message))
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"[Stream] {self.exchange} bad message: {e}")
+
+    def _on_error(self, ws, error):
+        if not self._stop.is_set():
+            print(f"[Stream] {self.exchange} error: {error}")
+
+    def _on_close(self, ws, status, reason):
+        self.connected = False
+
+    def subscribe_messages(self) -> List[dict]:
+        return []
+
+    @abstractmethod
+    def handle(self, data: dict):
+        """Parse one decoded message into the shared MarketState."""
+
+
+class BinanceStream(StreamClient):
+    """Combined ticker / kline / partial-depth streams for a set of symbols."""
+
+    exchange = "binance"
+
+    def __init__(self, state: MarketState, symbols: Sequence[str], timeframes: Sequence[str] = (),
+                 depth: bool = True, base_url: str = BINANCE_WS_URL, order_books=None):
+        # with an OrderBookManager the diff-depth stream feeds its local books instead of top-20 snapshots
+        self.order_books = order_books
+        self.streams = self.stream_names(symbols, timeframes, depth, diff_depth=order_books is not None)
+        super().__init__(state, f"{base_url}/stream?streams={'/'.join(self.streams)}")
+
+    @staticmethod
+    def stream_names(symbols: Sequence[str], timeframes: Sequence[str] = (), depth: bool = True,
+                     diff_depth: bool = False) -> List[str]:
+        names = []
+        for symbol in symbols:
+            s = symbol.lower()
+            names.append(f"{s}@ticker")
+            for tf in timeframes:
+                names.append(f"{s}@kline_{BinanceExchange.TIMEFRAME_MAP.get(tf, '1h')}")
+            if depth:
+                names.append(f"{s}@depth@100ms" if diff_depth else f"{s}@depth{BINANCE_DEPTH_LEVELS}@100ms")
+        return names
+
+    def handle(self, data: dict):
+        stream, payload = data.get("stream", ""), data.get("data", data)
+        event = payload.get("e")
+        if event == "24hrTicker":
+            self.state.put_ticker(Ticker(
+                exchange="binance",
+                symbol=payload["s"],
+                price=float(payload["c"]),
+                bid=float(payload["b"]),
+                ask=float(payload["a"]),
+                volume_24h=float(payload["v"]),
+                timestamp=datetime.fromtimestamp(payload["E"] / 1000),
+            ))
+        elif event == "kline":
+            k = payload["k"]
+            candle = OHLCV(
+                timestamp=int(k["t"] // 1000),
+                open=float(k["o"]),
+                high=float(k["h"]),
+                low=float(k["l"]),
+                close=float(k["c"]),
+                volume=float(k["v"]),
+            )
+            self.state.put_kline("binance", payload["s"], _BINANCE_INTERVALS.get(k["i"], k["i"]), candle, bool(k["x"]))
+        elif event == "depthUpdate":
+            if self.order_books is not None:
+                self.order_books.on_update(payload["s"], payload["U"], payload["u"], payload["b"], payload["a"])
+        elif "lastUpdateId" in payload and "@depth" in stream:
+            # partial book streams carry no symbol; it is in the stream name
+            self.state.put_book(OrderBook(
+                exchange="binance",
+                symbol=stream.split("@", 1)[0].upper(),
+                bids=[(float(p), float(q)) for p, q in payload["bids"]],
+                asks=[(float(p), float(q)) for p, q in payload["asks"]],
+                timestamp=datetime.now(),
+            ))
+
+
+class CoinbaseStream(StreamClient):
+    """ws-feed ticker channel for a set of products."""
+
+    exchange = "coinbase"
+
+    def __init__(self, state: MarketState, symbols: Sequence[str], url: str = COINBASE_WS_URL):
+        super().__init__(state, url)
+        self.symbols = list(symbols)
+
+    def subscribe_messages(self) -> List[dict]:
+        return [{"type": "subscribe", "product_ids": self.symbols, "channels": ["ticker"]}]
+
+    def handle(self, data: dict):
+        kind = data.get("type")
+        if kind == "ticker":
+            self.state.put_ticker(Ticker(
+                exchange="coinbase",
+                symbol=data["product_id"],
+                price=float(data["price"]),
+                bid=float(data.get("best_bid") or data["price"]),
+                ask=float(data.get("best_ask") or data["price"]),
+                volume_24h=float(data.get("volume_24h") or 0.0),
+                timestamp=datetime.now(),
+            ))
+        elif kind == "error":
+            print(f"[Stream] coinbase error: {data.get('message')} {data.get('reason', '')}")
+
+
+class MarketStream:
+    """Streams for several exchanges writing into one MarketState."""
+
+    def __init__(self, symbols: Dict[str, Sequence[str]], timeframes: Sequence[str] = (), depth: bool = True,
+                 urls: Optional[Dict[str, str]] = None, state: Optional[MarketState] = None,
+                 order_books: Optional[Dict[str, OrderBookManager]] = None):
+        """`symbols` maps exchange -> exchange symbols (BTCUSDT, BTC-USD); `urls` overrides the endpoints.
+
+        `order_books` maps exchange -> pt_orderbook.OrderBookManager for local
+        books kept from diff-depth streams (Binance).
+        """
+        self.state = state or MarketState()
+        self.order_books = order_books or {}
+        self.clients: List[StreamClient] = []
+        urls = urls or {}
+        for exchange, syms in symbols.items():
+            syms = list(syms)
+            if not syms:
+                continue
+            if exchange == "binance":
+                per_symbol = len(BinanceStream.stream_names(syms[:1], timeframes, depth))
+                step = max(1, BINANCE_STREAMS_PER_CONNECTION // per_symbol)
+                for i in range(0, len(syms), step):
+                    self.clients.append(BinanceStream(self.state, syms[i:i + step], timeframes, depth,
+                                                      urls.get("binance", BINANCE_WS_URL),
+                                                      self.order_books.get("binance")))
+            elif exchange == "coinbase":
+                self.clients.append(CoinbaseStream(self.state, syms, urls.get("coinbase", COINBASE_WS_URL)))
+
+    @property
+    def available(self) -> bool:
+        return _WS_AVAILABLE
+
+    def start(self) -> bool:
+        if not _WS_AVAILABLE:
+            print("[Stream] websocket-client not installed; prices stay on REST (pip install websocket-client)")
+            return False
+        for client in self.clients:
+            client.start()
+        return True
+
+    def stop(self):
+        for client in self.clients:
+            client.stop()
+
+    def wait_ready(self, timeout: float = 10.0) -> bool:
+        """Block until every client has received a message (or the timeout passes)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.clients and all(c.messages for c in self.clients):
+                return True
+            time.sleep(0.05)
+        return False
+
+    def ticker(self, exchange: str, symbol: str, max_age: float = STREAM_MAX_AGE) -> Optional[Ticker]:
+        return self.state.ticker(exchange, symbol, max_age)
+
+    def local_book(self, exchange: str, symbol: str, max_age: float = STREAM_MAX_AGE) -> Optional[LocalOrderBook]:
+        """The synced, recently updated local book for a symbol, if one is kept."""
+        books = self.order_books.get(exchange)
+        book = books.book(symbol) if books is not None else None
+        if book is None or time.time() - book.updated_at > max_age:
+            return None
+        return book
+
+    def orderbook(self, exchange: str, symbol: str, max_age: float = STREAM_MAX_AGE,
+                  depth: Optional[int] = None) -> Optional[OrderBook]:
+        book = self.local_book(exchange, symbol, max_age)
+        if book is not None:
+            return book.to_orderbook(depth)
+        return self.state.orderbook(exchange, symbol, max_age)
+
+    def kline(self, exchange: str, symbol: str, timeframe: str, max_age: float = STREAM_MAX_AGE) -> Optional[OHLCV]:
+        return self.state.kline(exchange, symbol, timeframe, max_age)
+
+    def status(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for client in self.clients:
+            s = out.setdefault(client.exchange, {"connections": 0, "connected": 0, "messages": 0, "reconnects": 0,
+                                                 "last_message": 0.0})
+            s["connections"] += 1
+            s["connected"] += int(client.connected)
+            s["messages"] += client.messages
+            s["reconnects"] += client.reconnects
+            s["last_message"] = max(s["last_message"], client.last_message)
+        return out
+
+
+def stream_symbols(manager, coins: Sequence[str], quote: str = "USDT") -> Dict[str, List[str]]:
+    """exchange -> exchange symbols for the manager's streamable exchanges."""
+    return {
+        name: [ex.normalize_symbol(coin, "USD" if name == "coinbase" else quote) for coin in coins]
+        for name, ex in manager.exchanges.items() if name in STREAM_EXCHANGES
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader streaming market data")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    watch_parser = subparsers.add_parser("watch", help="Print streamed prices once a second")
+    watch_parser.add_argument("coins", nargs="+", help="Coin symbols")
+    watch_parser.add_argument("--seconds", type=float, default=30.0)
+    watch_parser.add_argument("--timeframe", action="append", default=[], help="Also stream klines (repeatable)")
+
+    args = parser.parse_args()
+
+    if args.command == "watch":
+        from pt_exchanges import ExchangeManager
+
+        manager = ExchangeManager()
+        stream = manager.start_stream(args.coins, timeframes=args.timeframe)
+        if stream is None:
+            return
+        coins = [c.upper() for c in args.coins]
+        symbols = stream_symbols(manager, coins)
+        deadline = time.time() + args.seconds
+        try:
+            while time.time() < deadline:
+                time.sleep(1.0)
+                cells = []
+                for i, coin in enumerate(coins):
+                    for name, syms in symbols.items():
+                        t = stream.ticker(name, syms[i])
+                        age = stream.state.age(name, syms[i])
+                        cells.append(f"{coin}@{name} " + (f"${t.price:,.2f} ({age * 1000:.0f} ms)" if t else "-"))
+                print(" | ".join(cells))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            manager.close()
+        for name, s in stream.status().items():
+            print(f"{name}: {s['messages']} messages, {s['reconnects']} reconnects")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Journaled Pattern Memory
+=========================================
+Crash-safe variant of PatternMemoryStore. The memories_{tf}.ptm snapshot is
+never written in place: the trainer works on an in-RAM copy, and each flush
+appends only what changed since the previous flush to memories_{tf}.ptj:
+
+    A  new records     (first row index + the raw rows)
+    W  weight updates  (memory indices + their current close/high/low weights)
+
+Every journal entry carries a sequence number and a CRC32, and is fsynced
+before flush() returns. Flush cost therefore scales with the changes, not the
+memory size. When the journal outgrows the snapshot, a background thread
+writes a fresh snapshot to a temp file and swaps it in with os.replace, then
+drops the journal entries the snapshot already holds. The snapshot header
+records the last sequence folded in, so a crash between the two swaps only
+leaves entries that are skipped on replay.
+
+On open the snapshot is loaded and the journal replayed up to the first torn
+or corrupt entry, which is where a killed trainer stopped writing.
+
+Usage:
+    from pt_memory_store import load_store
+
+    store = load_store("1hour", pattern_len=1, journal=True)
+    store.append([0.42], close_move=0.1, high_move=0.3, low_move=-0.2)
+    store.flush()      # appends to memories_1hour.ptj
+    store.compact()    # folds the journal into memories_1hour.ptm
+"""
+
+import os
+import struct
+import threading
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from pt_memory_store import (
+    COL_WEIGHT,
+    EXTRA_COLUMNS,
+    MemoryStoreError,
+    PatternMemoryStore,
+    _MIN_GROWTH,
+    journal_path,
+)
+
+
+JOURNAL_MAGIC = b"PTJOURNL"
+JOURNAL_VERSION = 1
+_JOURNAL_HEADER = struct.Struct("<8sHHI")  # magic, version, itemsize, pattern_len
+_ENTRY = struct.Struct("<cQI")  # kind, sequence, payload length (followed by crc32, payload)
+_CRC = struct.Struct("<I")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+KIND_APPEND = b"A"
+KIND_WEIGHTS = b"W"
+
+# compact once the journal is larger than this share of the snapshot (and at least COMPACT_MIN_BYTES)
+COMPACT_RATIO = 0.5
+COMPACT_MIN_BYTES = 1 << 20
+
+
+def _fsync_path(path: str):
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def _encode_entry(kind: bytes, seq: int, payload: bytes) -> bytes:
+    head = _ENTRY.pack(kind, seq, len(payload))
+    return head + _CRC.pack(zlib.crc32(payload, zlib.crc32(head))) + payload
+
+
+def read_journal(path: str):
+    """(header, [(kind, seq, payload, end_offset)], valid_end) for a journal file.
+
+    Reading stops at the first truncated or corrupt entry; valid_end is the
+    offset just past the last good one.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _JOURNAL_HEADER.size:
+        return None, [], 0
+    header = _JOURNAL_HEADER.unpack_from(data, 0)
+    if header[0] != JOURNAL_MAGIC or header[1] != JOURNAL_VERSION:
+        raise MemoryStoreError(f"{path} is not a pattern memory journal")
+    entries = []
+    pos = _JOURNAL_HEADER.size
+    prefix = _ENTRY.size + _CRC.size
+    while pos + prefix <= len(data):
+        kind, seq, length = _ENTRY.unpack_from(data, pos)
+        (crc,) = _CRC.unpack_from(data, pos + _ENTRY.size)
+        start = pos + prefix
+        end = start + length
+        if end > len(data):
+            break
+        payload = data[start:end]
+        if zlib.crc32(payload, zlib.crc32(data[pos:pos + _ENTRY.size])) != crc:
+            break
+        entries.append((kind, seq, payload, end))
+        pos = end
+    return header, entries, pos
+
+
+class JournaledMemoryStore(PatternMemoryStore):
+    """PatternMemoryStore backed by a snapshot plus an append-only journal.
+
+    The array properties are views into RAM rather than into the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pattern_len: Optional[int] = None,
+        dtype: str = "float64",
+        readonly: bool = False,
+        compact_ratio: float = COMPACT_RATIO,
+        compact_min_bytes: int = COMPACT_MIN_BYTES,
+        background: bool = True,
+    ):
+        self.path = path
+        self.journal_path = journal_path(path)
+        self.readonly = readonly
+        self.dirty = False
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.background = background
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._jf = None
+        self._replaying = False
+
+        if not os.path.exists(path):
+            if readonly:
+                raise MemoryStoreError(f"{path} does not exist")
+            self._write_snapshot(path, np.empty((0, (pattern_len or 0) + EXTRA_COLUMNS)), 0,
+                                 pattern_len=pattern_len, dtype=dtype)
+        with PatternMemoryStore(path, pattern_len=pattern_len, readonly=True) as snapshot:
+            self.pattern_len = snapshot.pattern_len
+            self.dtype = snapshot.dtype
+            self.count = len(snapshot)
+            self.journal_seq = snapshot.journal_seq
+            self._mm = np.empty((max(self.count * 2, _MIN_GROWTH), self.width), dtype=self.dtype)
+            self._mm[: self.count] = snapshot.records
+        self._snapshot_bytes = self.count * self.row_bytes
+        self._seq = self.journal_seq
+
+        self._replaying = True
+        try:
+            self._replay()
+        finally:
+            self._replaying = False
+        self._flushed = self.count
+        self._dirty_indices = []
+        if not readonly:
+            self._open_journal()
+
+    # ---- snapshot / journal files ----
+
+    def _write_snapshot(self, path: str, records: np.ndarray, seq: int,
+                        pattern_len: Optional[int] = None, dtype=None):
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        snapshot = PatternMemoryStore(
+            tmp_path,
+            pattern_len=pattern_len if pattern_len is not None else self.pattern_len,
+            dtype=dtype if dtype is not None else self.dtype.name,
+            initial_capacity=max(len(records), 1),
+        )
+        try:
+            snapshot.journal_seq = seq
+            if len(records):
+                snapshot.append_records(records)
+            snapshot.flush(force=True)
+        finally:
+            snapshot.close()
+        _fsync_path(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _journal_header(self) -> bytes:
+        return _JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, self.dtype.itemsize, self.pattern_len)
+
+    def _open_journal(self):
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) < _JOURNAL_HEADER.size:
+            with open(self.journal_path, "wb") as f:
+                f.write(self._journal_header())
+                f.flush()
+                os.fsync(f.fileno())
+        self._jf = open(self.journal_path, "ab")
+
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+        header, entries, valid_end = read_journal(self.journal_path)
+        if header is not None and (header[2] != self.dtype.itemsize or header[3] != self.pattern_len):
+            raise MemoryStoreError(f"{self.journal_path} does not match {self.path}")
+        applied_end = valid_end
+        for kind, seq, payload, end in entries:
+            if seq <= self.journal_seq:
+                continue  # already folded into the snapshot
+            if not self._apply(kind, payload):
+                print(f"[MemoryJournal] {self.journal_path}: entry {seq} does not follow the snapshot, ignoring the rest")
+                applied_end = end - len(payload) - _ENTRY.size - _CRC.size
+                break
+            self._seq = seq
+        if header is not None and not self.readonly and applied_end < os.path.getsize(self.journal_path):
+            # drop the torn tail so new entries follow the last good one
+            with open(self.journal_path, "rb+") as f:
+                f.truncate(applied_end)
+
+    def _apply(self, kind: bytes, payload: bytes) -> bool:
+        if kind == KIND_APPEND:
+            (start,) = _U64.unpack_from(payload, 0)
+            if start != self.count:
+                return False
+            rows = np.frombuffer(payload, dtype=self.dtype, offset=_U64.size).reshape(-1, self.width)
+            PatternMemoryStore.append_records(self, rows)
+        elif kind == KIND_WEIGHTS:
+            (n,) = _U32.unpack_from(payload, 0)
+            indices = np.frombuffer(payload, dtype="<i8", count=n, offset=_U32.size)
+            weights = np.frombuffer(payload, dtype=self.dtype, offset=_U32.size + 8 * n).reshape(n, 3)
+            if n and indices.max() >= self.count:
+                return False
+            self._mm[indices, self.pattern_len + COL_WEIGHT:self.pattern_len + COL_WEIGHT + 3] = weights
+        else:
+            return False
+        return True
+
+    # ---- PatternMemoryStore overrides ----
+
+    @property
+    def capacity(self) -> int:
+        return len(self._mm)
+
+    def _check_writable(self):
+        if self.readonly and not self._replaying:
+            raise MemoryStoreError(f"{self.path} is opened read-only")
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        grown = np.empty((max(capacity * 2, capacity + _MIN_GROWTH, needed), self.width), dtype=self.dtype)
+        grown[: self.count] = self._mm[: self.count]
+        self._mm = grown
+
+    def set_weights(self, index: int, weight: float, high_weight: float, low_weight: float):
+        super().set_weights(index, weight, high_weight, low_weight)
+        self._dirty_indices.append(np.asarray([index], dtype=np.int64))
+
+    def set_weights_batch(self, indices, weights, high_weights, low_weights):
+        super().set_weights_batch(indices, weights, high_weights, low_weights)
+        self._dirty_indices.append(np.asarray(indices, dtype=np.int64))
+
+    def flush(self, force: bool = False):
+        """Append the changes since the last flush to the journal and fsync it."""
+        if self.readonly or self._mm is None:
+            return
+        self._write_journal()
+        if self.journal_bytes > max(self.compact_min_bytes, self.compact_ratio * self._snapshot_bytes):
+            self.compact(wait=not self.background)
+
+    def _write_journal(self):
+        chunks = []
+        if self.count > self._flushed:
+            rows = self._mm[self._flushed:self.count]
+            self._seq += 1
+            chunks.append(_encode_entry(KIND_APPEND, self._seq, _U64.pack(self._flushed) + rows.tobytes()))
+        if self._dirty_indices:
+            indices = np.unique(np.concatenate(self._dirty_indices))
+            # rows appended since the last flush already carry their latest weights
+            indices = indices[indices < self._flushed]
+            if len(indices):
+                base = self.pattern_len + COL_WEIGHT
+                weights = np.ascontiguousarray(self._mm[indices, base:base + 3])
+                self._seq += 1
+                payload = _U32.pack(len(indices)) + indices.astype("<i8").tobytes() + weights.tobytes()
+                chunks.append(_encode_entry(KIND_WEIGHTS, self._seq, payload))
+        if chunks:
+            with self._lock:
+                self._jf.write(b"".join(chunks))
+                self._jf.flush()
+                os.fsync(self._jf.fileno())
+        self._flushed = self.count
+        self._dirty_indices = []
+        self.dirty = False
+
+    # ---- compaction ----
+
+    @property
+    def journal_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path) - _JOURNAL_HEADER.size
+        except OSError:
+            return 0
+
+    @property
+    def compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def compact(self, wait: bool = True):
+        """Fold the journal into a new snapshot (in a background thread unless wait=True)."""
+        if self.readonly or self._mm is None:
+            return
+        if self.compacting:
+            if wait:
+                self._compactor.join()
+            return
+        self._write_journal()
+        records = self.records.copy()
+        seq = self._seq
+        self._compactor = threading.Thread(target=self._compact, args=(records, seq), daemon=True)
+        self._compactor.start()
+        if wait:
+            self._compactor.join()
+
+    def rewrite(self, records: np.ndarray):
+        """Replace every record with a new snapshot and an empty journal.
+
+        The snapshot is stamped with a sequence past every journal entry, so a
+        crash before the journal is emptied replays nothing on top of it.
+        """
+        self._check_writable()
+        records = np.asarray(records, dtype=self.dtype)
+        if records.ndim != 2 or records.shape[1] != self.width:
+            raise MemoryStoreError(f"Records must have shape (n, {self.width})")
+        if self._compactor is not None:
+            self._compactor.join()
+        seq = self._seq + 1
+        self._write_snapshot(self.path, records, seq)
+        with self._lock:
+            tmp_path = self.journal_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self._journal_header())
+                f.flush()
+                os.fsync(f.fileno())
+            self._jf.close()
+            os.replace(tmp_path, self.journal_path)
+            self._jf = open(self.journal_path, "ab")
+        self._mm = np.empty((max(len(records) * 2, _MIN_GROWTH), self.width), dtype=self.dtype)
+        self._mm[: len(records)] = records
+        self.count = len(records)
+        self._flushed = self.count
+        self._dirty_indices = []
+        self._seq = self.journal_seq = seq
+        self._snapshot_bytes = self.count * self.row_bytes
+        self.dirty = False
+
+    def _compact(self, records: np.ndarray, seq: int):
+        try:
+            self._write_snapshot(self.path, records, seq)
+            with self._lock:
+                _, entries, _ = read_journal(self.journal_path)
+                tail = [_encode_entry(kind, s, payload) for kind, s, payload, _ in entries if s > seq]
+                tmp_path = self.journal_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(self._journal_header())
+                    f.write(b"".join(tail))
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Windows cannot replace a file that is still open
+                self._jf.close()
+                os.replace(tmp_path, self.journal_path)
+                self._jf = open(self.journal_path, "ab")
+            self.journal_seq = seq
+            self._snapshot_bytes = len(records) * self.row_bytes
+        except Exception as e:
+            print(f"[MemoryJournal] Compacting {self.path} failed: {e}")
+            with self._lock:
+                if self._jf is None or self._jf.closed:
+                    self._jf = open(self.journal_path, "ab")
+
+    def close(self):
+        if self._mm is None:
+            return
+        self.flush()
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._jf is not None:
+            self._jf.close()
+            self._jf = None
+        self._mm = None
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Pattern Memory Pruning
+=======================================
+Keeps a timeframe's pattern memories from growing forever. Every unmatched
+pattern is appended with weight 1.0 and nothing is ever removed, so the match
+scan and the store's RAM grow with every training pass.
+
+A prune pass applies a PrunePolicy in three steps:
+
+    evict      memories whose weights decayed to 0 ("all": close, high and low
+               weight; "close": close weight only; "off")
+    dedupe     memories within duplicate_fraction x perfect_threshold of an
+               older memory are folded into it (merged, or dropped)
+    cap        at most max_memories per timeframe, keeping the largest weights
+               (ties keep the newer memory)
+
+A merged memory keeps the older pattern, the mean weights, and outcomes
+scaled so its weighted close/high/low move equals the group's mean.
+
+The result is only written when a held-out replay predicts the same: each
+held-out pattern is matched against the memories before and after pruning at
+the current perfect_threshold, and the largest close/high/low prediction
+difference must stay within `tolerance` percentage points.
+
+Usage:
+    from pt_memory_prune import PrunePolicy, prune_store
+
+    report = prune_store("1hour", folder="BTC", holdout=candles[-500:],
+                         policy=PrunePolicy(max_memories=50000))
+
+    # CLI (held-out candles come from a pt_candle_source spec)
+    python pt_memory_prune.py BTC --folder BTC --max-memories 50000 --dry-run
+"""
+
+import os
+import argparse
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from pt_exchanges import OHLCV
+from pt_memory_store import (
+    COL_CLOSE,
+    COL_HIGH,
+    COL_LOW,
+    COL_HIGH_WEIGHT,
+    COL_LOW_WEIGHT,
+    COL_WEIGHT,
+    load_store,
+)
+from pt_pattern_index import PatternIndex
+from pt_pattern_match import match_pattern, pattern_differences
+
+
+EVICT_MODES = ("off", "close", "all")
+TIMEFRAMES = ["1hour", "2hour", "4hour", "8hour", "12hour", "1day", "1week"]
+
+
+@dataclass
+class PrunePolicy:
+    duplicate_fraction: float = 0.05  # x perfect_threshold; 0 folds exact duplicates only
+    merge_duplicates: bool = True  # False drops the newer duplicates instead of merging them
+    evict_zero_weight: str = "all"
+    zero_weight_eps: float = 1e-9
+    max_memories: Optional[int] = None
+    tolerance: Optional[float] = 0.05  # max held-out prediction difference in percentage points; None skips the check
+    holdout: int = 500  # candles the trainer hands to the parity replay
+
+    def __post_init__(self):
+        if self.evict_zero_weight not in EVICT_MODES:
+            raise ValueError(f"Unknown eviction mode {self.evict_zero_weight}, expected one of {EVICT_MODES}")
+
+
+@dataclass
+class ParityResult:
+    samples: int = 0
+    max_close_diff: float = 0.0
+    max_high_diff: float = 0.0
+    max_low_diff: float = 0.0
+    mean_close_diff: float = 0.0
+    match_count_changes: int = 0  # held-out patterns whose match count changed
+
+    @property
+    def max_diff(self) -> float:
+        return max(self.max_close_diff, self.max_high_diff, self.max_low_diff)
+
+
+@dataclass
+class PruneReport:
+    timeframe: str = ""
+    before: int = 0
+    after: int = 0
+    evicted: int = 0
+    deduplicated: int = 0
+    capped: int = 0
+    parity: ParityResult = field(default_factory=ParityResult)
+    applied: bool = False
+    reason: str = ""
+
+    def summary(self) -> str:
+        line = (
+            f"{self.timeframe}: {self.before} -> {self.after} memories "
+            f"(evicted {self.evicted}, deduplicated {self.deduplicated}, capped {self.capped}); "
+            f"held-out max diff {self.parity.max_diff:.4f} over {self.parity.samples} patterns"
+        )
+        return line + ("" if self.applied else f"; not applied: {self.reason}")
+
+
+class MemoryView:
+    """Read-only store-like view over a record matrix, for match_pattern and PatternIndex."""
+
+    def __init__(self, records: np.ndarray, pattern_len: int):
+        self.records = records
+        self.pattern_len = pattern_len
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def patterns(self) -> np.ndarray:
+        return self.records[:, : self.pattern_len]
+
+    def _column(self, col: int) -> np.ndarray:
+        return self.records[:, self.pattern_len + col]
+
+    @property
+    def close_moves(self) -> np.ndarray:
+        return self._column(COL_CLOSE)
+
+    @property
+    def high_moves(self) -> np.ndarray:
+        return self._column(COL_HIGH)
+
+    @property
+    def low_moves(self) -> np.ndarray:
+        return self._column(COL_LOW)
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._column(COL_WEIGHT)
+
+    @property
+    def high_weights(self) -> np.ndarray:
+        return self._column(COL_HIGH_WEIGHT)
+
+    @property
+    def low_weights(self) -> np.ndarray:
+        return self._column(COL_LOW_WEIGHT)
+
+
+# ---- policy steps ----
+
+def zero_weight_mask(records: np.ndarray, pattern_len: int, mode: str, eps: float = 1e-9) -> np.ndarray:
+    """Rows the eviction mode removes."""
+    if mode == "off" or len(records) == 0:
+        return np.zeros(len(records), dtype=bool)
+    weights = np.abs(records[:, pattern_len + COL_WEIGHT:pattern_len + COL_WEIGHT + 3])
+    if mode == "close":
+        return weights[:, 0] <= eps
+    return np.all(weights <= eps, axis=1)
+
+
+def duplicate_groups(records: np.ndarray, pattern_len: int, radius: float) -> np.ndarray:
+    """Group leader of every row: the oldest row within `radius` that leads a group."""
+    view = MemoryView(records, pattern_len)
+    patterns = view.patterns
+    index = PatternIndex(view, mode="exact")
+    leaders = np.full(len(records), -1, dtype=np.int64)
+    for i in range(len(records)):
+        if leaders[i] >= 0:
+            continue
+        candidates = index.candidates(patterns[i], radius)
+        if candidates is None:
+            candidates = np.arange(i, len(records))
+        candidates = candidates[(candidates >= i) & (leaders[candidates] < 0)]
+        diffs = pattern_differences(patterns[i], patterns[candidates])
+        leaders[candidates[diffs <= radius]] = i
+        leaders[i] = i
+    return leaders
+
+
+def merge_group(rows: np.ndarray, pattern_len: int) -> np.ndarray:
+    """One record whose weighted moves are the mean of the group's weighted moves."""
+    merged = rows[0].copy()
+    for outcome, weight in ((COL_CLOSE, COL_WEIGHT), (COL_HIGH, COL_HIGH_WEIGHT), (COL_LOW, COL_LOW_WEIGHT)):
+        outcomes = rows[:, pattern_len + outcome]
+        weights = rows[:, pattern_len + weight]
+        mean_weight = float(np.mean(weights))
+        mean_weighted = float(np.mean(outcomes * weights))
+        merged[pattern_len + weight] = mean_weight
+        merged[pattern_len + outcome] = mean_weighted / mean_weight if mean_weight != 0 else float(np.mean(outcomes))
+    return merged
+
+
+def prune_records(
+    records: np.ndarray,
+    pattern_len: int,
+    perfect_threshold: float,
+    policy: PrunePolicy,
+) -> Tuple[np.ndarray, PruneReport]:
+    """Apply `policy` to a record matrix; rows keep their relative order."""
+    records = np.asarray(records)
+    report = PruneReport(before=len(records))
+
+    evict = zero_weight_mask(records, pattern_len, policy.evict_zero_weight, policy.zero_weight_eps)
+    kept = records[~evict]
+    report.evicted = int(evict.sum())
+
+    if len(kept) > 1 and policy.duplicate_fraction >= 0:
+        leaders = duplicate_groups(kept, pattern_len, policy.duplicate_fraction * perfect_threshold)
+        heads = np.nonzero(leaders == np.arange(len(kept)))[0]
+        if len(heads) < len(kept):
+            deduped = kept[heads].copy()
+            if policy.merge_duplicates:
+                order = np.argsort(leaders, kind="stable")
+                bounds = np.searchsorted(leaders[order], heads, side="left")
+                ends = np.append(bounds[1:], len(kept))
+                for row, (lo, hi) in enumerate(zip(bounds, ends)):
+                    if hi - lo > 1:
+                        deduped[row] = merge_group(kept[order[lo:hi]], pattern_len)
+            report.deduplicated = len(kept) - len(heads)
+            kept = deduped
+
+    if policy.max_memories is not None and len(kept) > policy.max_memories:
+        base = pattern_len + COL_WEIGHT
+        score = np.abs(kept[:, base]) + kept[:, base + 1] + kept[:, base + 2]
+        # lexsort: last key is primary; newer rows win ties
+        ranked = np.lexsort((-np.arange(len(kept)), -score))
+        keep = np.sort(ranked[: max(policy.max_memories, 0)])
+        report.capped = len(kept) - len(keep)
+        kept = kept[keep]
+
+    report.after = len(kept)
+    return kept, report
+
+
+# ---- parity ----
+
+def holdout_patterns(candles: Sequence[OHLCV], pattern_len: int) -> np.ndarray:
+    """Close-change patterns the trainer would match at each held-out candle."""
+    if len(candles) < pattern_len:
+        return np.empty((0, pattern_len), dtype=np.float64)
+    opens = np.fromiter((c.open for c in candles), dtype=np.float64, count=len(candles))
+    closes = np.fromiter((c.close for c in candles), dtype=np.float64, count=len(candles))
+    changes = 100 * ((closes - opens) / opens)
+    windows = np.lib.stride_tricks.sliding_window_view(changes, pattern_len)
+    return np.ascontiguousarray(windows)
+
+
+def replay_parity(
+    original: np.ndarray,
+    pruned: np.ndarray,
+    pattern_len: int,
+    patterns: np.ndarray,
+    threshold: float,
+) -> ParityResult:
+    """Compare the predictions both memory sets make for the held-out patterns."""
+    result = ParityResult(samples=len(patterns))
+    if len(patterns) == 0:
+        return result
+    before = MemoryView(original, pattern_len)
+    after = MemoryView(pruned, pattern_len)
+    index_before = PatternIndex(before, mode="exact") if len(before) else None
+    index_after = PatternIndex(after, mode="exact") if len(after) else None
+    close_diffs = np.empty(len(patterns))
+    high_diffs = np.empty(len(patterns))
+    low_diffs = np.empty(len(patterns))
+    for i, pattern in enumerate(patterns):
+        a = match_pattern(pattern, before, threshold, candidates=index_before.candidates(pattern, threshold)) \
+            if index_before is not None else None
+        b = match_pattern(pattern, after, threshold, candidates=index_after.candidates(pattern, threshold)) \
+            if index_after is not None else None
+        a_moves = (a.final_move, a.high_final_move * 100, a.low_final_move * 100) if a is not None else (0.0,) * 3
+        b_moves = (b.final_move, b.high_final_move * 100, b.low_final_move * 100) if b is not None else (0.0,) * 3
+        close_diffs[i] = abs(a_moves[0] - b_moves[0])
+        high_diffs[i] = abs(a_moves[1] - b_moves[1])
+        low_diffs[i] = abs(a_moves[2] - b_moves[2])
+        if (a.count if a is not None else 0) != (b.count if b is not None else 0):
+            result.match_count_changes += 1
+    result.max_close_diff = float(close_diffs.max())
+    result.max_high_diff = float(high_diffs.max())
+    result.max_low_diff = float(low_diffs.max())
+    result.mean_close_diff = float(close_diffs.mean())
+    return result
+
+
+# ---- stores ----
+
+def read_threshold(timeframe: str, folder: str = ".", default: float = 1.0) -> float:
+    try:
+        with open(os.path.join(folder, f"neural_perfect_threshold_{timeframe}.txt"), "r", encoding="utf-8") as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return default
+
+
+def prune_memories(
+    store,
+    timeframe: str,
+    perfect_threshold: float,
+    holdout: Sequence[OHLCV] = (),
+    policy: Optional[PrunePolicy] = None,
+    dry_run: bool = False,
+) -> PruneReport:
+    """Prune an open store in place when the held-out replay stays within tolerance."""
+    policy = policy or PrunePolicy()
+    original = np.array(store.records)
+    pruned, report = prune_records(original, store.pattern_len, perfect_threshold, policy)
+    report.timeframe = timeframe
+    if report.after == report.before:
+        report.reason = "nothing to prune"
+        return report
+    report.parity = replay_parity(
+        original, pruned, store.pattern_len, holdout_patterns(holdout, store.pattern_len), perfect_threshold
+    )
+    if report.parity.samples == 0 and policy.tolerance is not None:
+        report.reason = "no held-out candles to check parity against"
+        return report
+    if policy.tolerance is not None and report.parity.max_diff > policy.tolerance:
+        report.reason = f"held-out diff {report.parity.max_diff:.4f} exceeds tolerance {policy.tolerance}"
+        return report
+    if dry_run:
+        report.reason = "dry run"
+        return report
+    store.rewrite(pruned)
+    report.applied = True
+    return report
+
+
+def prune_store(
+    timeframe: str,
+    folder: str = ".",
+    holdout: Sequence[OHLCV] = (),
+    policy: Optional[PrunePolicy] = None,
+    perfect_threshold: Optional[float] = None,
+    dry_run: bool = False,
+) -> PruneReport:
+    """Open a timeframe's store, prune it and close it again."""
+    if perfect_threshold is None:
+        perfect_threshold = read_threshold(timeframe, folder)
+    store = load_store(timeframe, folder=folder)
+    try:
+        return prune_memories(store, timeframe, perfect_threshold, holdout, policy, dry_run)
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune a coin's pattern memories")
+    parser.add_argument("coin", help="Coin whose held-out candles are replayed (BTC, ETH, ...)")
+    parser.add_argument("--folder", "-f", default=".", help="Coin folder holding the memories")
+    parser.add_argument("--timeframes", "-t", nargs="+", default=TIMEFRAMES)
+    parser.add_argument("--source", "-s", default=None, help="Candle source spec for the held-out replay")
+    parser.add_argument("--holdout", type=int, default=PrunePolicy.holdout, help="Held-out candles to replay")
+    parser.add_argument("--duplicate-fraction", type=float, default=PrunePolicy.duplicate_fraction)
+    parser.add_argument("--drop-duplicates", action="store_true", help="Drop near-duplicates instead of merging")
+    parser.add_argument("--evict", choices=EVICT_MODES, default=PrunePolicy.evict_zero_weight)
+    parser.add_argument("--max-memories", type=int, default=None, help="Memory cap per timeframe")
+    parser.add_argument("--tolerance", type=float, default=PrunePolicy.tolerance,
+                        help="Max held-out prediction difference (percentage points)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without rewriting the stores")
+    args = parser.parse_args()
+
+    from pt_candle_source import source_from_spec
+    from pt_candle_store import CandleStore, timeframe_seconds
+
+    policy = PrunePolicy(
+        duplicate_fraction=args.duplicate_fraction,
+        merge_duplicates=not args.drop_duplicates,
+        evict_zero_weight=args.evict,
+        max_memories=args.max_memories,
+        tolerance=args.tolerance,
+        holdout=args.holdout,
+    )
+    source = source_from_spec(args.source, CandleStore())
+    for timeframe in args.timeframes:
+        if not os.path.exists(os.path.join(args.folder, f"memories_{timeframe}.ptm")):
+            continue
+        start = source.now() - (args.holdout + 1) * timeframe_seconds(timeframe)
+        holdout = source.get_candles(args.coin, timeframe, start=start)[-args.holdout:]
+        report = prune_store(timeframe, args.folder, holdout, policy, dry_run=args.dry_run)
+        print(f"[Prune] {report.summary()}")
+        if args.dry_run:
+            print(f"[Prune] {timeframe} parity: {asdict(report.parity)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Shared Memory Snapshots
+========================================
+Read-only, memory-mapped copies of a coin's pattern memories that any number
+of thinker/trader/hub processes can map at once. Every process maps the same
+file pages, so resident memory grows with one copy per timeframe instead of
+one copy per process.
+
+The trainer keeps writing its own memories_{tf}.ptm (+ journal); readers
+never touch it. When a timeframe finishes training the trainer publishes a
+generation:
+
+    memories_{tf}.g{N}.ptm        immutable PTM file (same layout as pt_memory_store.py)
+    memories_{tf}.current.json    pointer: generation, file, count, perfect_threshold
+
+The generation file is written to a temp name, fsynced and renamed, then the
+pointer is swapped with os.replace, so readers see either the old or the new
+generation and never take a lock. A reader checks the pointer's stat on
+refresh() and remaps only when it changed. Generations older than the last
+`keep` are removed best-effort: on Windows a file that a reader still maps
+cannot be deleted, so it is retried on the next publish.
+
+Usage:
+    from pt_memory_snapshot import SnapshotReader, publish_snapshot
+
+    publish_snapshot(trainer.store, "1hour", folder="BTC", perfect_threshold=trainer.perfect_threshold)
+
+    reader = SnapshotReader("1hour", folder="BTC")
+    reader.refresh()                              # picks up newer generations
+    match = match_pattern(pattern, reader.store, reader.perfect_threshold)
+
+    # CLI
+    python pt_memory_snapshot.py publish BTC      # publish the current stores
+    python pt_memory_snapshot.py info BTC
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from pt_memory_store import (
+    MemoryStoreError,
+    PatternMemoryStore,
+    journal_path,
+    store_path,
+)
+
+
+KEEP_GENERATIONS = 2
+_OPEN_RETRIES = 3
+
+
+def pointer_path(tf_choice: str, folder: str = ".") -> str:
+    return os.path.join(folder, f"memories_{tf_choice}.current.json")
+
+
+def generation_path(tf_choice: str, generation: int, folder: str = ".") -> str:
+    return os.path.join(folder, f"memories_{tf_choice}.g{generation}.ptm")
+
+
+def list_generations(tf_choice: str, folder: str = ".") -> List[int]:
+    pattern = re.compile(r"^memories_" + re.escape(tf_choice) + r"\.g(\d+)\.ptm$")
+    found = []
+    for name in os.listdir(folder):
+        m = pattern.match(name)
+        if m:
+            found.append(int(m.group(1)))
+    return sorted(found)
+
+
+@dataclass
+class SnapshotPointer:
+    timeframe: str
+    generation: int
+    file: str
+    count: int
+    pattern_len: int
+    perfect_threshold: Optional[float] = None
+    published_at: float = 0.0
+
+
+def read_pointer(tf_choice: str, folder: str = ".") -> Optional[SnapshotPointer]:
+    """The published generation for a timeframe, or None when nothing was published."""
+    try:
+        with open(pointer_path(tf_choice, folder), "r", encoding="utf-8") as f:
+            return SnapshotPointer(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _fsync_path(path: str):
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def _write_generation(path: str, records: np.ndarray, pattern_len: int, dtype: np.dtype):
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    snapshot = PatternMemoryStore(tmp_path, pattern_len=pattern_len, dtype=dtype.name,
+                                  initial_capacity=max(len(records), 1))
+    try:
+        if len(records):
+            snapshot.append_records(records)
+        snapshot.flush(force=True)
+    finally:
+        snapshot.close()
+    _fsync_path(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def remove_old_generations(tf_choice: str, folder: str = ".", keep: int = KEEP_GENERATIONS) -> int:
+    """Delete all but the newest `keep` generations; files still mapped on Windows are left for later."""
+    pointer = read_pointer(tf_choice, folder)
+    removed = 0
+    for generation in list_generations(tf_choice, folder)[:-max(keep, 1)]:
+        if pointer is not None and generation == pointer.generation:
+            continue
+        try:
+            os.remove(generation_path(tf_choice, generation, folder))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def publish_snapshot(store, tf_choice: str, folder: str = ".", perfect_threshold: Optional[float] = None,
+                     keep: int = KEEP_GENERATIONS) -> SnapshotPointer:
+    """Write the store's records as a new generation and point readers at it.
+
+    `store` is anything with records / pattern_len / dtype (PatternMemoryStore,
+    JournaledMemoryStore); for a journaled store the RAM copy is published, so
+    changes still in the journal are included.
+    """
+    records = np.ascontiguousarray(store.records)
+    current = read_pointer(tf_choice, folder)
+    existing = list_generations(tf_choice, folder)
+    generation = max([current.generation if current else 0] + existing) + 1
+    path = generation_path(tf_choice, generation, folder)
+    _write_generation(path, records, store.pattern_len, store.dtype)
+
+    pointer = SnapshotPointer(
+        timeframe=tf_choice,
+        generation=generation,
+        file=os.path.basename(path),
+        count=len(records),
+        pattern_len=store.pattern_len,
+        perfect_threshold=perfect_threshold,
+        published_at=time.time(),
+    )
+    target = pointer_path(tf_choice, folder)
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(asdict(pointer), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+    remove_old_generations(tf_choice, folder, keep)
+    return pointer
+
+
+class SnapshotReader:
+    """Follows the published generation of one timeframe through a read-only mapping.
+
+    `store` is a read-only PatternMemoryStore over the generation file, so it
+    can be passed straight to match_pattern(). Arrays taken from an older
+    generation stay valid after a swap; its pages are released once they are
+    dropped.
+    """
+
+    def __init__(self, tf_choice: str, folder: str = "."):
+        self.timeframe = tf_choice
+        self.folder = folder
+        self.pointer: Optional[SnapshotPointer] = None
+        self._store: Optional[PatternMemoryStore] = None
+        self._stat: Optional[Tuple[int, int, int]] = None
+        self.refresh()
+
+    @property
+    def store(self) -> Optional[PatternMemoryStore]:
+        return self._store
+
+    @property
+    def generation(self) -> int:
+        return self.pointer.generation if self.pointer else 0
+
+    @property
+    def perfect_threshold(self) -> Optional[float]:
+        return self.pointer.perfect_threshold if self.pointer else None
+
+    def __len__(self) -> int:
+        return len(self._store) if self._store is not None else 0
+
+    def _pointer_stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(pointer_path(self.timeframe, self.folder))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def refresh(self) -> bool:
+        """Map the newest published generation; True when it changed."""
+        stat = self._pointer_stat()
+        if stat is None or stat == self._stat:
+            return False
+        for _ in range(_OPEN_RETRIES):
+            pointer = read_pointer(self.timeframe, self.folder)
+            if pointer is None:
+                return False
+            if self.pointer is not None and pointer.generation == self.pointer.generation:
+                self._stat = stat
+                return False
+            try:
+                store = PatternMemoryStore(os.path.join(self.folder, pointer.file), readonly=True)
+            except (OSError, MemoryStoreError):
+                # published again and already cleaned up between reading the pointer and opening it
+                stat = self._pointer_stat()
+                continue
+            old, self._store, self.pointer, self._stat = self._store, store, pointer, stat
+            if old is not None:
+                old.close()
+            return True
+        return False
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _open_readonly(path: str) -> PatternMemoryStore:
+    """A trainer store as the trainer sees it, including entries still in its journal."""
+    if os.path.exists(journal_path(path)):
+        from pt_memory_journal import JournaledMemoryStore
+        return JournaledMemoryStore(path, readonly=True)
+    return PatternMemoryStore(path, readonly=True)
+
+
+def _read_threshold(tf_choice: str, folder: str) -> Optional[float]:
+    try:
+        with open(os.path.join(folder, f"neural_perfect_threshold_{tf_choice}.txt"), "r", encoding="utf-8") as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _store_timeframes(folder: str) -> List[str]:
+    found = []
+    for name in sorted(os.listdir(folder)):
+        m = re.match(r"^memories_(.+)\.ptm$", name)
+        if m and not re.search(r"\.g\d+$", m.group(1)):
+            found.append(m.group(1))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader shared memory snapshots")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    publish_parser = subparsers.add_parser("publish", help="Publish the coin's memory stores as new generations")
+    publish_parser.add_argument("folder", nargs="?", default=".", help="Coin folder")
+    publish_parser.add_argument("--timeframe", help="Only this timeframe")
+    publish_parser.add_argument("--keep", type=int, default=KEEP_GENERATIONS, help="Generations to keep")
+
+    info_parser = subparsers.add_parser("info", help="Show published generations")
+    info_parser.add_argument("folder", nargs="?", default=".", help="Coin folder")
+
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        timeframes = [args.timeframe] if args.timeframe else _store_timeframes(args.folder)
+        for tf in timeframes:
+            path = store_path(tf, args.folder)
+            try:
+                store = _open_readonly(path)
+            except MemoryStoreError as e:
+                print(f"{tf}: {e}")
+                continue
+            try:
+                pointer = publish_snapshot(store, tf, args.folder, _read_threshold(tf, args.folder), keep=args.keep)
+            finally:
+                store.close()
+            print(f"{tf}: published generation {pointer.generation} ({pointer.count} memories) -> {pointer.file}")
+
+    elif args.command == "info":
+        for tf in _store_timeframes(args.folder):
+            pointer = read_pointer(tf, args.folder)
+            generations = list_generations(tf, args.folder)
+            if pointer is None:
+                print(f"{tf:<8} not published")
+                continue
+            size = os.path.getsize(os.path.join(args.folder, pointer.file)) if os.path.exists(
+                os.path.join(args.folder, pointer.file)) else 0
+            print(
+                f"{tf:<8} generation {pointer.generation:<5} {pointer.count:>10} memories  "
+                f"{size / 1e6:8.2f} MB  on disk: {generations}"
+            )
+
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Binary Pattern Memory Store
+============================================
+Array-backed storage for the trainer's pattern memories. Replaces the legacy
+memories_{tf}.txt / memory_weights*_{tf}.txt text files, which had to be
+string-parsed on every load and every match pass.
+
+One file per timeframe (memories_{tf}.ptm), little endian:
+
+    header (64 bytes)  magic, format version, float itemsize, pattern length, record count,
+                       last journal sequence folded in (see pt_memory_journal.py)
+    records            capacity x (pattern_len + 6) floats, the first `count` rows valid
+
+Each record holds:
+
+    [0 : L]   pattern candles (percent change, compared during matching)
+    [L + 0]   close outcome (% move of the next candle)
+    [L + 1]   high outcome (%)
+    [L + 2]   low outcome (%)
+    [L + 3]   close weight
+    [L + 4]   high weight
+    [L + 5]   low weight
+
+Records are memory-mapped and only ever appended; the file grows in chunks so
+appends do not rewrite existing rows.
+
+Usage:
+    from pt_memory_store import load_store
+
+    store = load_store("1hour", pattern_len=1)   # migrates legacy text on first use
+    store.append([0.42], close_move=0.1, high_move=0.3, low_move=-0.2)
+    store.flush()
+
+    # CLI
+    python pt_memory_store.py migrate BTC
+    python pt_memory_store.py info BTC
+"""
+
+import os
+import re
+import struct
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+MAGIC = b"PTMEMORY"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sHHIQQ")
+
+# Columns following the pattern candles in every record
+EXTRA_COLUMNS = 6
+COL_CLOSE, COL_HIGH, COL_LOW, COL_WEIGHT, COL_HIGH_WEIGHT, COL_LOW_WEIGHT = range(EXTRA_COLUMNS)
+
+_DTYPES = {4: np.float32, 8: np.float64}
+_MIN_GROWTH = 1024
+
+
+class MemoryStoreError(Exception):
+    pass
+
+
+def store_path(tf_choice: str, folder: str = ".") -> str:
+    return os.path.join(folder, f"memories_{tf_choice}.ptm")
+
+
+def journal_path(path: str) -> str:
+    """Write-ahead journal that sits next to a .ptm snapshot."""
+    return os.path.splitext(path)[0] + ".ptj"
+
+
+def legacy_paths(tf_choice: str, folder: str = ".") -> Dict[str, str]:
+    return {
+        "memories": os.path.join(folder, f"memories_{tf_choice}.txt"),
+        "weights": os.path.join(folder, f"memory_weights_{tf_choice}.txt"),
+        "high_weights": os.path.join(folder, f"memory_weights_high_{tf_choice}.txt"),
+        "low_weights": os.path.join(folder, f"memory_weights_low_{tf_choice}.txt"),
+    }
+
+
+class PatternMemoryStore:
+    """Memory-mapped, append-only pattern matrix for one timeframe.
+
+    Array properties are views into the mapping. Appending may remap the file,
+    so re-read the properties after `append` instead of holding on to them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pattern_len: Optional[int] = None,
+        dtype: str = "float64",
+        readonly: bool = False,
+        initial_capacity: int = _MIN_GROWTH,
+    ):
+        self.path = path
+        self.readonly = readonly
+        self.dirty = False
+        self.journal_seq = 0
+        self._mm = None
+
+        if os.path.exists(path):
+            self._fh = open(path, "rb" if readonly else "r+b")
+            self._read_header()
+            if pattern_len is not None and pattern_len != self.pattern_len:
+                self._fh.close()
+                raise MemoryStoreError(
+                    f"{path} holds {self.pattern_len}-candle patterns, not {pattern_len}"
+                )
+        else:
+            if readonly:
+                raise MemoryStoreError(f"{path} does not exist")
+            if pattern_len is None or pattern_len < 1:
+                raise MemoryStoreError("pattern_len is required to create a store")
+            self.pattern_len = int(pattern_len)
+            self.dtype = np.dtype(dtype)
+            if self.dtype.itemsize not in _DTYPES:
+                raise MemoryStoreError(f"Unsupported dtype {dtype}")
+            self.count = 0
+            self._fh = open(path, "w+b")
+            self._write_header()
+            self._fh.truncate(HEADER_SIZE + max(1, initial_capacity) * self.row_bytes)
+
+        self._map()
+
+    # ---- file layout ----
+
+    @property
+    def width(self) -> int:
+        return self.pattern_len + EXTRA_COLUMNS
+
+    @property
+    def row_bytes(self) -> int:
+        return self.width * self.dtype.itemsize
+
+    @property
+    def capacity(self) -> int:
+        return (os.fstat(self._fh.fileno()).st_size - HEADER_SIZE) // self.row_bytes
+
+    def _read_header(self):
+        raw = self._fh.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            raise MemoryStoreError(f"{self.path} is truncated")
+        magic, version, itemsize, pattern_len, count, journal_seq = _HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise MemoryStoreError(f"{self.path} is not a pattern memory store")
+        if version != FORMAT_VERSION:
+            raise MemoryStoreError(f"{self.path} has unsupported format version {version}")
+        if itemsize not in _DTYPES:
+            raise MemoryStoreError(f"{self.path} has unsupported itemsize {itemsize}")
+        self.dtype = np.dtype(_DTYPES[itemsize])
+        self.pattern_len = pattern_len
+        self.count = count
+        self.journal_seq = journal_seq
+
+    def _write_header(self):
+        header = _HEADER.pack(
+            MAGIC, FORMAT_VERSION, self.dtype.itemsize, self.pattern_len, self.count, self.journal_seq
+        )
+        self._fh.seek(0)
+        self._fh.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._fh.flush()
+
+    def _map(self):
+        self._mm = np.memmap(
+            self._fh,
+            dtype=self.dtype,
+            mode="r" if self.readonly else "r+",
+            offset=HEADER_SIZE,
+            shape=(self.capacity, self.width),
+        )
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        new_capacity = max(capacity * 2, capacity + _MIN_GROWTH, needed)
+        self._mm.flush()
+        self._mm = None
+        self._fh.truncate(HEADER_SIZE + new_capacity * self.row_bytes)
+        self._map()
+
+    # ---- views ----
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._mm[: self.count]
+
+    @property
+    def patterns(self) -> np.ndarray:
+        return self._mm[: self.count, : self.pattern_len]
+
+    def _column(self, col: int) -> np.ndarray:
+        return self._mm[: self.count, self.pattern_len + col]
+
+    @property
+    def close_moves(self) -> np.ndarray:
+        return self._column(COL_CLOSE)
+
+    @property
+    def high_moves(self) -> np.ndarray:
+        return self._column(COL_HIGH)
+
+    @property
+    def low_moves(self) -> np.ndarray:
+        return self._column(COL_LOW)
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._column(COL_WEIGHT)
+
+    @property
+    def high_weights(self) -> np.ndarray:
+        return self._column(COL_HIGH_WEIGHT)
+
+    @property
+    def low_weights(self) -> np.ndarray:
+        return self._column(COL_LOW_WEIGHT)
+
+    # ---- writes ----
+
+    def _check_writable(self):
+        if self.readonly:
+            raise MemoryStoreError(f"{self.path} is opened read-only")
+
+    def append(
+        self,
+        pattern: Sequence[float],
+        close_move: float,
+        high_move: float,
+        low_move: float,
+        weight: float = 1.0,
+        high_weight: float = 1.0,
+        low_weight: float = 1.0,
+    ) -> int:
+        """Append one memory and return its index."""
+        if len(pattern) != self.pattern_len:
+            raise MemoryStoreError(
+                f"Pattern has {len(pattern)} candles, store expects {self.pattern_len}"
+            )
+        row = list(pattern) + [close_move, high_move, low_move, weight, high_weight, low_weight]
+        return self.append_records(np.asarray([row], dtype=self.dtype))
+
+    def append_records(self, records: np.ndarray) -> int:
+        """Append full records (n x width). Returns the index of the first new row."""
+        self._check_writable()
+        records = np.asarray(records, dtype=self.dtype)
+        if records.ndim != 2 or records.shape[1] != self.width:
+            raise MemoryStoreError(f"Records must have shape (n, {self.width})")
+        start = self.count
+        end = start + len(records)
+        if end > self.capacity:
+            self._grow(end)
+        self._mm[start:end] = records
+        self.count = end
+        self.dirty = True
+        return start
+
+    def set_weights(self, index: int, weight: float, high_weight: float, low_weight: float):
+        self._check_writable()
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        base = self.pattern_len
+        self._mm[index, base + COL_WEIGHT] = weight
+        self._mm[index, base + COL_HIGH_WEIGHT] = high_weight
+        self._mm[index, base + COL_LOW_WEIGHT] = low_weight
+        self.dirty = True
+
+    def set_weights_batch(self, indices, weights, high_weights, low_weights):
+        """Write the three weights of many records in one fancy-indexed assignment."""
+        self._check_writable()
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+        if indices.min() < 0 or indices.max() >= self.count:
+            raise IndexError(f"weight index out of range 0..{self.count - 1}")
+        base = self.pattern_len
+        self._mm[indices, base + COL_WEIGHT] = weights
+        self._mm[indices, base + COL_HIGH_WEIGHT] = high_weights
+        self._mm[indices, base + COL_LOW_WEIGHT] = low_weights
+        self.dirty = True
+
+    def rewrite(self, records: np.ndarray):
+        """Replace every record (e.g. after pruning) via a temp file and os.replace."""
+        self._check_writable()
+        records = np.asarray(records, dtype=self.dtype)
+        if records.ndim != 2 or records.shape[1] != self.width:
+            raise MemoryStoreError(f"Records must have shape (n, {self.width})")
+        tmp_path = self.path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with PatternMemoryStore(tmp_path, pattern_len=self.pattern_len, dtype=self.dtype.name,
+                                initial_capacity=max(len(records), 1)) as rewritten:
+            rewritten.journal_seq = self.journal_seq
+            if len(records):
+                rewritten.append_records(records)
+            rewritten.flush(force=True)
+        # Windows cannot replace a file that is still mapped
+        self._mm = None
+        self._fh.close()
+        os.replace(tmp_path, self.path)
+        self._fh = open(self.path, "r+b")
+        self._read_header()
+        self._map()
+        self.dirty = False
+
+    def flush(self, force: bool = False):
+        """Sync mapped rows to disk, then publish the record count in the header."""
+        if self.readonly or self._mm is None:
+            return
+        if not (self.dirty or force):
+            return
+        self._mm.flush()
+        self._write_header()
+        self.dirty = False
+
+    def close(self):
+        if self._mm is None:
+            return
+        self.flush()
+        self._mm = None
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---- legacy text migration ----
+
+def _strip_legacy(text: str) -> str:
+    for ch in ("'", ",", '"', "]", "["):
+        text = text.replace(ch, "")
+    return text
+
+
+def _read_legacy_weights(path: str) -> List[float]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            tokens = _strip_legacy(f.read()).split(" ")
+    except OSError:
+        return []
+    weights = []
+    for tok in tokens:
+        if tok.strip() == "":
+            continue
+        try:
+            weights.append(float(tok))
+        except ValueError:
+            weights.append(1.0)
+    return weights
+
+
+def parse_legacy_memories(tf_choice: str, folder: str = ".") -> np.ndarray:
+    """Parse the legacy text files into an (n, pattern_len + 6) float64 record matrix.
+
+    Entries whose pattern length differs from the majority, or that fail to
+    parse, are skipped. Missing weights default to 1.0.
+    """
+    paths = legacy_paths(tf_choice, folder)
+    with open(paths["memories"], "r", encoding="utf-8", errors="ignore") as f:
+        entries = _strip_legacy(f.read()).split("~")
+    weights = _read_legacy_weights(paths["weights"])
+    high_weights = _read_legacy_weights(paths["high_weights"])
+    low_weights = _read_legacy_weights(paths["low_weights"])
+
+    parsed = []
+    for i, entry in enumerate(entries):
+        if entry.strip() == "":
+            continue
+        parts = entry.split("{}")
+        try:
+            values = [float(v) for v in parts[0].split()]
+            high = float(parts[1].replace(" ", ""))
+            low = float(parts[2].replace(" ", ""))
+        except (IndexError, ValueError):
+            continue
+        if len(values) < 2:
+            continue
+        parsed.append((i, values, high, low))
+
+    if not parsed:
+        return np.empty((0, 0), dtype=np.float64)
+
+    # pattern candles plus the trailing close outcome
+    lengths = Counter(len(values) for _, values, _, _ in parsed)
+    row_len = lengths.most_common(1)[0][0]
+
+    def weight_at(lst, i):
+        return lst[i] if i < len(lst) else 1.0
+
+    rows = []
+    for i, values, high, low in parsed:
+        if len(values) != row_len:
+            continue
+        rows.append(values + [high, low, weight_at(weights, i), weight_at(high_weights, i), weight_at(low_weights, i)])
+    return np.asarray(rows, dtype=np.float64)
+
+
+def migrate_legacy(tf_choice: str, folder: str = ".", dtype: str = "float64") -> Optional[PatternMemoryStore]:
+    """One-shot conversion of memories_{tf}.txt (+ weight files) into memories_{tf}.ptm.
+
+    Returns the new store, or None if there are no legacy memories to migrate.
+    The legacy files are left untouched.
+    """
+    if not os.path.exists(legacy_paths(tf_choice, folder)["memories"]):
+        return None
+    records = parse_legacy_memories(tf_choice, folder)
+    if records.size == 0:
+        return None
+    path = store_path(tf_choice, folder)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    store = PatternMemoryStore(tmp_path, pattern_len=records.shape[1] - EXTRA_COLUMNS, dtype=dtype,
+                               initial_capacity=len(records) + _MIN_GROWTH)
+    store.append_records(records)
+    store.close()
+    os.replace(tmp_path, path)
+    return PatternMemoryStore(path)
+
+
+def load_store(tf_choice: str, pattern_len: Optional[int] = None, folder: str = ".",
+               dtype: str = "float64", journal: bool = False) -> PatternMemoryStore:
+    """Open the timeframe's store, migrating legacy text memories on first use.
+
+    With journal=True (or when a memories_{tf}.ptj journal already exists) the
+    store is a JournaledMemoryStore, which never rewrites the snapshot in place.
+    """
+    path = store_path(tf_choice, folder)
+    if not os.path.exists(path):
+        migrated = migrate_legacy(tf_choice, folder, dtype=dtype)
+        if migrated is not None:
+            if pattern_len is not None and migrated.pattern_len != pattern_len:
+                migrated.close()
+                raise MemoryStoreError(
+                    f"Legacy memories for {tf_choice} use {migrated.pattern_len}-candle patterns, not {pattern_len}"
+                )
+            if not journal:
+                return migrated
+            migrated.close()
+    if journal or os.path.exists(journal_path(path)):
+        from pt_memory_journal import JournaledMemoryStore
+        return JournaledMemoryStore(path, pattern_len=pattern_len, dtype=dtype)
+    return PatternMemoryStore(path, pattern_len=pattern_len, dtype=dtype)
+
+
+def _legacy_timeframes(folder: str) -> List[str]:
+    found = []
+    for name in sorted(os.listdir(folder)):
+        m = re.match(r"^memories_(.+)\.txt$", name)
+        if m:
+            found.append(m.group(1))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader pattern memory store")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    migrate_parser = subparsers.add_parser("migrate", help="Convert legacy memories_*.txt files")
+    migrate_parser.add_argument("folder", nargs="?", default=".", help="Coin folder")
+    migrate_parser.add_argument("--dtype", default="float64", choices=["float32", "float64"])
+    migrate_parser.add_argument("--force", action="store_true", help="Overwrite existing .ptm stores")
+
+    info_parser = subparsers.add_parser("info", help="Show store sizes")
+    info_parser.add_argument("folder", nargs="?", default=".", help="Coin folder")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        for tf in _legacy_timeframes(args.folder):
+            path = store_path(tf, args.folder)
+            if os.path.exists(path) and not args.force:
+                print(f"{tf}: {path} already exists, skipping")
+                continue
+            if os.path.exists(path):
+                os.remove(path)
+            store = migrate_legacy(tf, args.folder, dtype=args.dtype)
+            if store is None:
+                print(f"{tf}: no legacy memories")
+                continue
+            print(f"{tf}: migrated {len(store)} memories -> {path}")
+            store.close()
+
+    elif args.command == "info":
+        for name in sorted(os.listdir(args.folder)):
+            if not name.endswith(".ptm"):
+                continue
+            try:
+                path = os.path.join(args.folder, name)
+                with PatternMemoryStore(path, readonly=True) as store:
+                    line = (
+                        f"{name:<28} {len(store):>10} memories  "
+                        f"pattern_len={store.pattern_len}  dtype={store.dtype.name}"
+                    )
+                if os.path.exists(journal_path(path)):
+                    line += f"  journal={os.path.getsize(journal_path(path))} bytes"
+                print(line)
+            except MemoryStoreError as e:
+                print(f"{name}: {e}")
+
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Local Order Books
+==================================
+Order books kept locally from one REST snapshot plus streamed diff-depth
+updates, so best bid/ask, depth and slippage queries no longer download the
+whole book.
+
+Each side keeps its prices in a sorted list (bids negated, so both sides run
+best-first) with a parallel list of quantities. Cumulative quantity and
+notional are Fenwick trees: a quantity change on an existing level, and
+every depth or fill query, is O(log n). A level appearing or disappearing
+(a list insert / delete) rebuilds the trees lazily in one vectorized pass.
+
+Updates follow Binance's diff-depth sequence rules: an update carries the
+ids of its first and last change (U, u). Updates with u <= the book's id are
+already in it; an update whose U is past id + 1 means one was missed. The
+book is then marked unsynced and OrderBookManager resyncs it: updates are
+buffered while a new snapshot is fetched in the background, the snapshot is
+loaded, and buffered updates newer than it are replayed.
+
+Usage:
+    from pt_orderbook import OrderBookManager
+
+    books = OrderBookManager("binance", snapshot_fn=lambda s: binance.get_orderbook(s, 1000))
+    books.on_update("BTCUSDT", first_id=U, last_id=u, bids=[...], asks=[...])  # from the stream
+
+    book = books.book("BTCUSDT")          # None until synced
+    book.best_bid(), book.best_ask(), book.spread_pct()
+    book.cumulative("bids", 64000.0)      # quantity bid at 64000 or better
+    book.fill("buy", 2.5)                 # FillEstimate: average price, slippage
+
+    # CLI: stream BTCUSDT's book and print top of book / slippage
+    python pt_orderbook.py watch BTC --seconds 30 --qty 1
+"""
+
+import time
+import argparse
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pt_exchanges import OrderBook
+
+
+MAX_BUFFERED_UPDATES = 5000  # per symbol while a snapshot is being fetched
+RESYNC_BACKOFF = 1.0  # seconds between snapshot attempts for one symbol
+
+
+@dataclass
+class FillEstimate:
+    side: str
+    quantity: float
+    filled: float  # less than quantity when the book runs out
+    avg_price: float
+    best_price: float
+    slippage_pct: float  # avg_price vs best_price, positive = worse
+
+
+class BookSide:
+    """One side of a book, best price first.
+
+    Prices (negated for bids) and quantities are parallel sorted lists.
+    Prefix sums of quantity and notional live in two Fenwick trees: changing
+    an existing level's quantity is an O(log n) tree update, and depth / fill
+    queries are an O(log n) descent. Adding or removing a level shifts every
+    position after it, so the trees are then rebuilt on the next query with
+    one vectorized O(n) pass (numpy cumsum).
+    """
+
+    def __init__(self, descending: bool):
+        self.sign = -1.0 if descending else 1.0
+        self._keys: List[float] = []  # sign * price, ascending
+        self._qtys: List[float] = []  # quantity of _keys[i]
+        self._tree_qty: Optional[List[float]] = None  # 1-based Fenwick trees; None = rebuild
+        self._tree_notional: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._qtys.clear()
+        self._tree_qty = self._tree_notional = None
+
+    def set(self, price: float, quantity: float):
+        """Set a level's quantity; zero removes it."""
+        key = self.sign * price
+        i = bisect_left(self._keys, key)
+        exists = i < len(self._keys) and self._keys[i] == key
+        if quantity <= 0.0:
+            if exists:
+                del self._keys[i]
+                del self._qtys[i]
+                self._tree_qty = self._tree_notional = None
+        elif exists:
+            delta = quantity - self._qtys[i]
+            self._qtys[i] = quantity
+            if self._tree_qty is not None:
+                self._add(i + 1, delta, delta * price)
+        else:
+            self._keys.insert(i, key)
+            self._qtys.insert(i, quantity)
+            self._tree_qty = self._tree_notional = None
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self._keys:
+            return None
+        return self.sign * self._keys[0], self._qtys[0]
+
+    def levels(self, n: Optional[int] = None) -> List[Tuple[float, float]]:
+        keys = self._keys if n is None else self._keys[:n]
+        return [(self.sign * k, q) for k, q in zip(keys, self._qtys)]
+
+    # ---- Fenwick trees ----
+
+    def _trees(self) -> Tuple[List[float], List[float]]:
+        if self._tree_qty is None:
+            n = len(self._keys)
+            qty = np.array(self._qtys, dtype=np.float64)
+            notional = qty * np.array(self._keys, dtype=np.float64) * self.sign
+            i = np.arange(1, n + 1)
+            low = i - (i & -i)  # node i covers (low, i]
+            trees = []
+            for values in (qty, notional):
+                cum = np.concatenate(([0.0], np.cumsum(values)))
+                trees.append([0.0] + (cum[i] - cum[low]).tolist())
+            self._tree_qty, self._tree_notional = trees
+        return self._tree_qty, self._tree_notional
+
+    def _add(self, i: int, qty: float, notional: float):
+        tree_qty, tree_notional = self._tree_qty, self._tree_notional
+        n = len(tree_qty) - 1
+        while i <= n:
+            tree_qty[i] += qty
+            tree_notional[i] += notional
+            i += i & -i
+
+    @staticmethod
+    def _sum(tree: List[float], i: int) -> float:
+        """Sum of the first i levels."""
+        total = 0.0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def cumulative(self, price: float) -> float:
+        """Total quantity at `price` or better."""
+        tree_qty, _ = self._trees()
+        return self._sum(tree_qty, bisect_right(self._keys, self.sign * price))
+
+    def fill(self, quantity: float) -> Tuple[float, float]:
+        """(filled quantity, notional) for taking `quantity` from this side."""
+        tree_qty, tree_notional = self._trees()
+        n = len(self._keys)
+        if not n or quantity <= 0.0:
+            return 0.0, 0.0
+        # descend to the number of levels whose cumulative quantity stays below `quantity`
+        pos, remaining = 0, quantity
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            if pos + step <= n and tree_qty[pos + step] < remaining:
+                pos += step
+                remaining -= tree_qty[pos]
+            step >>= 1
+        if pos >= n:
+            return quantity - remaining, self._sum(tree_notional, n)
+        return quantity, self._sum(tree_notional, pos) + remaining * self.sign * self._keys[pos]
+
+
+class LocalOrderBook:
+    """A symbol's book from a snapshot plus sequence-checked updates."""
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id: Optional[int] = None
+        self.synced = False
+        self.updated_at = 0.0
+        self.updates = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_orderbook(cls, book: OrderBook) -> "LocalOrderBook":
+        local = cls(book.exchange, book.symbol)
+        local.load_snapshot(book.bids, book.asks, book.sequence or 0)
+        return local
+
+    def load_snapshot(self, bids: Iterable[Sequence], asks: Iterable[Sequence], last_update_id: int):
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for p, q in bids:
+                self.bids.set(float(p), float(q))
+            for p, q in asks:
+                self.asks.set(float(p), float(q))
+            self.last_update_id = int(last_update_id)
+            self.synced = True
+            self.updated_at = time.time()
+
+    def apply_update(self, first_id: int, last_id: int, bids: Iterable[Sequence], asks: Iterable[Sequence]) -> bool:
+        """Apply one diff; False when it shows a missed update (the book is then unsynced)."""
+        with self._lock:
+            if not self.synced:
+                return False
+            if last_id <= self.last_update_id:
+                return True  # already contained in the snapshot
+            if first_id > self.last_update_id + 1:
+                self.synced = False
+                return False
+            for p, q in bids:
+                self.bids.set(float(p), float(q))
+            for p, q in asks:
+                self.asks.set(float(p), float(q))
+            self.last_update_id = last_id
+            self.updated_at = time.time()
+            self.updates += 1
+            return True
+
+    # ---- queries ----
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self.bids.best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self.asks.best()
+
+    def mid(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+            return (bid[0] + ask[0]) / 2 if bid and ask else None
+
+    def spread_pct(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+            return (ask[0] - bid[0]) / bid[0] * 100 if bid and ask else None
+
+    def cumulative(self, side: str, price: float) -> float:
+        """Quantity on `side` ("bids" / "asks") at `price` or better."""
+        with self._lock:
+            return (self.bids if side == "bids" else self.asks).cumulative(price)
+
+    def fill(self, side: str, quantity: float) -> Optional[FillEstimate]:
+        """Average price of a market order: "buy" takes asks, "sell" takes bids."""
+        with self._lock:
+            book_side = self.asks if side == "buy" else self.bids
+            best = book_side.best()
+            if best is None:
+                return None
+            filled, notional = book_side.fill(quantity)
+        avg = notional / filled if filled else best[0]
+        slippage = (avg - best[0]) / best[0] * 100
+        return FillEstimate(
+            side=side,
+            quantity=quantity,
+            filled=filled,
+            avg_price=avg,
+            best_price=best[0],
+            slippage_pct=slippage if side == "buy" else -slippage,
+        )
+
+    def to_orderbook(self, depth: Optional[int] = None) -> OrderBook:
+        with self._lock:
+            return OrderBook(
+                exchange=self.exchange,
+                symbol=self.symbol,
+                bids=self.bids.levels(depth),
+                asks=self.asks.levels(depth),
+                timestamp=datetime.fromtimestamp(self.updated_at),
+                sequence=self.last_update_id,
+            )
+
+
+class OrderBookManager:
+    """Local books for one exchange, seeded from snapshots and resynced on gaps.
+
+    `snapshot_fn(symbol)` returns an OrderBook whose `sequence` is the id of
+    the last update it contains (Binance lastUpdateId).
+    """
+
+    def __init__(self, exchange: str, snapshot_fn: Callable[[str], OrderBook],
+                 max_buffer: int = MAX_BUFFERED_UPDATES):
+        self.exchange = exchange
+        self.snapshot_fn = snapshot_fn
+        self.max_buffer = max_buffer
+        self.books: Dict[str, LocalOrderBook] = {}
+        self.resyncs = 0
+        self._buffers: Dict[str, List[tuple]] = {}
+        self._syncing: Dict[str, float] = {}  # symbol -> start of the running snapshot fetch
+        self._last_attempt: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def book(self, symbol: str) -> Optional[LocalOrderBook]:
+        """The symbol's book, or None while it is not synced."""
+        book = self.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def on_update(self, symbol: str, first_id: int, last_id: int, bids, asks):
+        """Feed one streamed diff; buffers it and starts a resync when the book is not usable."""
+        with self._lock:
+            book = self.books.get(symbol)
+            if book is None:
+                book = self.books[symbol] = LocalOrderBook(self.exchange, symbol)
+            if book.synced:
+                if book.apply_update(first_id, last_id, bids, asks):
+                    return
+                print(f"[OrderBook] {self.exchange} {symbol}: missed updates before {first_id}; resyncing")
+            buffer = self._buffers.setdefault(symbol, [])
+            buffer.append((first_id, last_id, bids, asks))
+            if len(buffer) > self.max_buffer:
+                del buffer[: len(buffer) - self.max_buffer]
+            now = time.time()
+            if symbol in self._syncing or now - self._last_attempt.get(symbol, 0.0) < RESYNC_BACKOFF:
+                return
+            self._syncing[symbol] = self._last_attempt[symbol] = now
+        threading.Thread(target=self.resync, args=(symbol,), name=f"book-{symbol}", daemon=True).start()
+
+    def resync(self, symbol: str) -> bool:
+        """Load a fresh snapshot and replay buffered updates newer than it."""
+        try:
+            snapshot = self.snapshot_fn(symbol)
+        except Exception as e:
+            print(f"[OrderBook] {self.exchange} {symbol}: snapshot failed: {e}")
+            with self._lock:
+                self._syncing.pop(symbol, None)
+            return False
+        with self._lock:
+            self._syncing.pop(symbol, None)
+            book = self.books.get(symbol)
+            if book is None:
+                book = self.books[symbol] = LocalOrderBook(self.exchange, symbol)
+            book.load_snapshot(snapshot.bids, snapshot.asks, snapshot.sequence or 0)
+            self.resyncs += 1
+            buffered = self._buffers.pop(symbol, [])
+            for first_id, last_id, bids, asks in buffered:
+                if not book.apply_update(first_id, last_id, bids, asks):
+                    # the snapshot is older than the buffered updates reach back; try again later
+                    print(f"[OrderBook] {self.exchange} {symbol}: snapshot too old for buffered updates")
+                    return False
+            return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader local order books")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    watch_parser = subparsers.add_parser("watch", help="Maintain a Binance book from the diff stream")
+    watch_parser.add_argument("coin", help="Coin symbol")
+    watch_parser.add_argument("--seconds", type=float, default=30.0)
+    watch_parser.add_argument("--qty", type=float, default=1.0, help="Order size for the slippage estimate")
+
+    args = parser.parse_args()
+
+    if args.command == "watch":
+        from pt_exchanges import ExchangeManager
+
+        manager = ExchangeManager(["binance"])
+        coin = args.coin.upper()
+        if manager.start_stream([coin], depth=True, local_books=True) is None:
+            return
+        deadline = time.time() + args.seconds
+        try:
+            while time.time() < deadline:
+                time.sleep(1.0)
+                book = manager.stream.order_books["binance"].book(manager.exchanges["binance"].normalize_symbol(coin))
+                if book is None:
+                    print("syncing...")
+                    continue
+                bid, ask = book.best_bid(), book.best_ask()
+                buy, sell = book.fill("buy", args.qty), book.fill("sell", args.qty)
+                print(
+                    f"bid {bid[0]:,.2f} x {bid[1]:.4f}  ask {ask[0]:,.2f} x {ask[1]:.4f}  "
+                    f"levels {len(book.bids)}/{len(book.asks)}  "
+                    f"buy {args.qty:g}: {buy.avg_price:,.2f} ({buy.slippage_pct:.3f}%)  "
+                    f"sell: {sell.avg_price:,.2f} ({sell.slippage_pct:.3f}%)"
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            manager.close()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
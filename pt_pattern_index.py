@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Pattern Memory Index
+=====================================
+Optional sub-linear lookup over a PatternMemoryStore for the
+"all memories within perfect_threshold" and "closest memory" queries.
+
+The trainer's distance is the average symmetric percent difference over the
+pattern candles, which is not a metric, so a generic KD-tree does not apply.
+It does give a hard bound per candle: when the average is at most t over L
+candles, no single candle can differ by more than L * t. For one candle value
+c, that bound is an interval of memory values around c (plus the exact value
+-c, where the formula defines the difference as zero). The index keeps the
+memories sorted by one key candle (a one-dimensional KD-tree). It
+binary-searches that interval and then scores only those candidates with
+match_pattern(), so results are exact.
+
+Modes:
+    exact   - per-candle bound of L * threshold; recall identical to a full scan
+    approx  - per-candle bound of approx_slack * threshold; tighter, faster,
+              may miss memories whose difference is concentrated in the key candle
+
+New memories land in a small unsorted tail and are merged into the sorted
+arrays once the tail grows past sqrt(n), so appends stay cheap.
+
+Usage:
+    from pt_pattern_index import PatternIndex
+
+    index = PatternIndex(store, mode="exact")
+    result = index.match(current_pattern, perfect_threshold)
+    best, diff = index.closest(current_pattern)
+"""
+
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from pt_pattern_match import MatchResult, match_pattern, pattern_differences
+
+
+INDEX_MODES = ("exact", "approx")
+
+# Relative widening of the search interval; candidates are re-scored exactly,
+# so this only guards the interval edges against rounding.
+_EDGE_EPS = 1e-9
+_MIN_TAIL = 256
+
+
+class PatternIndex:
+    """Sorted-key candidate index over a PatternMemoryStore."""
+
+    def __init__(
+        self,
+        store,
+        mode: str = "exact",
+        approx_slack: float = 1.0,
+        key_dim: int = -1,
+    ):
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode {mode}, expected one of {INDEX_MODES}")
+        self.store = store
+        self.mode = mode
+        self.approx_slack = approx_slack
+        self.key_dim = key_dim % store.pattern_len if store.pattern_len else 0
+        self._keys = np.empty(0, dtype=np.float64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._tail_ids = []
+        self._tail_keys = []
+        self._indexed = 0
+        self.sync()
+
+    def __len__(self) -> int:
+        return self._indexed
+
+    # ---- maintenance ----
+
+    def add(self, index: int):
+        """Index one newly appended memory."""
+        self._tail_ids.append(int(index))
+        self._tail_keys.append(float(self.store.patterns[index, self.key_dim]))
+        self._indexed = max(self._indexed, int(index) + 1)
+        if len(self._tail_ids) > max(_MIN_TAIL, int(math.sqrt(len(self._ids)))):
+            self._merge_tail()
+
+    def sync(self):
+        """Pick up memories appended to the store since the last call."""
+        count = len(self.store)
+        if count <= self._indexed:
+            return
+        if count - self._indexed > _MIN_TAIL:
+            new_ids = np.arange(self._indexed, count, dtype=np.int64)
+            new_keys = np.asarray(self.store.patterns[self._indexed:count, self.key_dim], dtype=np.float64)
+            self._tail_ids.extend(new_ids.tolist())
+            self._tail_keys.extend(new_keys.tolist())
+            self._indexed = count
+            self._merge_tail()
+        else:
+            for i in range(self._indexed, count):
+                self.add(i)
+
+    def rebuild(self):
+        """Re-index the whole store, e.g. after its rows were rewritten."""
+        self._keys = np.empty(0, dtype=np.float64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._tail_ids = []
+        self._tail_keys = []
+        self._indexed = 0
+        self.sync()
+
+    def _merge_tail(self):
+        if not self._tail_ids:
+            return
+        keys = np.concatenate([self._keys, np.asarray(self._tail_keys, dtype=np.float64)])
+        ids = np.concatenate([self._ids, np.asarray(self._tail_ids, dtype=np.int64)])
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = ids[order]
+        self._tail_ids = []
+        self._tail_keys = []
+
+    # ---- queries ----
+
+    def _key_bound(self, threshold: float) -> float:
+        if self.mode == "exact":
+            return self.store.pattern_len * threshold
+        return self.approx_slack * threshold
+
+    def candidates(self, current_pattern: Sequence[float], threshold: float) -> Optional[np.ndarray]:
+        """Memory indices that can be within `threshold`, or None when the bound is too loose to prune."""
+        self.sync()
+        k = self._key_bound(threshold) / 200.0
+        if k >= 1.0:
+            return None
+
+        c = float(current_pattern[self.key_dim])
+        if c > 0:
+            lo, hi = c * (1 - k) / (1 + k), c * (1 + k) / (1 - k)
+        elif c < 0:
+            lo, hi = c * (1 + k) / (1 - k), c * (1 - k) / (1 + k)
+        else:
+            lo = hi = 0.0
+        lo -= abs(lo) * _EDGE_EPS
+        hi += abs(hi) * _EDGE_EPS
+
+        left = np.searchsorted(self._keys, lo, side="left")
+        right = np.searchsorted(self._keys, hi, side="right")
+        parts = [self._ids[left:right]]
+        if c != 0.0:
+            # c + m == 0 counts as a zero difference
+            nl = np.searchsorted(self._keys, -c, side="left")
+            nr = np.searchsorted(self._keys, -c, side="right")
+            parts.append(self._ids[nl:nr])
+        if self._tail_ids:
+            tail_keys = np.asarray(self._tail_keys, dtype=np.float64)
+            hit = ((tail_keys >= lo) & (tail_keys <= hi)) | (tail_keys == -c)
+            parts.append(np.asarray(self._tail_ids, dtype=np.int64)[hit])
+        return np.unique(np.concatenate(parts))
+
+    def match(self, current_pattern: Sequence[float], threshold: float) -> MatchResult:
+        """All memories within `threshold`. best_index is the closest scanned candidate."""
+        return match_pattern(
+            current_pattern, self.store, threshold,
+            candidates=self.candidates(current_pattern, threshold),
+        )
+
+    def closest(self, current_pattern: Sequence[float], start_threshold: float = 1.0) -> Tuple[Optional[int], float]:
+        """Closest memory and its diff, widening the search radius until it is found."""
+        self.sync()
+        if len(self.store) == 0:
+            return None, float("inf")
+        threshold = max(start_threshold, 1e-6)
+        while True:
+            cands = self.candidates(current_pattern, threshold)
+            if cands is None:
+                cands = np.arange(len(self.store))
+            if len(cands):
+                diffs = pattern_differences(current_pattern, self.store.patterns[cands])
+                best = int(np.argmin(diffs))
+                # in exact mode anything closer than `threshold` is guaranteed to be a candidate
+                if diffs[best] <= threshold or len(cands) == len(self.store):
+                    return int(cands[best]), float(diffs[best])
+            threshold *= 4.0
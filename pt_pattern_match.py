@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Vectorized Pattern Matcher
+===========================================
+Scores the current candle pattern against every memory in a
+PatternMemoryStore in one batched NumPy pass, replacing the trainer's
+per-memory, per-candle Python loop.
+
+The arithmetic mirrors the original loop operation for operation, so the
+matched indices, diffs and weighted moves are bit-identical to it:
+
+    diff = |(|c - m| / ((c + m) / 2)) * 100|     (0.0 when c + m == 0)
+    diff_avg = sum(diffs) / len(diffs)
+    matched when diff_avg <= perfect_threshold
+
+Usage:
+    from pt_pattern_match import match_pattern, update_weights
+
+    result = match_pattern(current_pattern, store, perfect_threshold)
+    if result.matched:
+        print(result.final_move, result.high_final_move, result.low_final_move)
+
+    # once the next candle is known
+    weights, high_weights, low_weights = update_weights(result, close_diff, high_diff, low_diff)
+    store.set_weights_batch(result.indices, weights, high_weights, low_weights)
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class MatchResult:
+    indices: np.ndarray        # matched memory indices, ascending
+    diffs: np.ndarray          # diff_avg of each matched memory
+    all_diffs: np.ndarray      # diff_avg of every scanned memory
+    scanned: np.ndarray        # memory indices that were scored (all_diffs order)
+    close_moves: np.ndarray    # close outcome x weight (percent)
+    high_moves: np.ndarray     # high outcome / 100 x high weight
+    low_moves: np.ndarray      # low outcome / 100 x low weight
+    close_unweighted: np.ndarray
+    high_unweighted: np.ndarray
+    low_unweighted: np.ndarray
+    weights: np.ndarray
+    high_weights: np.ndarray
+    low_weights: np.ndarray
+    final_move: float
+    high_final_move: float
+    low_final_move: float
+    best_index: Optional[int]  # closest matched memory, else closest overall
+
+    @property
+    def matched(self) -> bool:
+        return len(self.indices) > 0
+
+    @property
+    def count(self) -> int:
+        return len(self.indices)
+
+
+def pattern_differences(current_pattern: Sequence[float], patterns: np.ndarray) -> np.ndarray:
+    """Average symmetric percent difference between one pattern and each row of `patterns`."""
+    patterns = np.asarray(patterns, dtype=np.float64)
+    current = np.asarray(current_pattern, dtype=np.float64)
+    n, length = patterns.shape if patterns.ndim == 2 else (0, len(current))
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+    if length != len(current):
+        raise ValueError(f"Pattern has {len(current)} candles, memories have {length}")
+
+    total = np.zeros(n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # accumulate candle by candle so the sum matches Python's left-to-right sum()
+        for j in range(length):
+            c = current[j]
+            m = patterns[:, j]
+            s = c + m
+            d = np.abs((np.abs(c - m) / (s / 2)) * 100)
+            d[s == 0.0] = 0.0
+            total += d
+    return total / length
+
+
+# reward / penalty applied to a matched memory's weights once its outcome is known
+WEIGHT_STEP = 0.25
+WEIGHT_MAX = 2.0
+HIGH_LOW_WEIGHT_MIN = 0.0
+CLOSE_WEIGHT_MIN = -2.0
+
+
+def _nudge(weights: np.ndarray, up: np.ndarray, down: np.ndarray, floor: float) -> np.ndarray:
+    return np.where(
+        up, np.minimum(weights + WEIGHT_STEP, WEIGHT_MAX),
+        np.where(down, np.maximum(weights - WEIGHT_STEP, floor), weights),
+    )
+
+
+def update_weights(
+    result: MatchResult,
+    close_diff: float,
+    high_diff: float,
+    low_diff: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """New (close, high, low) weights for every matched memory, given the actual moves.
+
+    A weight gains WEIGHT_STEP when the actual move beats the memory's weighted
+    move by more than 10% and loses it when it falls short by more than 10%
+    (inverted for lows). High/low weights are clamped to 0..2, close weights to
+    -2..2. The thresholds compare against weighted move x 100, as the trainer
+    always has, close moves included.
+    """
+    var3 = result.close_moves * 100
+    high_var3 = result.high_moves * 100
+    low_var3 = result.low_moves * 100
+    high_weights = _nudge(
+        result.high_weights,
+        high_diff > high_var3 + (high_var3 * 0.1),
+        high_diff < high_var3 - (high_var3 * 0.1),
+        HIGH_LOW_WEIGHT_MIN,
+    )
+    low_weights = _nudge(
+        result.low_weights,
+        low_diff < low_var3 - (low_var3 * 0.1),
+        low_diff > low_var3 + (low_var3 * 0.1),
+        HIGH_LOW_WEIGHT_MIN,
+    )
+    weights = _nudge(
+        result.weights,
+        close_diff > var3 + (var3 * 0.1),
+        close_diff < var3 - (var3 * 0.1),
+        CLOSE_WEIGHT_MIN,
+    )
+    return weights, high_weights, low_weights
+
+
+def _mean(values: np.ndarray) -> float:
+    # Python's sum() over the (small) matched set keeps parity with the original loop
+    return sum(values.tolist()) / len(values)
+
+
+def match_pattern(
+    current_pattern: Sequence[float],
+    store,
+    threshold: float,
+    candidates: Optional[np.ndarray] = None,
+) -> MatchResult:
+    """Find every memory within `threshold` of the current pattern.
+
+    `store` is a PatternMemoryStore (or anything exposing the same array
+    properties). `candidates` optionally restricts the scan to a subset of
+    memory indices, e.g. the output of a PatternIndex lookup.
+    """
+    if candidates is None:
+        scanned = np.arange(len(store))
+        patterns = store.patterns
+    else:
+        scanned = np.sort(np.asarray(candidates, dtype=np.int64))
+        patterns = store.patterns[scanned]
+
+    all_diffs = pattern_differences(current_pattern, patterns)
+    hit = all_diffs <= threshold
+    indices = scanned[hit]
+    diffs = all_diffs[hit]
+
+    close_unweighted = np.asarray(store.close_moves[indices], dtype=np.float64)
+    high_unweighted = np.asarray(store.high_moves[indices], dtype=np.float64) / 100
+    low_unweighted = np.asarray(store.low_moves[indices], dtype=np.float64) / 100
+    weights = np.asarray(store.weights[indices], dtype=np.float64)
+    high_weights = np.asarray(store.high_weights[indices], dtype=np.float64)
+    low_weights = np.asarray(store.low_weights[indices], dtype=np.float64)
+
+    close_moves = close_unweighted * weights
+    high_moves = high_unweighted * high_weights
+    low_moves = low_unweighted * low_weights
+
+    if len(indices):
+        final_move = _mean(close_moves)
+        high_final_move = _mean(high_moves)
+        low_final_move = _mean(low_moves)
+        best_index = int(indices[int(np.argmin(diffs))])
+    else:
+        final_move = high_final_move = low_final_move = 0.0
+        best_index = int(scanned[int(np.argmin(all_diffs))]) if len(all_diffs) else None
+
+    return MatchResult(
+        indices=indices,
+        diffs=diffs,
+        all_diffs=all_diffs,
+        scanned=scanned,
+        close_moves=close_moves,
+        high_moves=high_moves,
+        low_moves=low_moves,
+        close_unweighted=close_unweighted,
+        high_unweighted=high_unweighted,
+        low_unweighted=low_unweighted,
+        weights=weights,
+        high_weights=high_weights,
+        low_weights=low_weights,
+        final_move=final_move,
+        high_final_move=high_final_move,
+        low_final_move=low_final_move,
+        best_index=best_index,
+    )
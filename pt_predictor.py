@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Live Prediction Engine
+=======================================
+Turns a coin's trained memories into the thinker's per-timeframe levels.
+
+For every timeframe from 1hour to 1week the pattern of the newest closed
+candles is matched against the trained memories (pt_pattern_match.py), and
+the weighted mean high/low moves predict the range of the candle that is
+currently open:
+
+    high bound = start * (1 + high_move)      start = close of the newest closed candle
+    low bound  = start * (1 + low_move)
+
+When no memory is within the threshold the moves are 0, a flat range at the
+start price, exactly as PatternTrainer.predict.
+
+The LONG level is the number of timeframes whose low bound the price has
+dropped below, the SHORT level the number whose high bound it has risen
+above (0-7 each, see README "Neural Levels").
+
+Memories are the shared read-only snapshots the trainer publishes
+(pt_memory_snapshot.py): each coin's seven timeframes are mapped once and
+remapped only when the trainer publishes a new generation. When a candle
+closes, PredictionService fetches just the candles that closed, recomputes
+all seven timeframes of every coin in one pass and writes the coin folder's
+signal files atomically (temp file + os.replace), so the trader and hub
+never read a half-written file:
+
+    long_dca_signal.txt / short_dca_signal.txt     LONG / SHORT level
+    low_bound_prices.html / high_bound_prices.html  7 space-separated prices, 1hour .. 1week
+
+A timeframe without a prediction (no memories or candles yet) keeps its slot
+in the bound files as "nan", so the other prices stay in position.
+
+run() registers every coin with a CandleCloseScheduler (pt_candle_clock.py),
+so the service sleeps until the next boundary instead of polling. A closed
+candle the exchange has not published yet is fetched again with a short
+backoff (LATE_RETRY_DELAYS) until it arrives, and only then is that coin
+predicted again. Between closes, update_price() re-scores the levels against a new price without
+matching again.
+
+Usage:
+    from pt_predictor import PredictionService
+
+    service = PredictionService(["BTC", "ETH"], base_dir=".", source=source)
+    signals = service.on_candle_close()      # {coin: CoinSignals}
+    service.run()                            # pt_candle_clock wakes it on every candle close
+
+    # CLI
+    python pt_predictor.py BTC ETH --once --source file:candle_data
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from pt_exchanges import OHLCV
+from pt_candle_clock import CandleCloseScheduler, CloseEvent
+from pt_candle_store import CandleStore, candle_open, timeframe_seconds
+from pt_candle_source import CandleSource, CandleSourceError, DEFAULT_SOURCE, source_from_spec
+from pt_memory_prune import read_threshold
+from pt_memory_snapshot import SnapshotReader
+from pt_pattern_index import PatternIndex
+from pt_pattern_match import match_pattern
+
+
+TIMEFRAMES = ['1hour', '2hour', '4hour', '8hour', '12hour', '1day', '1week']
+SIGNAL_FILES = {
+    "long": "long_dca_signal.txt",
+    "short": "short_dca_signal.txt",
+    "low": "low_bound_prices.html",
+    "high": "high_bound_prices.html",
+}
+MISSING_PRICE = "nan"  # bound of a timeframe without a prediction; float() parses it and it never triggers
+CANDLE_HISTORY = 8  # closed candles kept per coin/timeframe (at least the pattern length)
+FETCH_WORKERS = 8
+CLOSE_DELAY = 1.0  # seconds after a boundary before fetching, so the exchange has the closed candle
+PRICE_INTERVAL = 10.0  # seconds between price re-checks in run() (0 = only on closes)
+LATE_RETRY_DELAYS = (2.0, 5.0, 10.0, 20.0, 30.0, 60.0)  # re-fetches of candles not yet published at the close
+
+
+@dataclass
+class LevelPrediction:
+    timeframe: str
+    candle_time: int  # open time of the newest closed candle the pattern ends on
+    start_price: float
+    close_price: float
+    high_price: float
+    low_price: float
+    matches: int
+    generation: int  # memory snapshot generation used
+
+
+@dataclass
+class CoinSignals:
+    coin: str
+    price: float
+    levels: List[LevelPrediction]
+    long_signal: int = 0
+    short_signal: int = 0
+    computed_at: float = field(default_factory=time.time)
+    timeframes: List[str] = field(default_factory=lambda: list(TIMEFRAMES))  # slots of the bound files
+
+    def _by_slot(self) -> List[Optional[LevelPrediction]]:
+        by_tf = {level.timeframe: level for level in self.levels}
+        return [by_tf.get(tf) for tf in self.timeframes]
+
+    @property
+    def low_bounds(self) -> List[Optional[float]]:
+        """One low bound per timeframe slot; None where that timeframe has no prediction."""
+        return [None if level is None else level.low_price for level in self._by_slot()]
+
+    @property
+    def high_bounds(self) -> List[Optional[float]]:
+        return [None if level is None else level.high_price for level in self._by_slot()]
+
+    def score(self, price: float):
+        """Recount the LONG / SHORT levels for a new price."""
+        self.price = price
+        self.long_signal = sum(1 for level in self.levels if price < level.low_price)
+        self.short_signal = sum(1 for level in self.levels if price > level.high_price)
+
+
+def close_changes(candles: Sequence[OHLCV]) -> np.ndarray:
+    """Percent close changes, the same series the trainer matches (100 * (close - open) / open)."""
+    opens = np.fromiter((c.open for c in candles), dtype=np.float64, count=len(candles))
+    closes = np.fromiter((c.close for c in candles), dtype=np.float64, count=len(candles))
+    return 100*((closes-opens)/opens)
+
+
+class CoinModel:
+    """The mapped memory snapshots of one coin and the levels predicted from them."""
+
+    def __init__(self, coin: str, folder: str, timeframes: Sequence[str] = TIMEFRAMES, index: bool = True):
+        self.coin = coin
+        self.folder = folder
+        self.timeframes = list(timeframes)
+        self.use_index = index
+        self.readers = {tf: SnapshotReader(tf, folder) for tf in self.timeframes}
+        self.indexes: Dict[str, Optional[PatternIndex]] = {}
+        self.thresholds: Dict[str, float] = {}
+        for tf in self.timeframes:
+            self._load(tf)
+
+    def _load(self, tf: str):
+        reader = self.readers[tf]
+        threshold = reader.perfect_threshold
+        self.thresholds[tf] = threshold if threshold is not None else read_threshold(tf, self.folder)
+        # the exact index returns the same matches as a full scan, touching only nearby memories
+        self.indexes[tf] = PatternIndex(reader.store, mode="exact") if self.use_index and len(reader) else None
+
+    def refresh(self) -> List[str]:
+        """Remap timeframes the trainer republished; returns the ones that changed."""
+        changed = [tf for tf, reader in self.readers.items() if reader.refresh()]
+        for tf in changed:
+            self._load(tf)
+        return changed
+
+    @property
+    def ready(self) -> bool:
+        return any(len(reader) for reader in self.readers.values())
+
+    def predict(self, tf: str, candles: Sequence[OHLCV]) -> Optional[LevelPrediction]:
+        """Levels of the candle after `candles` (closed, oldest first) for one timeframe."""
+        reader = self.readers[tf]
+        store = reader.store
+        if store is None or not len(store) or len(candles) < store.pattern_len:
+            return None
+        pattern = close_changes(candles[-store.pattern_len:])
+        threshold = self.thresholds[tf]
+        index = self.indexes.get(tf)
+        match = index.match(pattern, threshold) if index is not None else match_pattern(pattern, store, threshold)
+        if match.matched:
+            close_move, high_move, low_move = match.final_move, match.high_final_move, match.low_final_move
+        else:
+            # nothing inside the threshold: a flat range, as PatternTrainer.predict
+            close_move = high_move = low_move = 0.0
+        start = float(candles[-1].close)
+        return LevelPrediction(
+            timeframe=tf,
+            candle_time=int(candles[-1].timestamp),
+            start_price=start,
+            close_price=start+(start*(close_move/100)),
+            high_price=start+(start*high_move),
+            low_price=start+(start*low_move),
+            matches=match.count,
+            generation=reader.generation,
+        )
+
+    def predict_all(self, candles: Dict[str, Sequence[OHLCV]]) -> List[LevelPrediction]:
+        """One pass over every timeframe that has memories and candles."""
+        levels = []
+        for tf in self.timeframes:
+            level = self.predict(tf, candles.get(tf, ()))
+            if level is not None:
+                levels.append(level)
+        return levels
+
+    def close(self):
+        for reader in self.readers.values():
+            reader.close()
+
+
+def _write_atomic(path: str, text: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def format_prices(prices: Sequence[Optional[float]]) -> str:
+    return " ".join(MISSING_PRICE if p is None else format(p, ".10g") for p in prices)
+
+
+def write_signals(folder: str, signals: CoinSignals, previous: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Write the four signal files atomically; files whose text is unchanged are skipped."""
+    texts = {
+        SIGNAL_FILES["long"]: str(signals.long_signal),
+        SIGNAL_FILES["short"]: str(signals.short_signal),
+        SIGNAL_FILES["low"]: format_prices(signals.low_bounds),
+        SIGNAL_FILES["high"]: format_prices(signals.high_bounds),
+    }
+    for name, text in texts.items():
+        if previous is not None and previous.get(name) == text:
+            continue
+        _write_atomic(os.path.join(folder, name), text)
+    return texts
+
+
+class PredictionService:
+    """Keeps every coin's levels and signal files current as candles close."""
+
+    def __init__(
+        self,
+        coins: Sequence[str],
+        base_dir: str = ".",
+        source: Optional[CandleSource] = None,
+        price_fn: Optional[Callable[[str], float]] = None,
+        timeframes: Sequence[str] = TIMEFRAMES,
+        folder_fn: Optional[Callable[[str], str]] = None,
+        index: bool = True,
+    ):
+        self.coins = [c.upper() for c in coins]
+        self.source = source
+        self.price_fn = price_fn
+        self.timeframes = list(timeframes)
+        folder_fn = folder_fn or (lambda coin: os.path.join(base_dir, coin))
+        self.folders = {coin: folder_fn(coin) for coin in self.coins}
+        self.models = {coin: CoinModel(coin, self.folders[coin], self.timeframes, index=index) for coin in self.coins}
+        self.candles: Dict[Tuple[str, str], Deque[OHLCV]] = {
+            (coin, tf): deque(maxlen=CANDLE_HISTORY) for coin in self.coins for tf in self.timeframes
+        }
+        self.signals: Dict[str, CoinSignals] = {}
+        self._written: Dict[str, Dict[str, str]] = {}
+        self.last_latency_ms: Dict[str, float] = {}
+        self._clock: Optional[CandleCloseScheduler] = None
+        self._late: Set[str] = set()  # coins with a closed candle the source has not published yet
+        self._late_attempt = 0
+
+    # ---- candles ----
+
+    def _due(self, now: int, coins: Optional[Sequence[str]] = None) -> List[Tuple[str, str]]:
+        """(coin, timeframe) pairs whose newest closed candle is not cached yet."""
+        due = []
+        for (coin, tf), cached in self.candles.items():
+            if coins is not None and coin not in coins:
+                continue
+            newest_closed = candle_open(now, tf)-timeframe_seconds(tf)
+            if not cached or cached[-1].timestamp < newest_closed:
+                due.append((coin, tf))
+        return due
+
+    def _fetch(self, coin: str, tf: str, now: int) -> List[OHLCV]:
+        cached = self.candles[(coin, tf)]
+        if cached:
+            return self.source.candles_since(coin, tf, cached[-1].timestamp)
+        return self.source.get_candles(coin, tf, start=candle_open(now, tf)-CANDLE_HISTORY*timeframe_seconds(tf))
+
+    def update_candles(self, now: Optional[int] = None, coins: Optional[Sequence[str]] = None) -> int:
+        """Fetch the candles that closed since the last call (concurrently); returns pairs updated."""
+        if self.source is None:
+            return 0
+        now = self.source.now() if now is None else int(now)
+        due = self._due(now, coins)
+        if not due:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(due))) as pool:
+            futures = {pair: pool.submit(self._fetch, pair[0], pair[1], now) for pair in due}
+        updated = 0
+        for pair, future in futures.items():
+            try:
+                new_candles = future.result()
+            except CandleSourceError as e:
+                print(f"[Predictor] {pair[0]} {pair[1]}: {e}")
+                continue
+            if new_candles:
+                self.candles[pair].extend(new_candles)
+                updated += 1
+        return updated
+
+    def set_candles(self, coin: str, tf: str, candles: Sequence[OHLCV]):
+        """Feed closed candles directly (e.g. from a websocket) instead of the source."""
+        cached = self.candles[(coin.upper(), tf)]
+        newest = cached[-1].timestamp if cached else None
+        cached.extend(c for c in candles if newest is None or c.timestamp > newest)
+
+    # ---- predictions ----
+
+    def predict_coin(self, coin: str, price: Optional[float] = None) -> Optional[CoinSignals]:
+        """Recompute all timeframes of one coin and write its signal files."""
+        started = time.perf_counter()
+        model = self.models[coin]
+        model.refresh()
+        candles = {tf: list(self.candles[(coin, tf)]) for tf in self.timeframes}
+        levels = model.predict_all(candles)
+        if not levels:
+            return None
+        if price is None:
+            price = levels[0].start_price  # close of the newest candle
+        signals = CoinSignals(coin=coin, price=price, levels=levels, timeframes=self.timeframes)
+        signals.score(price)
+        self._publish(coin, signals)
+        self.last_latency_ms[coin] = (time.perf_counter()-started)*1000
+        return signals
+
+    def on_candle_close(self, now: Optional[int] = None, coins: Optional[Sequence[str]] = None) -> Dict[str, CoinSignals]:
+        """Fetch what closed, then predict all seven timeframes of `coins` (default all) and write the files."""
+        coins = self.coins if coins is None else [c.upper() for c in coins]
+        self.update_candles(now, coins)
+        results = {}
+        for coin in coins:
+            price = self._price(coin)
+            signals = self.predict_coin(coin, price)
+            if signals is not None:
+                results[coin] = signals
+        return results
+
+    def update_price(self, coin: str, price: float) -> Optional[CoinSignals]:
+        """Re-score the current levels against a new price; files are rewritten only when a level changes."""
+        signals = self.signals.get(coin.upper())
+        if signals is None:
+            return None
+        signals.score(price)
+        self._publish(coin.upper(), signals)
+        return signals
+
+    def _price(self, coin: str) -> Optional[float]:
+        if self.price_fn is None:
+            return None
+        try:
+            return float(self.price_fn(coin))
+        except Exception as e:
+            print(f"[Predictor] {coin}: price unavailable ({e}); using the last close")
+            return None
+
+    def _publish(self, coin: str, signals: CoinSignals):
+        self.signals[coin] = signals
+        try:
+            self._written[coin] = write_signals(self.folders[coin], signals, self._written.get(coin))
+        except OSError as e:
+            print(f"[Predictor] {coin}: could not write signal files: {e}")
+
+    # ---- loop ----
+
+    def _on_close(self, event: CloseEvent):
+        self.on_candle_close(coins=event.coins)
+        self._report(event.coins, event.lag)
+        if self.source is not None:
+            late = {coin for coin, _ in self._due(self.source.now(), event.coins)}
+            if late:
+                self._late |= late
+                self._late_attempt = 0
+                self._schedule_late()
+
+    def _schedule_late(self):
+        if not self._late or self._clock is None:
+            return
+        if self._late_attempt >= len(LATE_RETRY_DELAYS):
+            print(f"[Predictor] {', '.join(sorted(self._late))}: closed candle still missing; waiting for the next close")
+            self._late = set()
+            return
+        self._clock.call_later("late-candles", LATE_RETRY_DELAYS[self._late_attempt], self._retry_late)
+
+    def _retry_late(self):
+        """Re-fetch the pairs whose closed candle was missing and re-predict the coins that got it."""
+        coins = sorted(self._late)
+        now = self.source.now()
+        due = self._due(now, coins)
+        self.update_candles(now, coins)
+        still_due = set(self._due(now, coins))
+        arrived = sorted({coin for coin, tf in due if (coin, tf) not in still_due})
+        for coin in arrived:
+            self.predict_coin(coin, self._price(coin))
+        if arrived:
+            self._report(arrived)
+        self._late = {coin for coin, _ in still_due}
+        self._late_attempt += 1
+        self._schedule_late()
+
+    def check_prices(self):
+        """Re-score every coin against a fresh price (between closes)."""
+        for coin in self.coins:
+            price = self._price(coin)
+            if price is not None:
+                self.update_price(coin, price)
+
+    def run(self, price_interval: float = PRICE_INTERVAL, should_stop: Optional[Callable[[], bool]] = None,
+            clock: Optional[CandleCloseScheduler] = None):
+        """Predict now, then whenever a candle closes; re-score prices every `price_interval` seconds."""
+        self.on_candle_close()
+        self._report()
+        clock = self._clock = clock or CandleCloseScheduler(delay=CLOSE_DELAY)
+        for coin in self.coins:
+            clock.add_job(coin, self.timeframes, self._on_close)
+        if self.price_fn is not None and price_interval:
+            clock.add_interval("prices", price_interval, self.check_prices)
+        clock.run(should_stop)
+
+    def _report(self, coins: Optional[Sequence[str]] = None, lag: Optional[float] = None):
+        for coin in coins or self.coins:
+            signals = self.signals.get(coin)
+            if signals is None:
+                print(f"[Predictor] {coin}: no trained memories or candles yet")
+                continue
+            print(f"[Predictor] {coin}: LONG {signals.long_signal} SHORT {signals.short_signal} "
+                  f"@ {signals.price:.8g} ({len(signals.levels)} timeframes, {self.last_latency_ms.get(coin, 0):.1f} ms"
+                  + ("" if lag is None else f", {lag:.1f} s after close") + ")")
+
+    def close(self):
+        for model in self.models.values():
+            model.close()
+        if self.source is not None:
+            self.source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader live prediction engine")
+    parser.add_argument("coins", nargs="+", help="Coins, e.g. BTC ETH")
+    parser.add_argument("--base-dir", default=".", help="Folder holding one subfolder per coin")
+    parser.add_argument("--source", default=DEFAULT_SOURCE,
+                        help="Candle source: exchange:binance|exchange:coinbase|cache:NAME|file:FOLDER")
+    parser.add_argument("--once", action="store_true", help="Predict once and exit")
+    parser.add_argument("--no-index", action="store_true", help="Full memory scan instead of the pattern index")
+    args = parser.parse_args()
+
+    try:
+        source = source_from_spec(args.source, CandleStore())
+    except CandleSourceError as e:
+        print(e)
+        sys.exit(2)
+    service = PredictionService(args.coins, base_dir=args.base_dir, source=source, index=not args.no_index)
+    try:
+        if args.once:
+            service.on_candle_close()
+            service._report()
+        else:
+            service.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Exchange Rate Limiter
+======================================
+Token-bucket limiter per exchange, costed in the exchange's own request
+weight units, so cheap calls burst and expensive ones (deep order books,
+bulk tickers) wait for the budget they actually use.
+
+A call reserves its weight under a short lock and is told how long to wait
+for the bucket to cover it; the bucket may go negative, which queues later
+callers behind it in order. The same reservation backs the blocking
+acquire() (threads) and acquire_async() (coroutines), and no lock is held
+while waiting.
+
+After each response the bucket is corrected from what the server reports:
+Binance's X-MBX-USED-WEIGHT-1M (weight used in the current minute window)
+caps the available tokens at limit - used, and a 429 / 418 with Retry-After
+pauses the whole exchange until then.
+
+Usage:
+    from pt_rate_limit import BINANCE_LIMITS, get_limiter
+
+    limiter = get_limiter(**BINANCE_LIMITS)     # shared by every Binance client in the process
+    limiter.acquire(weight=2)
+    resp = session.get(url, params=params)
+    limiter.observe(resp.headers, resp.status_code)
+
+    await limiter.acquire_async(weight=5)   # from asyncio code
+
+    # CLI: one request and the limiter state it leaves behind
+    python pt_rate_limit.py probe binance
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+
+# Binance spot: 6000 request weight per minute window per IP
+BINANCE_LIMITS = dict(
+    name="binance",
+    limit=6000,
+    window=60.0,
+    used_header="X-MBX-USED-WEIGHT-1M",
+)
+# Coinbase Exchange public endpoints: 10 requests/s, bursts up to 15
+COINBASE_LIMITS = dict(
+    name="coinbase",
+    limit=10,
+    window=1.0,
+    burst=15,
+)
+SAFETY_MARGIN = 0.9  # share of the published limit the bucket hands out
+PENALTY_STATUSES = (418, 429)
+DEFAULT_PENALTY = 1.0  # seconds paused on a 429 without Retry-After
+
+
+@dataclass
+class LimiterStats:
+    name: str
+    tokens: float
+    capacity: float
+    refill_per_sec: float
+    paused_for: float
+    server_used: Optional[int]
+    requests: int
+    waited: float
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() hands out tokens in call order."""
+
+    def __init__(self, capacity: float, refill_per_sec: float, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self.clock = clock
+        self.tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_sec)
+            self._updated = now
+
+    def reserve(self, cost: float) -> float:
+        """Take `cost` tokens now; returns the seconds to wait before using them."""
+        cost = min(float(cost), self.capacity)  # an oversized call still gets through once the bucket is full
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.tokens -= cost
+            wait = -self.tokens / self.refill_per_sec if self.tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def cap(self, available: float):
+        """The server says only `available` tokens are left in its window."""
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens = min(self.tokens, available)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def paused_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - self.clock())
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(self.clock())
+            return self.tokens
+
+
+class RateLimiter:
+    """Per-exchange request budget in weight units, synced from response headers."""
+
+    def __init__(self, name: str, limit: float, window: float, burst: Optional[float] = None,
+                 used_header: Optional[str] = None, margin: float = SAFETY_MARGIN):
+        self.name = name
+        self.limit = float(limit)
+        self.window = float(window)
+        self.used_header = used_header
+        self.margin = margin
+        capacity = (burst if burst is not None else limit) * margin
+        self.bucket = TokenBucket(capacity, limit * margin / window)
+        self.server_used: Optional[int] = None
+        self.requests = 0
+        self.waited = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _account(self, wait: float):
+        with self._stats_lock:
+            self.requests += 1
+            self.waited += wait
+
+    def acquire(self, weight: float = 1):
+        """Block until `weight` units may be spent."""
+        wait = self.bucket.reserve(weight)
+        self._account(wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: float = 1):
+        """acquire() for coroutines; sleeps on the event loop instead of the thread."""
+        wait = self.bucket.reserve(weight)
+        self._account(wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, headers: Mapping[str, str], status: int = 200):
+        """Correct the bucket from a response: used-weight header, 429/418 Retry-After."""
+        if self.used_header:
+            used = headers.get(self.used_header)
+            if used is not None:
+                try:
+                    self.server_used = int(used)
+                except ValueError:
+                    pass
+                else:
+                    self.bucket.cap(self.limit * self.margin - self.server_used)
+        if status in PENALTY_STATUSES:
+            try:
+                retry_after = float(headers.get("Retry-After", DEFAULT_PENALTY))
+            except ValueError:
+                retry_after = DEFAULT_PENALTY
+            self.bucket.pause(retry_after)
+            print(f"[RateLimit] {self.name} returned {status}; pausing requests for {retry_after:.1f}s")
+
+    def stats(self) -> LimiterStats:
+        return LimiterStats(
+            name=self.name,
+            tokens=self.bucket.available(),
+            capacity=self.bucket.capacity,
+            refill_per_sec=self.bucket.refill_per_sec,
+            paused_for=self.bucket.paused_for(),
+            server_used=self.server_used,
+            requests=self.requests,
+            waited=self.waited,
+        )
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, **limits) -> RateLimiter:
+    """The process-wide limiter for an exchange; limits are per IP, so every client shares it."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter(name=name, **limits)
+        return limiter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PowerTrader exchange rate limiter")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    probe_parser = subparsers.add_parser("probe", help="Make one ticker request and show the limiter state")
+    probe_parser.add_argument("exchange", choices=["binance", "coinbase"])
+    probe_parser.add_argument("--coin", default="BTC")
+
+    args = parser.parse_args()
+
+    if args.command == "probe":
+        from pt_exchanges import ExchangeError, ExchangeManager
+
+        manager = ExchangeManager([args.exchange])
+        try:
+            price = manager.get_price(args.coin.upper(), args.exchange)
+        except ExchangeError as e:
+            print(f"Error: {e}")
+            return
+        s = manager.exchanges[args.exchange].rate_limiter.stats()
+        print(f"{args.coin.upper()} on {s.name}: ${price:,.2f}")
+        print(f"  tokens      {s.tokens:,.1f} / {s.capacity:,.1f} (refill {s.refill_per_sec:,.1f}/s)")
+        print(f"  server used {s.server_used if s.server_used is not None else 'n/a'}")
+        print(f"  requests    {s.requests}   waited {s.waited:.2f}s   paused {s.paused_for:.1f}s")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ import sys
 import json
 from typing import List
 from pt_config import ConfigManager
+from pt_candle_store import CandleStore
+from pt_candle_source import DEFAULT_SOURCE, source_from_spec
+from pt_predictor import PredictionService
 
 # Python 3.13 Universal SDK Integration
 try:
@@ -73,10 +76,23 @@ if __name__ == "__main__":
             init_coin(sym)
             
         print(f"[pt_thinker] Neural engine initialized. Subdirectories verified for: {coins}")
-        
-        # Keep process alive for the Hub to detect active state
-        while True:
-            time.sleep(60)
+
+        # Predict every coin's 1hour..1week levels on each candle close and keep the
+        # signal files (long_dca_signal.txt, low/high_bound_prices.html) current
+        source = source_from_spec(trading_cfg.get("candle_source", DEFAULT_SOURCE), CandleStore())
+        manager = getattr(source, "manager", None)
+        if manager is not None and trading_cfg.get("market_stream", False):
+            # trading.market_stream (off by default): live prices from the exchange's WebSocket feed;
+            # get_price falls back to REST when it is stale
+            manager.start_stream(coins, depth=False)
+        price_fn = (lambda coin: manager.get_price(coin, source.exchange_name)) if manager is not None else None
+        service = PredictionService(coins, source=source, price_fn=price_fn, folder_fn=coin_folder)
+        try:
+            service.run()
+        finally:
+            service.close()
+            if manager is not None:
+                manager.close()
             
     except Exception as e:
         print(f"[pt_thinker] Critical failure during startup: {e}")
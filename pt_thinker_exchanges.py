@@ -9,6 +9,7 @@ This module provides:
 - get_aggregated_current_price() - median/mean/VWAP across exchanges
 - get_candle_from_exchanges() - fetch candles with fallback
 - detect_arbitrage_opportunities() - find cross-exchange price differences
+- start_price_stream() - WebSocket prices for the coins, read before REST
 
 Integration pattern:
 - KuCoin remains primary source for consistency
@@ -33,13 +34,22 @@ def init_exchanges():
         )
 
 
-def get_aggregated_current_price(coin_symbol, method="median"):
+def start_price_stream(coin_symbols, timeframes=None):
+    """Stream prices for the coins over WebSockets; the helpers below then read them before REST."""
+    global _exchange_manager
+    if _exchange_manager is None:
+        init_exchanges()
+    return _exchange_manager.start_stream(list(coin_symbols), timeframes=timeframes)
+
+
+def get_aggregated_current_price(coin_symbol, method="median", quorum=None):
     global _exchange_manager
     if _exchange_manager is None:
         init_exchanges()
 
     try:
-        agg = _exchange_manager.get_aggregated_price(coin=coin_symbol, method=method)
+        # exchanges are queried concurrently; returns once `quorum` (default: a majority) answered
+        agg = _exchange_manager.get_aggregated_price(coin=coin_symbol, method=method, quorum=quorum)
         if agg:
             spread_pct = agg.get("spread_pct", 0.0)
             if spread_pct > 0.5:
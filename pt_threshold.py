@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Adaptive Match Threshold
+=========================================
+The trainer's perfect_threshold is a match radius: every memory whose pattern
+difference is at most the threshold counts as a neighbour. The original rule
+nudges it by 0.01 (0.001 below 0.1) per candle towards MATCH_TARGET matches,
+so after a reset it takes hundreds of full memory scans to reach a sensible
+radius, and it lags whenever the memory grows.
+
+QuantileThreshold instead keeps a running distribution of the distances every
+batched match already computes (MatchResult.all_diffs) in a DistanceSketch: a
+log-spaced histogram whose counts decay by `decay` per scan. The expected
+number of neighbours within radius t is the sketch's cumulative count per
+scan at t, so the radius for a target neighbour count is read off in one step:
+
+    threshold = smallest t with  cumulative_count(t) / scans >= target
+
+While the memory holds fewer than `target` patterns the target cannot be
+reached, and the controller falls back to the original step rule.
+
+The sketch needs the distance to every memory. A PatternIndex match only
+scores the candidates inside its search bound (all_diffs is truncated), so
+PatternTrainer uses the step rule when it matches through an index, and
+pt_trainer.py refuses --threshold-mode quantile with PATTERN_INDEX_MODE set.
+
+Usage:
+    from pt_threshold import QuantileThreshold
+
+    controller = QuantileThreshold(target=20)
+    threshold = controller.update(match_result, threshold)
+
+    trainer = PatternTrainer("1hour", threshold_mode="quantile")
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+THRESHOLD_MODES = ("step", "quantile")
+THRESHOLD_MIN = 0.0
+THRESHOLD_MAX = 100.0
+
+
+class DistanceSketch:
+    """Decaying log-histogram of pattern distances (a fixed-size quantile sketch)."""
+
+    def __init__(self, decay: float = 0.9, low: float = 1e-4, high: float = 1e4, bins_per_decade: int = 32):
+        if not 0.0 < decay <= 1.0:
+            raise ValueError("decay must be in (0, 1]")
+        self.decay = decay
+        decades = np.log10(high) - np.log10(low)
+        # edges[0] = 0 collects exact matches; the last bin collects everything above `high`
+        self.edges = np.concatenate([[0.0], np.logspace(np.log10(low), np.log10(high), int(decades * bins_per_decade) + 1)])
+        self.counts = np.zeros(len(self.edges), dtype=np.float64)
+        self.scans = 0.0
+
+    def update(self, distances: np.ndarray, keep: Optional[int] = None):
+        """Add one scan's distances; `keep` limits it to the nearest `keep` (exact counts up to that rank)."""
+        distances = np.asarray(distances, dtype=np.float64)
+        if keep is not None and len(distances) > keep:
+            distances = np.partition(distances, keep - 1)[:keep]
+        distances = distances[np.isfinite(distances)]
+        self.counts *= self.decay
+        self.scans = self.scans * self.decay + 1.0
+        if len(distances):
+            bins = np.searchsorted(self.edges, distances, side="left")
+            self.counts += np.bincount(np.minimum(bins, len(self.edges) - 1), minlength=len(self.edges))
+
+    def expected_within(self, radius: float) -> float:
+        """Mean number of distances <= radius per scan."""
+        if self.scans == 0:
+            return 0.0
+        i = int(np.searchsorted(self.edges, radius, side="right"))
+        return float(self.counts[:i].sum()) / self.scans
+
+    def radius_for(self, count: float) -> Optional[float]:
+        """Smallest radius expected to hold `count` distances per scan, None when the sketch never does."""
+        if self.scans == 0:
+            return None
+        cumulative = np.cumsum(self.counts) / self.scans
+        i = int(np.searchsorted(cumulative, count, side="left"))
+        if i >= len(cumulative) - 1:
+            return None
+        if i == 0:
+            return 0.0
+        # interpolate inside bin i, which holds distances in (edges[i-1], edges[i]]
+        below = cumulative[i - 1]
+        share = (count - below) / (cumulative[i] - below) if cumulative[i] > below else 1.0
+        lo, hi = self.edges[i - 1], self.edges[i]
+        if lo <= 0.0:
+            return float(hi * share)
+        return float(lo * (hi / lo) ** share)
+
+
+def step_threshold(threshold: float, matches: int, target: int = 20) -> float:
+    """The original rule: one 0.01 step (0.001 below 0.1) towards `target` matches."""
+    step = 0.001 if threshold < 0.1 else 0.01
+    if matches > target:
+        return max(threshold - step, THRESHOLD_MIN)
+    return min(threshold + step, THRESHOLD_MAX)
+
+
+class QuantileThreshold:
+    """Sets perfect_threshold to the radius the distance sketch expects to hold `target` matches.
+
+    Only the nearest `tail` x target distances of each scan are sketched; the
+    rest never influence a radius near the target. While the memory is too
+    small to reach the target at all, it falls back to step_threshold() so
+    unmatched patterns keep being stored instead of everything matching.
+    Matches must come from full scans (see the module docstring).
+    """
+
+    def __init__(self, target: int = 20, decay: float = 0.9, tail: int = 4):
+        self.target = target
+        self.keep = max(target * tail, 1)
+        self.sketch = DistanceSketch(decay=decay)
+
+    def update(self, match, threshold: float) -> float:
+        """Fold one MatchResult into the sketch and return the next threshold."""
+        if match is None:
+            return step_threshold(threshold, 0, self.target)
+        self.sketch.update(match.all_diffs, keep=self.keep)
+        if len(match.all_diffs) <= self.target:
+            return step_threshold(threshold, match.count, self.target)
+        radius = self.sketch.radius_for(self.target)
+        if radius is None:
+            return step_threshold(threshold, match.count, self.target)
+        return min(max(radius, THRESHOLD_MIN), THRESHOLD_MAX)
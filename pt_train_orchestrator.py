@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Parallel Timeframe Training
+============================================
+Trains each timeframe of a coin in its own worker process instead of walking
+the timeframes one after another.
+
+Every worker runs `pt_trainer.py COIN --timeframe TF --status-file trainer_status_TF.json`
+inside the coin folder, so it owns its memory shard (memories_TF.ptm,
+neural_perfect_threshold_TF.txt) and its own status file. The orchestrator
+polls those status files and merges them into trainer_status.json for the GUI.
+Retraining all seven timeframes takes roughly as long as the slowest one.
+
+Usage:
+    from pt_train_orchestrator import TrainingOrchestrator
+
+    results = TrainingOrchestrator.for_coin("BTC", folder="BTC").run()
+
+    # CLI
+    python pt_train_orchestrator.py BTC --folder BTC --workers 7
+    python pt_train_orchestrator.py BTC --folder BTC --incremental
+    python pt_train_orchestrator.py BTC --folder BTC --source file:candle_data
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from pt_trainer import TF_CHOICES
+from pt_threshold import THRESHOLD_MODES
+
+TIMEFRAMES = list(TF_CHOICES)
+
+TRAINER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pt_trainer.py")
+
+
+@dataclass
+class TimeframeJob:
+    coin: str
+    timeframe: str
+    folder: str
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.coin, self.timeframe)
+
+    @property
+    def status_path(self) -> str:
+        return os.path.join(self.folder, f"trainer_status_{self.timeframe}.json")
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.folder, f"trainer_{self.timeframe}.log")
+
+
+def read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_atomic(path: str, data: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class TrainingOrchestrator:
+    """Runs trainer workers under a bounded process pool and merges their status."""
+
+    def __init__(
+        self,
+        jobs: List[TimeframeJob],
+        max_workers: Optional[int] = None,
+        python: str = sys.executable,
+        poll_interval: float = 2.0,
+        incremental: bool = False,
+        source: Optional[str] = None,
+        prune: bool = False,
+        max_memories: Optional[int] = None,
+        threshold_mode: Optional[str] = None,
+    ):
+        self.jobs = list(jobs)
+        self.max_workers = max_workers or min(len(self.jobs), os.cpu_count() or 1) or 1
+        self.python = python
+        self.poll_interval = poll_interval
+        self.incremental = incremental
+        # workers run inside the coin folder, so file:FOLDER specs are made absolute here
+        if source and source.startswith("file:"):
+            source = "file:" + os.path.abspath(source[len("file:"):])
+        self.source = source
+        self.prune = prune
+        self.max_memories = max_memories
+        self.threshold_mode = threshold_mode
+        self.started_at = int(time.time())
+        self.returncodes: Dict[Tuple[str, str], int] = {}
+        self._procs: Dict[Tuple[str, str], subprocess.Popen] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    @classmethod
+    def for_coin(
+        cls,
+        coin: str,
+        folder: str = ".",
+        timeframes: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> "TrainingOrchestrator":
+        jobs = [TimeframeJob(coin.upper(), tf, folder) for tf in (timeframes or TIMEFRAMES)]
+        return cls(jobs, max_workers=max_workers, **kwargs)
+
+    def worker_command(self, job: TimeframeJob) -> List[str]:
+        command = [
+            self.python, TRAINER_SCRIPT, job.coin, "reprocess_yes",
+            "--timeframe", job.timeframe,
+            "--status-file", os.path.basename(job.status_path),
+        ]
+        if self.incremental:
+            command.append("--incremental")
+        if self.source:
+            command.extend(["--source", self.source])
+        if self.prune:
+            command.append("--prune")
+        if self.max_memories:
+            command.extend(["--max-memories", str(self.max_memories)])
+        if self.threshold_mode:
+            command.extend(["--threshold-mode", self.threshold_mode])
+        return command
+
+    def _run_job(self, job: TimeframeJob) -> int:
+        with self._lock:
+            if self._stopping:
+                return -1
+            log = open(job.log_path, "w", encoding="utf-8")
+            try:
+                proc = subprocess.Popen(
+                    self.worker_command(job), cwd=job.folder, stdout=log, stderr=subprocess.STDOUT
+                )
+            except OSError:
+                log.close()
+                raise
+            self._procs[job.key] = proc
+        try:
+            return proc.wait()
+        finally:
+            log.close()
+
+    def stop(self, terminate: bool = True):
+        """Skip queued workers; with terminate=True also kill the running ones."""
+        with self._lock:
+            self._stopping = True
+            if not terminate:
+                return
+            for proc in self._procs.values():
+                if proc.poll() is None:
+                    proc.terminate()
+
+    def should_stop(self) -> bool:
+        """Polled between status updates; subclasses return True to stop launching workers."""
+        return False
+
+    # ---- status ----
+
+    def job_status(self, job: TimeframeJob) -> dict:
+        status = read_json(job.status_path) or {}
+        rc = self.returncodes.get(job.key)
+        if job.key not in self._procs:
+            state = "QUEUED" if rc is None else "STOPPED"
+        elif rc is None:
+            state = status.get("state", "TRAINING")
+        elif rc == 0:
+            state = "FINISHED"
+        else:
+            state = "FAILED"
+        progress = 1.0 if state == "FINISHED" else float(status.get("progress", 0.0))
+        return {
+            "state": state,
+            "progress": progress,
+            "returncode": rc,
+            "timestamp": status.get("timestamp"),
+        }
+
+    def coin_status(self, coin: str) -> dict:
+        per_tf = {job.timeframe: self.job_status(job) for job in self.jobs if job.coin == coin}
+        states = [s["state"] for s in per_tf.values()]
+        if states and all(s == "FINISHED" for s in states):
+            state = "FINISHED"
+        elif any(s in ("QUEUED", "TRAINING") for s in states):
+            state = "TRAINING"
+        elif "FAILED" in states:
+            state = "FAILED"
+        else:
+            state = "STOPPED"
+        now = int(time.time())
+        status = {
+            "coin": coin,
+            "state": state,
+            "started_at": self.started_at,
+            "timestamp": now,
+            "progress": round(sum(s["progress"] for s in per_tf.values()) / max(len(per_tf), 1), 4),
+            "timeframes": per_tf,
+        }
+        if state != "TRAINING":
+            status["finished_at"] = now
+        return status
+
+    def coins(self) -> List[str]:
+        return list(dict.fromkeys(job.coin for job in self.jobs))
+
+    def write_status(self):
+        for coin in self.coins():
+            folder = next(job.folder for job in self.jobs if job.coin == coin)
+            try:
+                write_json_atomic(os.path.join(folder, "trainer_status.json"), self.coin_status(coin))
+            except OSError as e:
+                print(f"[Orchestrator] Could not write status for {coin}: {e}")
+
+    # ---- run ----
+
+    def run(self) -> Dict[Tuple[str, str], int]:
+        """Train every job and return {(coin, timeframe): returncode}."""
+        self.started_at = int(time.time())
+        for job in self.jobs:
+            os.makedirs(job.folder, exist_ok=True)
+            if os.path.exists(job.status_path):
+                os.remove(job.status_path)
+
+        print(f"[Orchestrator] Training {len(self.jobs)} timeframe jobs with {self.max_workers} workers")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self._run_job, job): job for job in self.jobs}
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        job = futures[fut]
+                        try:
+                            self.returncodes[job.key] = fut.result()
+                        except Exception as e:
+                            print(f"[Orchestrator] {job.coin} {job.timeframe} worker error: {e}")
+                            self.returncodes[job.key] = -1
+                        print(f"[Orchestrator] {job.coin} {job.timeframe} exited with {self.returncodes[job.key]}")
+                    if not self._stopping and self.should_stop():
+                        print("[Orchestrator] Stop requested, waiting for running workers to exit")
+                        self.stop(terminate=False)
+                    self.write_status()
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+        finally:
+            self.write_status()
+        return dict(self.returncodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train all timeframes of a coin in parallel")
+    parser.add_argument("coin", help="Coin symbol (BTC, ETH, etc.)")
+    parser.add_argument("--folder", "-f", default=".", help="Coin folder holding the memories")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Max concurrent workers")
+    parser.add_argument("--timeframes", "-t", nargs="+", default=None, choices=TIMEFRAMES)
+    parser.add_argument("--incremental", "-i", action="store_true", help="Train only candles since the last run")
+    parser.add_argument("--source", "-s", default=None, help="Candle source spec (exchange:binance, file:FOLDER, ...)")
+    parser.add_argument("--prune", action="store_true", help="Prune memories after training each timeframe")
+    parser.add_argument("--max-memories", type=int, default=None, help="Memory cap per timeframe (implies --prune)")
+    parser.add_argument("--threshold-mode", choices=THRESHOLD_MODES, default=None,
+                        help="How the trainer adapts perfect_threshold")
+    args = parser.parse_args()
+
+    orchestrator = TrainingOrchestrator.for_coin(
+        args.coin, folder=args.folder, timeframes=args.timeframes, max_workers=args.workers,
+        incremental=args.incremental, source=args.source, prune=args.prune, max_memories=args.max_memories,
+        threshold_mode=args.threshold_mode,
+    )
+    results = orchestrator.run()
+    failed = [tf for (_, tf), rc in results.items() if rc != 0]
+    if failed:
+        print(f"[Orchestrator] Failed timeframes: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"[Orchestrator] {args.coin.upper()} finished training all timeframes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Multi-Coin Training Scheduler
+==============================================
+Retrains every coin in config.yaml (trading.coins) concurrently under one
+bounded worker pool, instead of launching one pt_trainer.py per coin by hand.
+
+Each coin trains inside its own folder (pt_thinker.coin_folder), one worker per
+timeframe via pt_train_orchestrator. Writing "yes" to killer.txt in the base
+directory stops the schedule cleanly: queued jobs are skipped and the flag is
+copied into every coin folder, so running trainers flush their memories and
+exit on their own. Progress for all coins is aggregated into
+hub_data/training_status.json for the hub to poll.
+
+With --watch the scheduler stays up after the first run and retrains
+incrementally a few seconds after each candle closes (pt_candle_clock.py),
+only for the timeframes that closed, instead of being re-launched on a timer.
+
+Usage:
+    python pt_train_scheduler.py                      # all configured coins
+    python pt_train_scheduler.py --coins BTC ETH --workers 4
+    python pt_train_scheduler.py --incremental        # hourly top-up
+    python pt_train_scheduler.py --source file:candle_data
+    python pt_train_scheduler.py --incremental --max-memories 50000
+    python pt_train_scheduler.py --incremental --watch    # retrain as each candle closes
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from pt_candle_clock import CandleCloseScheduler, CloseEvent
+from pt_config import ConfigManager
+from pt_thinker import coin_folder, get_base_dir
+from pt_threshold import THRESHOLD_MODES
+from pt_train_orchestrator import TIMEFRAMES, TimeframeJob, TrainingOrchestrator, write_json_atomic
+
+KILLER_FILE = "killer.txt"
+AGGREGATE_STATUS_FILE = os.path.join("hub_data", "training_status.json")
+WATCH_DELAY = 5.0  # seconds after a close before --watch retrains, so the exchange has the candle
+
+
+def configured_coins() -> List[str]:
+    trading_cfg = ConfigManager().get().trading
+    coins = trading_cfg.get("coins", ["BTC"]) if isinstance(trading_cfg, dict) else ["BTC"]
+    return [str(c).upper() for c in coins]
+
+
+def _read_killer(folder: str) -> bool:
+    try:
+        with open(os.path.join(folder, KILLER_FILE), "r", encoding="utf-8", errors="ignore") as f:
+            return f.read().strip().lower() == "yes"
+    except OSError:
+        return False
+
+
+def _write_killer(folder: str, value: str):
+    try:
+        with open(os.path.join(folder, KILLER_FILE), "w", encoding="utf-8") as f:
+            f.write(value)
+    except OSError as e:
+        print(f"[Scheduler] Could not write {KILLER_FILE} in {folder}: {e}")
+
+
+class TrainingScheduler(TrainingOrchestrator):
+    """Trains all coins x timeframes under one bounded pool."""
+
+    def __init__(
+        self,
+        coins: Optional[List[str]] = None,
+        timeframes: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        base_dir: Optional[str] = None,
+        **kwargs,
+    ):
+        self.base_dir = base_dir or get_base_dir()
+        self.coin_list = [c.upper() for c in (coins or configured_coins())]
+        self.folders = {
+            coin: coin_folder(coin) if base_dir is None else os.path.join(base_dir, coin)
+            for coin in self.coin_list
+        }
+        self.timeframes = list(timeframes or TIMEFRAMES)
+        jobs = [
+            TimeframeJob(coin, tf, self.folders[coin])
+            for coin in self.coin_list
+            for tf in self.timeframes
+        ]
+        super().__init__(jobs, max_workers=max_workers, **kwargs)
+        self.status_path = os.path.join(self.base_dir, AGGREGATE_STATUS_FILE)
+
+    def should_stop(self) -> bool:
+        if not _read_killer(self.base_dir):
+            return False
+        # trainers poll killer.txt in their own folder
+        for folder in self.folders.values():
+            _write_killer(folder, "yes")
+        return True
+
+    def aggregate_status(self) -> dict:
+        per_coin = {coin: self.coin_status(coin) for coin in self.coin_list}
+        states = [s["state"] for s in per_coin.values()]
+        if states and all(s == "FINISHED" for s in states):
+            state = "FINISHED"
+        elif any(s == "TRAINING" for s in states):
+            state = "STOPPING" if self._stopping else "TRAINING"
+        elif "FAILED" in states:
+            state = "FAILED"
+        else:
+            state = "STOPPED"
+        return {
+            "state": state,
+            "started_at": self.started_at,
+            "timestamp": int(time.time()),
+            "workers": self.max_workers,
+            "progress": round(sum(s["progress"] for s in per_coin.values()) / max(len(per_coin), 1), 4),
+            "coins": per_coin,
+        }
+
+    def write_status(self):
+        super().write_status()
+        try:
+            os.makedirs(os.path.dirname(self.status_path), exist_ok=True)
+            write_json_atomic(self.status_path, self.aggregate_status())
+        except OSError as e:
+            print(f"[Scheduler] Could not write {self.status_path}: {e}")
+
+    def run(self) -> Dict[Tuple[str, str], int]:
+        # clear a stale stop flag from the previous run
+        _write_killer(self.base_dir, "no")
+        for folder in self.folders.values():
+            os.makedirs(folder, exist_ok=True)
+            _write_killer(folder, "no")
+        print(f"[Scheduler] Training {', '.join(self.coin_list)}")
+        return super().run()
+
+    def watch(self, clock: Optional[CandleCloseScheduler] = None):
+        """Retrain incrementally right after each timeframe's candle closes, until killer.txt says yes.
+
+        Only the timeframes that closed are retrained, so most wake-ups run the
+        1hour jobs alone.
+        """
+        clock = clock or CandleCloseScheduler(delay=WATCH_DELAY)
+
+        def on_close(event: CloseEvent):
+            if _read_killer(self.base_dir):
+                clock.stop()
+                return
+            closed = {tf for tfs in event.timeframes.values() for tf in tfs}
+            self.jobs = [
+                TimeframeJob(coin, tf, self.folders[coin])
+                for coin in self.coin_list
+                for tf in self.timeframes
+                if tf in closed
+            ]
+            self.incremental = True
+            self.run()
+            if self._stopping:
+                clock.stop()
+
+        for coin in self.coin_list:
+            clock.add_job(coin, self.timeframes, on_close)
+        print(f"[Scheduler] Watching {', '.join(self.timeframes)} closes")
+        clock.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train every configured coin concurrently")
+    parser.add_argument("--coins", "-c", nargs="+", default=None, help="Coins (default: trading.coins)")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Max concurrent workers")
+    parser.add_argument("--timeframes", "-t", nargs="+", default=None, choices=TIMEFRAMES)
+    parser.add_argument("--incremental", "-i", action="store_true", help="Train only candles since the last run")
+    parser.add_argument("--source", "-s", default=None, help="Candle source spec (exchange:binance, file:FOLDER, ...)")
+    parser.add_argument("--prune", action="store_true", help="Prune memories after training each timeframe")
+    parser.add_argument("--max-memories", type=int, default=None, help="Memory cap per timeframe (implies --prune)")
+    parser.add_argument("--threshold-mode", choices=THRESHOLD_MODES, default=None,
+                        help="How the trainer adapts perfect_threshold")
+    parser.add_argument("--watch", action="store_true",
+                        help="After this run, retrain incrementally whenever a candle closes")
+    args = parser.parse_args()
+
+    scheduler = TrainingScheduler(
+        coins=args.coins, timeframes=args.timeframes, max_workers=args.workers, incremental=args.incremental,
+        source=args.source, prune=args.prune, max_memories=args.max_memories, threshold_mode=args.threshold_mode,
+    )
+    results = scheduler.run()
+    if args.watch and not scheduler._stopping:
+        scheduler.watch()
+    status = scheduler.aggregate_status()
+    print(f"[Scheduler] Training {status['state'].lower()} ({len(results)} jobs)")
+    sys.exit(0 if status["state"] == "FINISHED" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,25 @@ modules_to_test = [
     'pt_volume_dashboard',
     'pt_risk_dashboard',
     'pt_panic',
+    'pt_memory_store',
+    'pt_memory_journal',
+    'pt_candle_store',
+    'pt_candle_source',
+    'pt_memory_prune',
+    'pt_threshold',
+    'pt_memory_snapshot',
+    'pt_predictor',
+    'pt_candle_clock',
+    'pt_http',
+    'pt_rate_limit',
+    'pt_market_stream',
+    'pt_orderbook',
+    'pt_candle_download',
+    'pt_pattern_match',
+    'pt_pattern_index',
+    'pt_train_orchestrator',
+    'pt_train_scheduler',
+    'pt_trainer',
 ]
 
 print("=" * 60)
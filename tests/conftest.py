@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+
+# the pt_* modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def random_records(rng, count, pattern_len, flat=0.0, decayed=0.0, duplicates=0.0):
+    """Random memory records: pattern columns, then close/high/low outcomes and weights.
+
+    `flat` of the patterns get a 0 key candle, `decayed` of the memories all-zero
+    weights, and `duplicates` x count near-copies of random rows are appended.
+    """
+    patterns = rng.normal(0.0, 1.5, size=(count, pattern_len))
+    if flat:
+        patterns[rng.random(count) < flat, -1] = 0.0
+    outcomes = rng.normal(0.0, 2.0, size=(count, 3))
+    weights = rng.uniform(0.0, 2.0, size=(count, 3))
+    if decayed:
+        weights[rng.random(count) < decayed] = 0.0
+    records = np.hstack([patterns, outcomes, weights])
+    if not duplicates:
+        return records
+    dupes = records[rng.integers(0, count, size=int(count * duplicates))].copy()
+    dupes[:, :pattern_len] *= 1.0 + rng.normal(0.0, 1e-4, size=(len(dupes), pattern_len))
+    return np.vstack([records, dupes])
@@ -0,0 +1,225 @@
+"""Stream parsing, reconnects and REST fallback (pt_market_stream.py) against canned frames."""
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+import pt_market_stream
+from pt_exchanges import ExchangeManager, Ticker
+from pt_market_stream import BinanceStream, CoinbaseStream, MarketState, MarketStream, STREAM_MAX_AGE
+
+
+NOW_MS = 1700000000000
+
+BINANCE_TICKER = {"stream": "btcusdt@ticker", "data": {
+    "e": "24hrTicker", "E": NOW_MS, "s": "BTCUSDT", "c": "65000.5", "b": "65000", "a": "65001", "v": "1234"}}
+BINANCE_KLINE = {"stream": "btcusdt@kline_1h", "data": {
+    "e": "kline", "E": NOW_MS, "s": "BTCUSDT",
+    "k": {"t": 1699999200000, "o": "64000", "h": "65500", "l": "63900", "c": "65000.5", "v": "10", "i": "1h", "x": True}}}
+BINANCE_DEPTH = {"stream": "btcusdt@depth20@100ms", "data": {
+    "lastUpdateId": 42, "bids": [["65000", "1.5"], ["64999", "2"]], "asks": [["65001", "0.5"], ["65002", "3"]]}}
+COINBASE_TICKER = {"type": "ticker", "product_id": "BTC-USD", "price": "65100", "best_bid": "65099",
+                   "best_ask": "65101", "volume_24h": "99"}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class MockWebSocketServer:
+    """Minimal RFC 6455 server: records request paths and client messages, pushes text frames."""
+
+    GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(5)
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.paths = []
+        self.received = []
+        self.connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(1024)
+            lines = request.decode().split("\r\n")
+            key = next(line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("sec-websocket-key"))
+            accept = base64.b64encode(hashlib.sha1((key + self.GUID).encode()).digest()).decode()
+            conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+            self.paths.append(lines[0].split()[1])
+            self.connections.append(conn)
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        try:
+            while True:
+                header = conn.recv(2)
+                if len(header) < 2:
+                    return
+                opcode, length = header[0] & 0x0F, header[1] & 0x7F
+                if length == 126:
+                    length = struct.unpack("!H", conn.recv(2))[0]
+                elif length == 127:
+                    length = struct.unpack("!Q", conn.recv(8))[0]
+                mask = conn.recv(4)
+                payload = b""
+                while len(payload) < length:
+                    payload += conn.recv(length - len(payload))
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+                if opcode == 1:
+                    self.received.append(json.loads(payload))
+                elif opcode == 8:
+                    conn.sendall(struct.pack("!BB", 0x88, 0))  # answer the close handshake
+                    conn.close()
+                    return
+        except OSError:
+            pass
+
+    def send(self, message: dict):
+        data = json.dumps(message).encode()
+        header = struct.pack("!BB", 0x81, len(data)) if len(data) < 126 else struct.pack("!BBH", 0x81, 126, len(data))
+        for conn in list(self.connections):
+            try:
+                conn.sendall(header + data)
+            except OSError:
+                self.connections.remove(conn)
+
+    def drop(self):
+        """Close every connection without a close frame, like a network drop."""
+        for conn in self.connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+                conn.close()
+            except OSError:
+                pass
+        self.connections = []
+
+    def close(self):
+        self.drop()
+        self.sock.close()
+
+
+@pytest.fixture
+def ws_server(monkeypatch):
+    pytest.importorskip("websocket")
+    monkeypatch.setattr(pt_market_stream, "RECONNECT_MIN", 0.05)
+    # run_forever only notices stop() between selects, which wait up to the ping timeout
+    monkeypatch.setattr(pt_market_stream, "PING_INTERVAL", 1.0)
+    monkeypatch.setattr(pt_market_stream, "PING_TIMEOUT", 0.5)
+    server = MockWebSocketServer()
+    yield server
+    server.close()
+
+
+def test_binance_frames_update_state():
+    state = MarketState()
+    client = BinanceStream(state, ["BTCUSDT"], timeframes=["1hour"])
+    for frame in (BINANCE_TICKER, BINANCE_KLINE, BINANCE_DEPTH):
+        client.handle(frame)
+
+    ticker = state.ticker("binance", "BTCUSDT")
+    assert (ticker.price, ticker.bid, ticker.ask, ticker.volume_24h) == (65000.5, 65000.0, 65001.0, 1234.0)
+    candle = state.kline("binance", "BTCUSDT", "1hour")
+    assert (candle.timestamp, candle.open, candle.close) == (1699999200, 64000.0, 65000.5)
+    assert state.closed_candles("binance", "BTCUSDT", "1hour") == [candle]
+    book = state.orderbook("binance", "BTCUSDT")
+    assert book.bids[0] == (65000.0, 1.5) and book.asks[0] == (65001.0, 0.5)
+
+
+def test_binance_open_kline_is_not_closed():
+    state = MarketState()
+    client = BinanceStream(state, ["BTCUSDT"], timeframes=["1hour"])
+    frame = json.loads(json.dumps(BINANCE_KLINE))
+    frame["data"]["k"]["x"] = False
+    client.handle(frame)
+    assert state.kline("binance", "BTCUSDT", "1hour") is not None
+    assert state.closed_candles("binance", "BTCUSDT", "1hour") == []
+
+
+def test_coinbase_frames_update_state():
+    state = MarketState()
+    client = CoinbaseStream(state, ["BTC-USD"])
+    client.handle({"type": "subscriptions", "channels": [{"name": "ticker", "product_ids": ["BTC-USD"]}]})
+    client.handle(COINBASE_TICKER)
+    ticker = state.ticker("coinbase", "BTC-USD")
+    assert (ticker.price, ticker.bid, ticker.ask, ticker.volume_24h) == (65100.0, 65099.0, 65101.0, 99.0)
+    assert client.subscribe_messages() == [{"type": "subscribe", "product_ids": ["BTC-USD"], "channels": ["ticker"]}]
+
+
+def test_price_falls_back_to_rest_when_stream_is_empty_or_stale(monkeypatch):
+    manager = ExchangeManager(["binance"])
+    rest_calls = []
+
+    def rest_ticker(symbol):
+        rest_calls.append(symbol)
+        return Ticker("binance", symbol, 60000.0, 60000.0, 60000.0, 0.0, None)
+
+    monkeypatch.setattr(manager.exchanges["binance"], "get_ticker", rest_ticker)
+    manager.stream = MarketStream({"binance": ["BTCUSDT"]}, depth=False)
+
+    assert manager.get_price("BTC", "binance") == 60000.0  # nothing streamed yet
+    manager.stream.clients[0].handle(BINANCE_TICKER)
+    assert manager.get_price("BTC", "binance") == 65000.5
+    assert rest_calls == ["BTCUSDT"]
+
+    later = time.time() + 2 * STREAM_MAX_AGE
+    monkeypatch.setattr(pt_market_stream.time, "time", lambda: later)
+    assert manager.get_price("BTC", "binance") == 60000.0  # stream went quiet
+    assert rest_calls == ["BTCUSDT", "BTCUSDT"]
+
+
+def test_binance_reconnects_after_drop(ws_server):
+    state = MarketState()
+    client = BinanceStream(state, ["BTCUSDT", "ETHUSDT"], depth=False, base_url=ws_server.url)
+    client.start()
+    try:
+        assert wait_for(lambda: client.connected and ws_server.connections)
+        assert ws_server.paths[0] == "/stream?streams=btcusdt@ticker/ethusdt@ticker"
+        ws_server.send(BINANCE_TICKER)
+        assert wait_for(lambda: state.ticker("binance", "BTCUSDT") is not None)
+
+        ws_server.drop()
+        assert wait_for(lambda: client.reconnects == 1 and client.connected and len(ws_server.paths) == 2)
+        frame = json.loads(json.dumps(BINANCE_TICKER))
+        frame["data"]["c"] = "66000"
+        ws_server.send(frame)
+        assert wait_for(lambda: state.ticker("binance", "BTCUSDT").price == 66000.0)
+    finally:
+        client.stop()
+    assert not client.connected
+
+
+def test_coinbase_resubscribes_after_reconnect(ws_server):
+    state = MarketState()
+    client = CoinbaseStream(state, ["BTC-USD"], url=ws_server.url)
+    client.start()
+    try:
+        assert wait_for(lambda: len(ws_server.received) == 1)
+        ws_server.drop()
+        assert wait_for(lambda: len(ws_server.received) == 2)
+        assert ws_server.received[0] == ws_server.received[1] == client.subscribe_messages()[0]
+        ws_server.send(COINBASE_TICKER)
+        assert wait_for(lambda: state.ticker("coinbase", "BTC-USD") is not None)
+    finally:
+        client.stop()
@@ -0,0 +1,127 @@
+"""Crash recovery of the journaled memory store (pt_memory_journal.py)."""
+
+import os
+
+import numpy as np
+import pytest
+
+import pt_memory_journal
+from pt_memory_journal import JournaledMemoryStore, read_journal
+
+from conftest import random_records
+
+
+PATTERN_LEN = 3
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "memories_1hour.ptm")
+
+
+def open_store(path):
+    return JournaledMemoryStore(path, pattern_len=PATTERN_LEN, background=False)
+
+
+def write_batches(path, batches):
+    """One flush per batch of appends and weight updates.
+
+    Returns the records and the journal size after each flush.
+    """
+    rng = np.random.default_rng(3)
+    states, ends = [], []
+    store = open_store(path)
+    for _ in range(batches):
+        if len(store):
+            picked = rng.choice(len(store), size=5, replace=False)
+            store.set_weights_batch(picked, *rng.uniform(0.0, 2.0, size=(3, 5)))
+        store.append_records(random_records(rng, 20, PATTERN_LEN))
+        store.flush()
+        states.append(store.records.copy())
+        ends.append(os.path.getsize(store.journal_path))
+    store.close()
+    return states, ends
+
+
+def test_replay_restores_every_flush(path):
+    states, _ = write_batches(path, 4)
+    with open_store(path) as store:
+        np.testing.assert_array_equal(store.records, states[-1])
+
+
+def test_truncated_entry_is_dropped(path):
+    states, ends = write_batches(path, 4)
+    journal = pt_memory_journal.journal_path(path)
+    with open(journal, "rb+") as f:
+        f.truncate(ends[-2] + 30)  # killed in the middle of the last flush
+
+    with open_store(path) as store:
+        np.testing.assert_array_equal(store.records, states[-2])
+        # the torn tail is cut off, so the next entry follows the last good one
+        assert os.path.getsize(journal) == ends[-2]
+        store.append_records(random_records(np.random.default_rng(4), 5, PATTERN_LEN))
+        expected = store.records.copy()
+    with open_store(path) as store:
+        np.testing.assert_array_equal(store.records, expected)
+
+
+def test_bad_crc_stops_replay(path):
+    states, ends = write_batches(path, 4)
+    journal = pt_memory_journal.journal_path(path)
+    # flip a payload byte of the third flush; it and everything after it is ignored
+    with open(journal, "rb+") as f:
+        f.seek(ends[1] + 30)
+        byte = f.read(1)
+        f.seek(ends[1] + 30)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    _, _, valid_end = read_journal(journal)
+    assert valid_end == ends[1]
+    with open_store(path) as store:
+        np.testing.assert_array_equal(store.records, states[1])
+
+
+def fail_replace(monkeypatch, suffix):
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if src.endswith(suffix):
+            raise OSError("killed before the swap")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(pt_memory_journal.os, "replace", replace)
+
+
+def test_compaction_stopped_before_snapshot_swap(path, monkeypatch):
+    states, _ = write_batches(path, 3)
+    store = open_store(path)
+    fail_replace(monkeypatch, ".ptm.tmp")
+    store.compact(wait=True)
+    monkeypatch.undo()
+    store.close()
+    assert os.path.exists(path + ".tmp")  # new snapshot written, never swapped in
+
+    with open_store(path) as store:
+        np.testing.assert_array_equal(store.records, states[-1])
+        store.compact(wait=True)
+        assert not os.path.exists(path + ".tmp")
+        assert store.journal_bytes == 0
+    with open_store(path) as store:
+        np.testing.assert_array_equal(store.records, states[-1])
+
+
+def test_compaction_stopped_before_journal_swap(path, monkeypatch):
+    states, _ = write_batches(path, 3)
+    store = open_store(path)
+    fail_replace(monkeypatch, ".ptj.tmp")
+    store.compact(wait=True)
+    monkeypatch.undo()
+    store.close()
+    journal = pt_memory_journal.journal_path(path)
+    _, entries, _ = read_journal(journal)
+    assert entries  # the snapshot holds them, but the journal was not emptied
+
+    # entries already folded into the snapshot are skipped, not applied twice
+    with open_store(path) as store:
+        assert store.journal_seq >= entries[-1][1]
+        np.testing.assert_array_equal(store.records, states[-1])
@@ -0,0 +1,90 @@
+"""Held-out parity replay of memory pruning (pt_memory_prune.py) against full scans."""
+
+import numpy as np
+
+from pt_exchanges import OHLCV
+from pt_memory_prune import MemoryView, PrunePolicy, holdout_patterns, prune_memories, prune_records, replay_parity
+from pt_memory_store import COL_WEIGHT, PatternMemoryStore
+from pt_pattern_match import match_pattern
+
+from conftest import random_records
+
+
+PATTERN_LEN = 3
+THRESHOLD = 25.0
+
+
+def random_candles(rng, count):
+    candles, price = [], 100.0
+    for i in range(count):
+        close = price * (1 + rng.normal(0.0, 0.015))
+        candles.append(OHLCV(i * 3600, price, max(price, close) * 1.002, min(price, close) * 0.998, close, 1.0))
+        price = close
+    return candles
+
+
+def full_scan_parity(original, pruned, patterns, threshold):
+    """replay_parity without the index: every memory of both sets is scanned."""
+    before, after = MemoryView(original, PATTERN_LEN), MemoryView(pruned, PATTERN_LEN)
+    diffs, count_changes = [], 0
+    for pattern in patterns:
+        a = match_pattern(pattern, before, threshold)
+        b = match_pattern(pattern, after, threshold)
+        diffs.append((abs(a.final_move - b.final_move),
+                      abs(a.high_final_move - b.high_final_move) * 100,
+                      abs(a.low_final_move - b.low_final_move) * 100))
+        count_changes += a.count != b.count
+    return np.array(diffs), count_changes
+
+
+def test_replay_parity_matches_full_scan():
+    rng = np.random.default_rng(21)
+    original = random_records(rng, 2000, PATTERN_LEN, decayed=0.1, duplicates=0.1)
+    pruned, report = prune_records(original, PATTERN_LEN, THRESHOLD, PrunePolicy(max_memories=1500))
+    assert report.evicted and report.deduplicated and report.capped
+    patterns = holdout_patterns(random_candles(rng, 300), PATTERN_LEN)
+
+    parity = replay_parity(original, pruned, PATTERN_LEN, patterns, THRESHOLD)
+    diffs, count_changes = full_scan_parity(original, pruned, patterns, THRESHOLD)
+
+    assert parity.samples == len(patterns)
+    assert parity.match_count_changes == count_changes > 0
+    np.testing.assert_allclose([parity.max_close_diff, parity.max_high_diff, parity.max_low_diff],
+                               diffs.max(axis=0), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(parity.mean_close_diff, diffs[:, 0].mean(), rtol=1e-12, atol=1e-12)
+
+
+def test_replay_parity_of_unchanged_memories_is_zero():
+    rng = np.random.default_rng(22)
+    records = random_records(rng, 500, PATTERN_LEN, decayed=0.1, duplicates=0.1)
+    patterns = holdout_patterns(random_candles(rng, 100), PATTERN_LEN)
+    parity = replay_parity(records, records.copy(), PATTERN_LEN, patterns, THRESHOLD)
+    assert parity.max_diff == 0.0 and parity.match_count_changes == 0
+
+
+def test_replay_parity_against_empty_memories():
+    rng = np.random.default_rng(23)
+    records = random_records(rng, 500, PATTERN_LEN, decayed=0.1, duplicates=0.1)
+    patterns = holdout_patterns(random_candles(rng, 100), PATTERN_LEN)
+    parity = replay_parity(records, records[:0], PATTERN_LEN, patterns, THRESHOLD)
+    diffs, count_changes = full_scan_parity(records, records[:0], patterns, THRESHOLD)
+    assert parity.match_count_changes == count_changes
+    np.testing.assert_allclose(parity.max_close_diff, diffs[:, 0].max(), rtol=1e-12, atol=1e-12)
+
+
+def test_prune_is_only_written_within_tolerance(tmp_path):
+    rng = np.random.default_rng(24)
+    records = random_records(rng, 2000, PATTERN_LEN, decayed=0.1, duplicates=0.1)
+    holdout = random_candles(rng, 200)
+    store = PatternMemoryStore(str(tmp_path / "memories_1hour.ptm"), pattern_len=PATTERN_LEN)
+    try:
+        store.append_records(records)
+        strict = prune_memories(store, "1hour", THRESHOLD, holdout, PrunePolicy(max_memories=100, tolerance=1e-9))
+        assert not strict.applied and strict.parity.max_diff > 1e-9
+        np.testing.assert_array_equal(store.records, records)
+
+        loose = prune_memories(store, "1hour", THRESHOLD, holdout, PrunePolicy(max_memories=100, tolerance=None))
+        assert loose.applied and len(store) == loose.after == 100
+        assert np.all(store.records[:, PATTERN_LEN + COL_WEIGHT:].any(axis=1))  # zero-weight memories evicted
+    finally:
+        store.close()
@@ -0,0 +1,151 @@
+"""Local order books (pt_orderbook.py): Fenwick queries and update sequencing."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import pt_orderbook
+from pt_exchanges import OrderBook
+from pt_orderbook import BookSide, LocalOrderBook, OrderBookManager
+
+
+def brute_fill(levels, quantity):
+    filled = notional = 0.0
+    for price, qty in levels:
+        take = min(qty, quantity - filled)
+        if take <= 0:
+            break
+        filled += take
+        notional += take * price
+    return filled, notional
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_bookside_matches_brute_force(descending):
+    rng = np.random.default_rng(9 if descending else 10)
+    side = BookSide(descending=descending)
+    model = {}
+    for step in range(6000):
+        if step % 1000 < 500:
+            # new and removed levels: the trees are rebuilt on the next query
+            price = round(float(rng.uniform(90.0, 110.0)), 1)
+            quantity = 0.0 if rng.random() < 0.3 else round(float(rng.uniform(0.1, 5.0)), 3)
+        else:
+            # quantity changes of existing levels: in-place Fenwick updates
+            price = list(model)[rng.integers(len(model))]
+            quantity = round(float(rng.uniform(0.1, 5.0)), 3)
+        side.set(price, quantity)
+        if quantity > 0:
+            model[price] = quantity
+        else:
+            model.pop(price, None)
+        if step % 25:
+            continue
+        levels = sorted(model.items(), reverse=descending)
+        assert side.levels() == levels
+        assert side.best() == (levels[0] if levels else None)
+        for price in rng.uniform(89.0, 111.0, size=5):
+            better = [q for p, q in levels if (p >= price if descending else p <= price)]
+            assert side.cumulative(price) == pytest.approx(sum(better), abs=1e-9)
+        total = sum(model.values())
+        for quantity in [0.0, total, total * 1.5] + list(rng.uniform(0.0, total, size=5)):
+            filled, notional = side.fill(quantity)
+            want_filled, want_notional = brute_fill(levels, quantity)
+            assert filled == pytest.approx(want_filled, abs=1e-9)
+            assert notional == pytest.approx(want_notional, rel=1e-9, abs=1e-6)
+
+
+def test_fill_estimate():
+    book = LocalOrderBook("binance", "BTCUSDT")
+    book.load_snapshot([(100.0, 1.0), (99.0, 2.0)], [(101.0, 1.0), (102.0, 3.0)], 1)
+    buy = book.fill("buy", 2.0)
+    assert buy.filled == 2.0 and buy.avg_price == pytest.approx(101.5)
+    assert buy.slippage_pct == pytest.approx(0.5 / 101 * 100)
+    sell = book.fill("sell", 10.0)
+    assert sell.filled == 3.0 and sell.avg_price == pytest.approx(298.0 / 3)
+    assert sell.slippage_pct > 0
+
+
+def test_apply_update_sequence():
+    book = LocalOrderBook("binance", "BTCUSDT")
+    book.load_snapshot([(100.0, 1.0)], [(101.0, 1.0)], 100)
+    assert book.apply_update(95, 100, [("100", "9")], [])  # already in the snapshot
+    assert book.best_bid() == (100.0, 1.0)
+    assert book.apply_update(99, 102, [("100", "2")], [])  # straddles the snapshot id
+    assert book.best_bid() == (100.0, 2.0) and book.last_update_id == 102
+    assert not book.apply_update(104, 105, [], [])  # 103 was missed
+    assert not book.synced
+    assert not book.apply_update(103, 103, [], [])  # nothing applies until a new snapshot
+
+
+class ManualThread:
+    """Stands in for the resync thread; the test calls manager.resync() itself."""
+
+    started = []
+
+    def __init__(self, target=None, args=(), **kwargs):
+        self.args = args
+
+    def start(self):
+        ManualThread.started.append(self.args)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    ManualThread.started = []
+    monkeypatch.setattr(pt_orderbook.threading, "Thread", ManualThread)
+    snapshot = {"id": 100}
+
+    def snapshot_fn(symbol):
+        return OrderBook("binance", symbol, [(100.0, 1.0), (99.0, 2.0)], [(101.0, 1.0), (102.0, 3.0)],
+                         datetime.now(), snapshot["id"])
+
+    manager = OrderBookManager("binance", snapshot_fn)
+    manager.snapshot = snapshot
+    return manager
+
+
+def test_buffered_updates_replay_after_snapshot(manager):
+    manager.on_update("BTCUSDT", 95, 99, [("100", "7")], [])  # older than the snapshot
+    manager.on_update("BTCUSDT", 100, 103, [("100", "5")], [])
+    manager.on_update("BTCUSDT", 104, 104, [("100.5", "1")], [("101", "0")])
+    assert manager.book("BTCUSDT") is None
+    assert ManualThread.started == [("BTCUSDT",)]  # one snapshot fetch for the whole buffer
+
+    assert manager.resync("BTCUSDT")
+    book = manager.book("BTCUSDT")
+    assert book.last_update_id == 104
+    assert book.bids.levels() == [(100.5, 1.0), (100.0, 5.0), (99.0, 2.0)]
+    assert book.best_ask() == (102.0, 3.0)
+
+    manager.on_update("BTCUSDT", 105, 105, [], [("102", "1")])  # live again: applied directly
+    assert book.best_ask() == (102.0, 1.0) and book.last_update_id == 105
+
+
+def test_snapshot_older_than_buffer_stays_unsynced(manager):
+    manager.on_update("BTCUSDT", 105, 106, [("100", "5")], [])  # 101..104 are not in the snapshot
+    assert not manager.resync("BTCUSDT")
+    assert manager.book("BTCUSDT") is None
+
+    manager.snapshot["id"] = 107
+    manager.on_update("BTCUSDT", 107, 108, [("100", "6")], [])
+    assert manager.resync("BTCUSDT")
+    book = manager.book("BTCUSDT")
+    assert book.last_update_id == 108 and book.best_bid() == (100.0, 6.0)
+    assert manager.resyncs == 2
+
+
+def test_gap_unsyncs_and_resyncs(manager):
+    manager.on_update("BTCUSDT", 100, 101, [], [])
+    assert manager.resync("BTCUSDT")
+    assert manager.book("BTCUSDT").last_update_id == 101
+
+    manager.snapshot["id"] = 110
+    manager.on_update("BTCUSDT", 105, 106, [("98", "1")], [])  # 102..104 were missed
+    assert manager.book("BTCUSDT") is None
+    manager.on_update("BTCUSDT", 107, 111, [("98", "4")], [])
+    assert manager.resync("BTCUSDT")
+    book = manager.book("BTCUSDT")
+    assert book.last_update_id == 111
+    assert book.bids.levels() == [(100.0, 1.0), (99.0, 2.0), (98.0, 4.0)]
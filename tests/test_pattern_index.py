@@ -0,0 +1,81 @@
+"""PatternIndex(mode="exact") returns what a full match_pattern scan returns (pt_pattern_index.py)."""
+
+import numpy as np
+import pytest
+
+from pt_memory_store import PatternMemoryStore
+from pt_pattern_index import PatternIndex
+from pt_pattern_match import match_pattern, pattern_differences
+
+from conftest import random_records
+
+
+PATTERN_LEN = 3
+THRESHOLDS = (0.5, 2.0, 5.0, 10.0, 25.0, 60.0)
+
+
+def random_queries(rng, store, count):
+    # fresh patterns, copies of stored ones, and their negations (c + m == 0 counts as no difference)
+    queries = list(rng.normal(0.0, 1.5, size=(count, store.pattern_len)))
+    picks = store.patterns[rng.integers(0, len(store), size=count)]
+    queries += list(picks) + list(-picks)
+    queries.append(np.zeros(store.pattern_len))
+    return queries
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PatternMemoryStore(str(tmp_path / "memories_1hour.ptm"), pattern_len=PATTERN_LEN)
+    store.append_records(random_records(np.random.default_rng(7), 3000, PATTERN_LEN, flat=0.05))
+    yield store
+    store.close()
+
+
+def assert_same_match(indexed, full):
+    np.testing.assert_array_equal(indexed.indices, full.indices)
+    np.testing.assert_array_equal(indexed.diffs, full.diffs)
+    assert indexed.final_move == full.final_move
+    assert indexed.high_final_move == full.high_final_move
+    assert indexed.low_final_move == full.low_final_move
+    if full.matched:
+        assert indexed.best_index == full.best_index
+
+
+def test_exact_mode_matches_full_scan(store):
+    index = PatternIndex(store, mode="exact")
+    rng = np.random.default_rng(11)
+    for pattern in random_queries(rng, store, 40):
+        for threshold in THRESHOLDS:
+            assert_same_match(index.match(pattern, threshold), match_pattern(pattern, store, threshold))
+
+
+def test_exact_mode_covers_appended_memories(store):
+    index = PatternIndex(store, mode="exact")
+    rng = np.random.default_rng(12)
+    # one by one (unsorted tail), then a batch large enough to be merged into the sorted keys
+    for row in random_records(rng, 50, PATTERN_LEN, flat=0.05):
+        index.add(store.append_records(row[None, :]))
+    store.append_records(random_records(rng, 1000, PATTERN_LEN, flat=0.05))
+    for pattern in random_queries(rng, store, 30):
+        for threshold in THRESHOLDS:
+            assert_same_match(index.match(pattern, threshold), match_pattern(pattern, store, threshold))
+    assert len(index) == len(store)
+
+
+def test_closest_matches_full_scan(store):
+    index = PatternIndex(store, mode="exact")
+    rng = np.random.default_rng(13)
+    for pattern in random_queries(rng, store, 40):
+        diffs = pattern_differences(pattern, store.patterns)
+        best, diff = index.closest(pattern, start_threshold=0.1)
+        assert diff == diffs.min()
+        assert diffs[best] == diffs.min()
+
+
+def test_approx_mode_returns_a_subset(store):
+    index = PatternIndex(store, mode="approx", approx_slack=1.0)
+    rng = np.random.default_rng(14)
+    for pattern in random_queries(rng, store, 20):
+        full = match_pattern(pattern, store, 5.0)
+        approx = index.match(pattern, 5.0)
+        assert set(approx.indices.tolist()) <= set(full.indices.tolist())
@@ -0,0 +1,132 @@
+"""match_pattern() and update_weights() (pt_pattern_match.py) against the trainer's original per-memory loop."""
+
+import numpy as np
+import pytest
+
+from pt_memory_prune import MemoryView
+from pt_memory_store import COL_WEIGHT
+from pt_pattern_match import match_pattern, update_weights
+
+from conftest import random_records
+
+
+PATTERN_LEN = 3
+THRESHOLDS = (0.0, 1.0, 10.0, 40.0, 100.0)
+
+
+def legacy_match(current_pattern, store, threshold):
+    """The memory scan as pt_trainer.py ran it before match_pattern()."""
+    memory_list = store.patterns.tolist()
+    close_move_list = store.close_moves.tolist()
+    high_move_list = store.high_moves.tolist()
+    low_move_list = store.low_moves.tolist()
+    weight_list = store.weights.tolist()
+    high_weight_list = store.high_weights.tolist()
+    low_weight_list = store.low_weights.tolist()
+    perfect_dexs, perfect_diffs, diffs_list = [], [], []
+    moves, high_moves, low_moves = [], [], []
+    for mem_ind, memory_pattern in enumerate(memory_list):
+        checks = []
+        for current_candle, memory_candle in zip(current_pattern, memory_pattern):
+            if current_candle + memory_candle == 0.0:
+                difference = 0.0
+            else:
+                difference = abs((abs(current_candle-memory_candle)/((current_candle+memory_candle)/2))*100)
+            checks.append(difference)
+        diff_avg = sum(checks)/len(checks)
+        if diff_avg <= threshold:
+            high_diff = high_move_list[mem_ind]/100
+            low_diff = low_move_list[mem_ind]/100
+            moves.append(close_move_list[mem_ind]*weight_list[mem_ind])
+            high_moves.append(high_diff*high_weight_list[mem_ind])
+            low_moves.append(low_diff*low_weight_list[mem_ind])
+            perfect_dexs.append(mem_ind)
+            perfect_diffs.append(diff_avg)
+        diffs_list.append(diff_avg)
+    if not perfect_dexs:
+        return perfect_dexs, diffs_list, moves, high_moves, low_moves, (0.0, 0.0, 0.0)
+    finals = (sum(moves)/len(moves), sum(high_moves)/len(high_moves), sum(low_moves)/len(low_moves))
+    return perfect_dexs, diffs_list, moves, high_moves, low_moves, finals
+
+
+def legacy_weights(match, this_diff, high_this_diff, low_this_diff):
+    """The trainer's per-memory weight update before update_weights()."""
+    new_weights, new_high, new_low = [], [], []
+    for indy in range(match.count):
+        var3 = (match.close_moves[indy]*100)
+        high_var3 = (match.high_moves[indy]*100)
+        low_var3 = (match.low_moves[indy]*100)
+        high_weight = match.high_weights[indy]
+        low_weight = match.low_weights[indy]
+        weight = match.weights[indy]
+        if high_this_diff > high_var3+(high_var3*0.1):
+            high_weight = min(high_weight + 0.25, 2.0)
+        elif high_this_diff < high_var3-(high_var3*0.1):
+            high_weight = max(high_weight - 0.25, 0.0)
+        if low_this_diff < low_var3-(low_var3*0.1):
+            low_weight = min(low_weight + 0.25, 2.0)
+        elif low_this_diff > low_var3+(low_var3*0.1):
+            low_weight = max(low_weight - 0.25, 0.0)
+        if this_diff > var3+(var3*0.1):
+            weight = min(weight + 0.25, 2.0)
+        elif this_diff < var3-(var3*0.1):
+            weight = max(weight - 0.25, -2.0)
+        new_weights.append(weight)
+        new_high.append(high_weight)
+        new_low.append(low_weight)
+    return new_weights, new_high, new_low
+
+
+def random_store(seed, count=400):
+    rng = np.random.default_rng(seed)
+    records = random_records(rng, count, PATTERN_LEN, flat=0.05)
+    # weights on and next to the clamps: close -2..2, high/low 0..2
+    edges = np.array([-2.0, -1.9, -0.1, 0.0, 0.1, 1.9, 2.0])
+    records[:, PATTERN_LEN + COL_WEIGHT] = rng.choice(edges, size=count)
+    records[:, PATTERN_LEN + COL_WEIGHT + 1:] = rng.choice(edges[3:], size=(count, 2))
+    return MemoryView(records, PATTERN_LEN), rng
+
+
+def queries(rng, store, count=20):
+    picks = store.patterns[rng.integers(0, len(store), size=count)]
+    # fresh patterns, stored ones, and their negations (c + m == 0 scores as no difference)
+    return list(rng.normal(0.0, 1.5, size=(count, PATTERN_LEN))) + list(picks) + list(-picks)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_match_pattern_matches_legacy_loop(seed):
+    store, rng = random_store(seed)
+    for pattern in queries(rng, store):
+        for threshold in THRESHOLDS:
+            result = match_pattern(pattern, store, threshold)
+            indices, diffs, moves, high_moves, low_moves, finals = legacy_match(pattern.tolist(), store, threshold)
+            assert result.indices.tolist() == indices
+            assert result.all_diffs.tolist() == diffs
+            assert result.close_moves.tolist() == moves
+            assert result.high_moves.tolist() == high_moves
+            assert result.low_moves.tolist() == low_moves
+            assert (result.final_move, result.high_final_move, result.low_final_move) == finals
+
+
+@pytest.mark.parametrize("seed", [4, 5, 6])
+def test_update_weights_matches_legacy_loop(seed):
+    store, rng = random_store(seed)
+    clamps = set()
+    for pattern in queries(rng, store, count=10):
+        result = match_pattern(pattern, store, 40.0)
+        if not result.matched:
+            continue
+        # large moves either way push weights into both clamps
+        for this_diff, high_this_diff, low_this_diff in rng.normal(0.0, 5.0, size=(10, 3)):
+            weights, high_weights, low_weights = update_weights(result, this_diff, high_this_diff, low_this_diff)
+            expected = legacy_weights(result, this_diff, high_this_diff, low_this_diff)
+            assert weights.tolist() == expected[0]
+            assert high_weights.tolist() == expected[1]
+            assert low_weights.tolist() == expected[2]
+            # a 0.25 step from 0.1 / 1.9 that ends on the bound was clamped
+            for name, old, new in (("close", result.weights, weights),
+                                   ("high/low", result.high_weights, high_weights),
+                                   ("high/low", result.low_weights, low_weights)):
+                clamps.update((name, bound) for bound, near in ((-2.0, -1.9), (0.0, 0.1), (2.0, 1.9))
+                              if np.any((old == near) & (new == bound)))
+    assert clamps == {("close", -2.0), ("close", 2.0), ("high/low", 0.0), ("high/low", 2.0)}
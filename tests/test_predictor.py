@@ -0,0 +1,66 @@
+"""CoinModel predicts the same levels with and without its PatternIndex (pt_predictor.py)."""
+
+import numpy as np
+import pytest
+
+from pt_exchanges import OHLCV
+from pt_memory_snapshot import publish_snapshot
+from pt_memory_store import PatternMemoryStore
+from pt_predictor import CoinModel
+
+from conftest import random_records
+
+
+PATTERN_LEN = 3
+THRESHOLD = 2.0
+TF = "1hour"
+
+
+def candles_for(changes, start=100.0):
+    candles = []
+    for i, change in enumerate(changes):
+        close = start*(1+change/100)
+        candles.append(OHLCV(3600*i, start, max(start, close), min(start, close), close, 1.0))
+        start = close
+    return candles
+
+
+@pytest.fixture
+def folder(tmp_path):
+    store = PatternMemoryStore(str(tmp_path / f"memories_{TF}.ptm"), pattern_len=PATTERN_LEN)
+    store.append_records(random_records(np.random.default_rng(11), 2000, PATTERN_LEN))
+    publish_snapshot(store, TF, str(tmp_path), perfect_threshold=THRESHOLD)
+    store.close()
+    return str(tmp_path)
+
+
+@pytest.fixture
+def models(folder):
+    indexed = CoinModel("BTC", folder, [TF], index=True)
+    full = CoinModel("BTC", folder, [TF], index=False)
+    yield indexed, full
+    indexed.close()
+    full.close()
+
+
+def test_no_match_is_a_flat_range_in_both_modes(models):
+    indexed, full = models
+    candles = candles_for([40.0, -35.0, 45.0])  # far outside every stored pattern
+    a = indexed.predict(TF, candles)
+    b = full.predict(TF, candles)
+    assert a.matches == b.matches == 0
+    assert a == b
+    assert a.close_price == a.high_price == a.low_price == a.start_price
+
+
+def test_matched_levels_agree(models):
+    indexed, full = models
+    rng = np.random.default_rng(5)
+    for changes in rng.normal(0.0, 1.5, size=(50, PATTERN_LEN)):
+        candles = candles_for(changes)
+        a = indexed.predict(TF, candles)
+        b = full.predict(TF, candles)
+        assert a.matches == b.matches
+        assert a.close_price == pytest.approx(b.close_price)
+        assert a.high_price == pytest.approx(b.high_price)
+        assert a.low_price == pytest.approx(b.low_price)
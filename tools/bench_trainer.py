@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+PowerTrader AI - Trainer Throughput Benchmark
+=============================================
+Runs PatternTrainer offline over deterministic synthetic candle histories, so
+trainer speed can be measured without an exchange connection.
+
+For every (timeframe, candle count, seeded memory size) case it reports:
+    candles per second
+    match-scan latency percentiles (p50 / p90 / p99 / max)
+    threshold convergence (scans until the match count first lands near
+    MATCH_TARGET, share of scans near it)
+    memory growth (memories before / after)
+    flush cost (count, mean and max milliseconds, journal bytes)
+
+Each case trains in a fresh temporary folder. Results are written as JSON so
+two runs can be compared with --compare.
+
+Usage:
+    python tools/bench_trainer.py
+    python tools/bench_trainer.py --candles 2000 10000 --memories 0 50000 --timeframes 1hour 1day
+    python tools/bench_trainer.py --output bench_new.json --compare bench_output.json
+    python tools/bench_trainer.py --threshold-modes step quantile
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Ensure project root is on sys.path so imports find top-level modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pt_exchanges import OHLCV
+from pt_memory_store import load_store
+from pt_trainer import MATCH_TARGET, NUMBER_OF_CANDLES, PatternTrainer, START_CANDLES, TF_CHOICES, TF_MINUTES
+from pt_threshold import THRESHOLD_MODES
+
+
+def synthetic_candles(count: int, seed: int, timeframe_minutes: int = 60,
+                      start_price: float = 100.0, volatility: float = 0.01) -> List[OHLCV]:
+    """Deterministic random-walk OHLC series, oldest first."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, volatility, count)
+    wicks = np.abs(rng.normal(0.0, volatility / 2, (count, 2)))
+    closes = start_price * np.cumprod(1.0 + returns)
+    opens = np.concatenate([[start_price], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1.0 + wicks[:, 0])
+    lows = np.minimum(opens, closes) * (1.0 - wicks[:, 1])
+    step = timeframe_minutes * 60
+    start_time = 1_600_000_000
+    return [
+        OHLCV(timestamp=start_time + i * step, open=float(opens[i]), high=float(highs[i]),
+              low=float(lows[i]), close=float(closes[i]), volume=1.0)
+        for i in range(count)
+    ]
+
+
+def seed_memories(timeframe: str, folder: str, count: int, seed: int, pattern_len: int):
+    """Pre-fill a store with `count` random memories so scans start at a realistic size."""
+    if count <= 0:
+        return
+    rng = np.random.default_rng(seed)
+    records = np.empty((count, pattern_len + 6), dtype=np.float64)
+    records[:, :pattern_len] = rng.normal(0.0, 1.0, (count, pattern_len))
+    records[:, pattern_len:pattern_len + 3] = rng.normal(0.0, 1.0, (count, 3))
+    records[:, pattern_len + 3:] = 1.0
+    store = load_store(timeframe, pattern_len=pattern_len, folder=folder, journal=True)
+    store.append_records(records)
+    store.compact(wait=True)
+    store.close()
+
+
+class TimedTrainer(PatternTrainer):
+    """PatternTrainer that records match and flush timings."""
+
+    __slots__ = ("match_times", "flush_times", "match_counts")
+
+    def __init__(self, *args, **kwargs):
+        self.match_times = []
+        self.flush_times = []
+        self.match_counts = []
+        super().__init__(*args, **kwargs)
+
+    def match(self, pattern):
+        start = time.perf_counter()
+        result = super().match(pattern)
+        self.match_times.append(time.perf_counter() - start)
+        self.match_counts.append(result.count)
+        return result
+
+    def flush(self, force=False):
+        dirty = self.store.dirty
+        start = time.perf_counter()
+        super().flush(force=force)
+        if dirty or force:
+            self.flush_times.append(time.perf_counter() - start)
+
+
+def _percentiles_us(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    values = np.asarray(samples) * 1e6
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50": round(float(p50), 2), "p90": round(float(p90), 2),
+            "p99": round(float(p99), 2), "max": round(float(values.max()), 2)}
+
+
+def _convergence(counts: List[int], target: int = MATCH_TARGET) -> Dict[str, float]:
+    """Scans until the match count is first within 0.5x..1.5x target, and the share of scans inside that band."""
+    if not counts:
+        return {"scans_to_target": 0, "near_target_share": 0.0, "mean_abs_error": 0.0}
+    values = np.asarray(counts)
+    near = (values >= target * 0.5) & (values <= target * 1.5)
+    first = int(np.argmax(near)) if near.any() else len(values)
+    return {
+        "scans_to_target": first,
+        "near_target_share": round(float(near.mean()), 4),
+        "mean_abs_error": round(float(np.abs(values - target).mean()), 2),
+    }
+
+
+def run_case(timeframe: str, candles: int, memories: int, seed: int,
+             index_mode: Optional[str] = None, threshold_mode: str = "step") -> dict:
+    pattern_len = NUMBER_OF_CANDLES - 1
+    series = synthetic_candles(candles, seed, TF_MINUTES[TF_CHOICES.index(timeframe)])
+    with tempfile.TemporaryDirectory(prefix="pt_bench_") as folder:
+        seed_memories(timeframe, folder, memories, seed + 1, pattern_len)
+        trainer = TimedTrainer(timeframe, folder=folder, index_mode=index_mode, threshold_mode=threshold_mode)
+        before = len(trainer.store)
+        start = time.perf_counter()
+        result = trainer.train(series, start=START_CANDLES)
+        elapsed = time.perf_counter() - start
+        after = len(trainer.store)
+        journal_bytes = getattr(trainer.store, "journal_bytes", 0)
+        close_start = time.perf_counter()
+        trainer.close()
+        close_seconds = time.perf_counter() - close_start
+
+    flushes = trainer.flush_times
+    return {
+        "timeframe": timeframe,
+        "candles": candles,
+        "seeded_memories": memories,
+        "index_mode": index_mode,
+        "threshold_mode": threshold_mode,
+        "steps": result.steps,
+        "seconds": round(elapsed, 4),
+        "candles_per_sec": round(result.steps / elapsed, 1) if elapsed > 0 else 0.0,
+        "match_latency_us": _percentiles_us(trainer.match_times),
+        "threshold": _convergence(trainer.match_counts),
+        "memories_before": before,
+        "memories_after": after,
+        "memory_growth": after - before,
+        "weight_updates": result.weight_updates,
+        "flush": {
+            "count": len(flushes),
+            "mean_ms": round(float(np.mean(flushes)) * 1000, 3) if flushes else 0.0,
+            "max_ms": round(float(np.max(flushes)) * 1000, 3) if flushes else 0.0,
+            "journal_bytes": journal_bytes,
+            "close_ms": round(close_seconds * 1000, 3),
+        },
+    }
+
+
+def _case_key(case: dict) -> tuple:
+    return (case["timeframe"], case["candles"], case["seeded_memories"], case.get("index_mode"),
+            case.get("threshold_mode", "step"))
+
+
+def print_results(results: List[dict], previous: Optional[dict] = None):
+    baseline = {_case_key(c): c for c in (previous or {}).get("cases", [])}
+    print(f"\n{'timeframe':<8} {'thresh':<8} {'candles':>8} {'seeded':>8} {'cand/s':>10} {'p50 us':>9} {'p99 us':>9} "
+          f"{'growth':>7} {'flush ms':>9} {'to tgt':>7}  vs previous")
+    print("-" * 110)
+    for case in results:
+        line = (
+            f"{case['timeframe']:<8} {case.get('threshold_mode', 'step'):<8} {case['candles']:>8} {case['seeded_memories']:>8} "
+            f"{case['candles_per_sec']:>10.1f} {case['match_latency_us']['p50']:>9.1f} "
+            f"{case['match_latency_us']['p99']:>9.1f} {case['memory_growth']:>7} {case['flush']['mean_ms']:>9.3f} "
+            f"{case.get('threshold', {}).get('scans_to_target', 0):>7}"
+        )
+        old = baseline.get(_case_key(case))
+        if old and old.get("candles_per_sec"):
+            change = (case["candles_per_sec"] - old["candles_per_sec"]) / old["candles_per_sec"] * 100
+            line += f"  {change:+.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PatternTrainer on synthetic candles")
+    parser.add_argument("--candles", "-n", type=int, nargs="+", default=[5000], help="Candle counts per case")
+    parser.add_argument("--memories", "-m", type=int, nargs="+", default=[0, 20000],
+                        help="Memories to seed the store with per case")
+    parser.add_argument("--timeframes", "-t", nargs="+", default=["1hour"], choices=TF_CHOICES)
+    parser.add_argument("--index-mode", choices=["exact", "approx"], default=None,
+                        help="Use PatternIndex lookups instead of full scans")
+    parser.add_argument("--threshold-modes", nargs="+", default=["step"], choices=THRESHOLD_MODES,
+                        help="perfect_threshold controllers to compare")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", default="bench_output.json", help="JSON result file")
+    parser.add_argument("--compare", "-c", default=None, help="Previous JSON result file to compare against")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    results = []
+    for tf_offset, timeframe in enumerate(args.timeframes):
+        for candles in args.candles:
+            for memories in args.memories:
+                for threshold_mode in args.threshold_modes:
+                    print(f"[Bench] {timeframe}: {candles} candles, {memories} seeded memories, {threshold_mode} threshold")
+                    results.append(run_case(timeframe, candles, memories, args.seed + tf_offset,
+                                            args.index_mode, threshold_mode))
+
+    report = {
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "cases": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_results(results, previous)
+    print(f"\n[Bench] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ for f in p.glob('*.py'):
     modules.append(f.stem)
 
 # Skip very heavy modules that run on import or require live exchange SDKs
-SKIP_ON_IMPORT = {"pt_trainer", "pt_trader", "pt_thinker", "pt_backtester"}
+SKIP_ON_IMPORT = {"pt_trader", "pt_thinker", "pt_backtester"}
 modules = [m for m in modules if m not in SKIP_ON_IMPORT]
 
 ok=[]